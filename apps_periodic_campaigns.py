@@ -5,9 +5,7 @@ import os
 # external imports
 import pandas as pd
 import subprocess
-import datetime
 from shapely import from_geojson
-from time import sleep
 
 # internal imports
 from src.utils.constants import (
@@ -19,14 +17,24 @@ from src.utils.common_functions import (
     get_list_files_in_path,
     get_nearest_airport_to_point
 )
-from src.old_hunter.hunter import Hunter
+from src.core.prefix_planner import PrefixHuntPlanner
+from src.core.hunt_pipeline import HuntResult
+from src.core.campaign_store import CampaignStore
+from src.core.campaign_statistics import CampaignStatistics
+from src.core.campaign_scheduler import CampaignScheduler, CampaignCheckpoint
+from src.core.host_location import get_host_location_provider
+from src.core.traceroute_cache import get_cached_traceroute_runner
 
 
-def hunt_popets_anycast(campaign: str, anycast_directions_filepath: str):
+def hunt_popets_anycast(campaign: str, anycast_directions_filepath: str,
+                        checkpoint: CampaignCheckpoint):
     popets_ip_dict = json_file_to_dict(anycast_directions_filepath)
     anycast_ip_list = [ip for ip in popets_ip_dict.keys()
                        if popets_ip_dict[ip]]
     anycast_ip_list.sort()
+    # Targets announced in the same prefix are hunted once per prefix
+    hunt_planner = PrefixHuntPlanner()
+    campaign_store = CampaignStore()
 
     countries_origin = [
             "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "ES", "FI",
@@ -35,6 +43,10 @@ def hunt_popets_anycast(campaign: str, anycast_directions_filepath: str):
         ]
 
     for country in countries_origin:
+        # Targets already hunted from country before an interruption
+        pending_targets = checkpoint.get_pending(country, anycast_ip_list)
+        if len(pending_targets) == 0:
+            continue
         while True:
             additional_info = connect_to_vpn_server(country)
             try:
@@ -51,17 +63,21 @@ def hunt_popets_anycast(campaign: str, anycast_directions_filepath: str):
                 print("Reconnecting")
                 disconnect_vpn()
 
-        for target in anycast_ip_list:
-            output_filename = \
-                "./apps_analysis/measurements/{}/{}_{}.json".format(
-                    campaign, target, country)
-            hunter = Hunter(
-                target=target,
-                check_cf_ray=False,
-                output_filename=output_filename,
-                additional_info=additional_info,
-            )
-            hunter.hunt()
+        def save_hunt(target: str, hunt_result: HuntResult, country=country):
+            # Every hunt is appended to the campaign store as it finishes
+            campaign_store.append(hunt_result.record, campaign=campaign,
+                                  origin_country=country)
+            checkpoint.mark_completed(country, target)
+
+        hunt_planner.run([
+            {
+                "target": target,
+                "check_cf_ray": False,
+                "save_to_file": False,
+                "additional_info": additional_info
+            }
+            for target in pending_targets
+        ], on_result=save_hunt)
 
 
 def connect_to_vpn_server(vpn_server: str) -> dict:
@@ -71,6 +87,9 @@ def connect_to_vpn_server(vpn_server: str) -> dict:
         "protonvpn-cli", "connect", "--cc",
         vpn_server,
         "--protocol", "tcp"], stdout=subprocess.PIPE)
+    # The public IP changes with the VPN server, locate the host again
+    get_host_location_provider().invalidate()
+    get_cached_traceroute_runner().invalidate()
     connection_status = subprocess.run([
         "protonvpn-cli", "status"], stdout=subprocess.PIPE)
     status_params_raw = (str(connection_status.stdout)
@@ -97,25 +116,20 @@ def disconnect_vpn():
         "protonvpn-cli", "disconnect"],
         stdout=subprocess.PIPE)
 
-while True:
-    hour = datetime.datetime.utcnow().hour
-    execution_hours = [9]
-    if hour in execution_hours:
-        # Apps comunications measurements
-        start_time = datetime.datetime.utcnow().strftime('%Y%m%d_%H:%M:%S')
-        campaign_name = "PoPETs_anycast_ipinfo_" + start_time
-        # Take measurements
-        hunt_popets_anycast(
-            campaign=campaign_name,
-            anycast_directions_filepath="./apps_analysis/PoPETs_anycast_pii_ips_ip_info.json"
-        )
-        finish_time = datetime.datetime.utcnow().strftime('%Y%m%d_%H:%M:%S')
-
-        print("Start execution at {}".format(start_time))
-        print("Finish execution at {}".format(finish_time))
-    else:
-        print("Waiting for the next programmed hour, now is {}".format(hour))
-        print("Programmed hours of execution are {}".format(execution_hours))
-        sleep(1800)
+def run_popets_campaign(campaign: str, checkpoint: CampaignCheckpoint):
+    # Apps comunications measurements
+    hunt_popets_anycast(
+        campaign=campaign,
+        anycast_directions_filepath="./apps_analysis/PoPETs_anycast_pii_ips_ip_info.json",
+        checkpoint=checkpoint
+    )
+    # Add the new hunts to the statistics
+    CampaignStatistics().update()
 
 
+# Every day at 9:00 UTC
+CampaignScheduler(
+    schedule="0 9 * * *",
+    campaign_prefix="PoPETs_anycast_ipinfo",
+    run_campaign=run_popets_campaign
+).run_forever()
@@ -5,9 +5,10 @@
 import sys
 import getopt
 import ast
-# internal imports
-from src.old_hunter.hunter import Hunter
-from src.old_hunter.visualize import plot_file
+import contextlib
+import json
+# internal imports are done by the code path using them, help and option
+# errors never load pandas, shapely, plotly or the network clients
 
 
 def print_help_text() -> None:
@@ -17,7 +18,8 @@ def print_help_text() -> None:
 
     print("""
 Usage:  
-        ./hunter.sh -t IP_direction [-p probes_filepath] [-c boolean] [OPTIONS]
+        ./hunter.sh -t IP_direction [-p probes_filepath] [-y boolean] [OPTIONS]
+        ./hunter.sh -b targets_filepath [-c concurrency] [OPTIONS]
 
 Commands:
 Either long or short options are allowed
@@ -28,15 +30,90 @@ Either long or short options are allowed
 Hunter Options:
     --origin        -o  "(latitude,longitude)"
                                 Latitude and longitude from where Hunter will
-                                start the tracking.
+                                start the tracking. In batch mode, origin of
+                                the lines without one.
     --check_cf_ray  -y  boolean
                                 Use it when you want to check if cf-ray used in
                                 Cloudflare CDN exists (default False)
     --visualize     -v  filepath
                                 Visualize the result of a measurement.
+
+Batch Options:
+    --batch         -b  filepath
+                                Hunt every target in filepath, "-" reads
+                                stdin. One target per line, optionally
+                                followed by the origin latitude and
+                                longitude. Hunts start as lines are read and
+                                every result is written to stdout as one
+                                JSON line when its hunt finishes.
+    --concurrency   -c  number
+                                Hunts in flight at the same time in batch
+                                mode (default 8)
     """)
 
 
+def parse_batch_line(line: str) -> dict:
+    """
+    :param line: "target [latitude longitude]", blanks or commas separated
+    :return: hunt arguments, None for blank and comment lines
+    """
+    fields = line.replace(",", " ").split()
+    if len(fields) == 0 or fields[0].startswith("#"):
+        return None
+    hunt = {"target": fields[0]}
+    if len(fields) >= 3:
+        hunt["origin"] = (float(fields[1]), float(fields[2]))
+    return hunt
+
+
+def read_batch_hunts(batch_file, origin: (float, float) = (),
+                     check_cf_ray: bool = None):
+    """
+    :param batch_file: lines as accepted by parse_batch_line, read one at a
+        time as hunts are requested
+    :param origin: origin of the lines without one, the host location if
+        empty
+    :return: iterator of hunt arguments
+    """
+    for line in iter(batch_file.readline, ""):
+        hunt = parse_batch_line(line)
+        if hunt is None:
+            continue
+        hunt["save_to_file"] = False
+        if len(origin) > 0:
+            hunt.setdefault("origin", origin)
+        if check_cf_ray is not None:
+            hunt["check_cf_ray"] = check_cf_ray
+        yield hunt
+
+
+def run_batch(batch_filepath: str, concurrency: int,
+              origin: (float, float) = (), check_cf_ray: bool = None):
+    """
+    Hunt the targets of batch_filepath in one process, starting every hunt
+    as its line is read and streaming every result as NDJSON to stdout.
+    Hunt logs are sent to stderr so stdout only carries results.
+    """
+    from src.core.async_hunter import AsyncHuntEngine
+
+    output = sys.stdout
+
+    def write_line(line: dict):
+        output.write(json.dumps(line, separators=(",", ":")) + "\n")
+        output.flush()
+
+    with (sys.stdin if batch_filepath == "-"
+          else open(batch_filepath)) as batch_file, \
+            contextlib.redirect_stdout(sys.stderr):
+        AsyncHuntEngine(concurrency=concurrency).run_stream(
+            read_batch_hunts(batch_file, origin=origin,
+                             check_cf_ray=check_cf_ray),
+            on_result=lambda target, hunt_result:
+                write_line(hunt_result.record),
+            on_error=lambda target, e:
+                write_line({"target": target, "error": str(e)}))
+
+
 def main(argv):
     """
     Main function that execute on every run of Hunter.
@@ -50,37 +127,66 @@ def main(argv):
     # These sections parse the options selected and their values
     try:
         options, args = getopt.getopt(argv,
-                                      "t:o:y:v",
+                                      "t:o:y:vb:c:",
                                       ["target", "origin",
                                        "check_cf_ray",
-                                       "visualize"])
+                                       "visualize",
+                                       "batch=", "concurrency="])
     except getopt.GetoptError as e:
         print(e)
         sys.exit(2)
 
-    hunter = Hunter(target="")
+    target = None
+    origin = ()
+    check_cf_ray = None
+    batch_filepath = None
+    concurrency = None
 
     for option, arg in options:
         if option in ("-t", "--target"):
-            hunter.set_target(arg)
+            target = arg
 
         elif option in ("-o", "--origin"):
-            hunter.set_origin(ast.literal_eval(arg))
+            origin = ast.literal_eval(arg)
 
         elif option in ("-y", "--check_cf_ray"):
             check_cf_ray = False
             if arg.lower() == "true":
                 check_cf_ray = True
-            hunter.set_check_cf_ray(check_cf_ray)
+
+        elif option in ("-b", "--batch"):
+            batch_filepath = arg
+
+        elif option in ("-c", "--concurrency"):
+            concurrency = int(arg)
 
         elif option in ("-v", "--visualize"):
             try:
+                from src.old_hunter.visualize import plot_file
+
                 visualization_filepath = args[0]
                 plot_file(filepath=visualization_filepath)
                 return
             except Exception as e:
                 print(e)
 
+    if batch_filepath is not None:
+        from src.utils.constants import HUNT_CONCURRENCY
+
+        run_batch(batch_filepath=batch_filepath,
+                  concurrency=concurrency if concurrency is not None
+                  else HUNT_CONCURRENCY,
+                  origin=origin,
+                  check_cf_ray=check_cf_ray)
+        return
+
+    from src.old_hunter.hunter import Hunter
+
+    hunter = Hunter(target="", origin=origin)
+    if target is not None:
+        hunter.set_target(target)
+    if check_cf_ray is not None:
+        hunter.set_check_cf_ray(check_cf_ray)
     hunter.hunt()
 
 
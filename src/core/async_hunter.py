@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+# internal imports
+from ..utils.constants import (
+    HUNT_CONCURRENCY,
+    KEY_FILEPATH,
+    RIPE_ATLAS_MEASUREMENTS_BASE_URL
+)
+from ..utils.common_functions import json_file_to_dict
+from .http_client import get_http_client
+from .measurement_batcher import MeasurementBatcher
+from .result_poller import BatchedResultsPoller
+from .hunt_pipeline import HuntPipeline, HuntResult
+
+
+class AsyncHuntEngine:
+    """
+    Keeps up to concurrency hunts in flight. Every hunt goes through one
+    HuntPipeline sharing the HTTP session, the probe catalog and caches,
+    and the blocking hunt of each target runs in a worker thread, so the
+    traceroute, pings and intersection phases of different targets
+    overlap while they wait on RIPE Atlas. Their measurements are
+    submitted through one MeasurementBatcher and their results polled
+    together by one BatchedResultsPoller. The hunts of one run share a
+    probe selection seed, so hunts from the same area pick the same
+    probes and their measurements can be submitted together.
+    """
+
+    def __init__(self,
+                 concurrency: int = HUNT_CONCURRENCY,
+                 pipeline: HuntPipeline = None):
+        """
+        :param pipeline: pipeline running every hunt, one submitting its
+            measurements through a MeasurementBatcher and polling them
+            with a BatchedResultsPoller if not given
+        """
+        self._concurrency = concurrency
+        self._pipeline = pipeline
+        if self._pipeline is None:
+            http_client = get_http_client()
+            ripe_key = json_file_to_dict(KEY_FILEPATH)["ripe_token"]
+            self._pipeline = HuntPipeline(
+                http_client=http_client,
+                measurement_batcher=MeasurementBatcher(
+                    url=RIPE_ATLAS_MEASUREMENTS_BASE_URL + "/?key={}".format(
+                        ripe_key),
+                    http_client=http_client),
+                results_poller=BatchedResultsPoller(http_client=http_client),
+                ripe_key=ripe_key)
+
+    async def hunt(self, target: str, semaphore: asyncio.Semaphore,
+                   executor: ThreadPoolExecutor, on_result=None,
+                   on_error=None, **hunt_options) -> HuntResult:
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                hunt_result = await loop.run_in_executor(
+                    executor,
+                    lambda: self._pipeline.hunt(target, **hunt_options))
+            except Exception as e:
+                if on_error is not None:
+                    on_error(target, e)
+                raise
+            if on_result is not None:
+                on_result(target, hunt_result)
+            return hunt_result
+
+    def with_probe_selection_seed(self, hunts):
+        """
+        :return: iterator of copies of hunts with one new
+            probe_selection_seed, unless they give their own
+        """
+        probe_selection_seed = random.getrandbits(32)
+        for hunt in hunts:
+            yield dict({"probe_selection_seed": probe_selection_seed}, **hunt)
+
+    async def hunt_many(self, hunts: list, on_result=None,
+                        on_error=None) -> list:
+        """
+        :param hunts: list of dicts with target and any other
+            HuntPipeline.hunt argument
+        :param on_result: called with (target, HuntResult) as soon as
+            every hunt finishes, e.g. to append it to a CampaignStore
+        :param on_error: called with (target, exception) when a hunt fails
+        :return: HuntResult in the same order as hunts, failed hunts are
+            returned as the exception raised
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
+        with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            return await asyncio.gather(
+                *[self.hunt(semaphore=semaphore, executor=executor,
+                            on_result=on_result, on_error=on_error, **hunt)
+                  for hunt in self.with_probe_selection_seed(hunts)],
+                return_exceptions=True)
+
+    async def hunt_stream(self, hunts, on_result=None,
+                          on_error=None) -> int:
+        """
+        Hunt an iterator of hunts as it yields them, e.g. lines read from
+        stdin. The next hunt is only requested when fewer than concurrency
+        hunts are in flight, and it is requested in a worker thread so a
+        slow iterator never stops the hunts already running.
+        :param hunts: iterator of dicts as in hunt_many
+        :return: number of hunts run, results are only given through
+            on_result and on_error
+        """
+        semaphore = asyncio.Semaphore(self._concurrency)
+        loop = asyncio.get_running_loop()
+        hunts = self.with_probe_selection_seed(hunts)
+        in_flight = set()
+        hunts_count = 0
+
+        def report_failures(tasks: set):
+            for task in tasks:
+                if task.exception() is not None:
+                    print("Hunt of {} failed: {}".format(
+                        task.get_name(), task.exception()))
+
+        with ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            while True:
+                if len(in_flight) >= self._concurrency:
+                    (done, in_flight) = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    report_failures(done)
+                hunt = await loop.run_in_executor(None, next, hunts, None)
+                if hunt is None:
+                    break
+                hunts_count += 1
+                in_flight.add(asyncio.create_task(
+                    self.hunt(semaphore=semaphore, executor=executor,
+                              on_result=on_result, on_error=on_error,
+                              **hunt),
+                    name=hunt["target"]))
+            if len(in_flight) > 0:
+                (done, _) = await asyncio.wait(in_flight)
+                report_failures(done)
+        return hunts_count
+
+    def run(self, hunts: list, on_result=None, on_error=None) -> list:
+        results = asyncio.run(self.hunt_many(hunts, on_result=on_result,
+                                             on_error=on_error))
+        for hunt, result in zip(hunts, results):
+            if isinstance(result, Exception):
+                print("Hunt of {} failed: {}".format(hunt["target"], result))
+        return results
+
+    def run_stream(self, hunts, on_result=None, on_error=None) -> int:
+        return asyncio.run(self.hunt_stream(hunts, on_result=on_result,
+                                            on_error=on_error))
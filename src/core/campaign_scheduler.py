@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import datetime
+import json
+import os
+import time
+# internal imports
+from ..utils.constants import (
+    CAMPAIGN_CHECKPOINTS_PATH,
+    SCHEDULER_MAX_SLEEP
+)
+from ..utils.common_functions import create_directory_structure
+
+# (minimum, maximum) of every cron field
+_CRON_FIELDS_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def parse_cron_field(field: str, minimum: int, maximum: int) -> list:
+    """
+    :param field: "*", "a", "a-b", any of them with "/step", or a comma
+        separated list of them
+    :return: sorted values matched by field
+    """
+    values = set()
+    for part in field.split(","):
+        (part, step) = part.split("/") if "/" in part else (part, None)
+        if part == "*":
+            (start, end) = (minimum, maximum)
+        elif "-" in part:
+            (start, end) = map(int, part.split("-"))
+        else:
+            start = int(part)
+            # "a/step" runs from a to the maximum
+            end = start if step is None else maximum
+        if start < minimum or end > maximum or start > end:
+            raise ValueError("Cron field {} out of range".format(field))
+        values.update(range(start, end + 1, int(step or 1)))
+    return sorted(values)
+
+
+class CronSchedule:
+    """
+    UTC slots of a cron expression: minute hour day-of-month month
+    day-of-week, with day-of-week 0 as Sunday. As in cron, when both day
+    fields are restricted a day matching any of them is a slot day.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("Cron expression needs 5 fields: {}".format(
+                expression))
+        (self._minutes, self._hours, self._days, self._months,
+         self._weekdays) = [
+            parse_cron_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields,
+                                                 _CRON_FIELDS_RANGES)]
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+        self._expression = expression
+
+    def __str__(self) -> str:
+        return self._expression
+
+    def is_slot_day(self, day: datetime.date) -> bool:
+        if day.month not in self._months:
+            return False
+        day_matches = day.day in self._days
+        # isoweekday is 7 on Sunday, cron uses 0
+        weekday_matches = day.isoweekday() % 7 in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day_matches and weekday_matches
+        return day_matches or weekday_matches
+
+    def next_slot(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        :param after: naive UTC datetime
+        :return: first slot strictly after after
+        """
+        start = after.replace(second=0, microsecond=0) + \
+            datetime.timedelta(minutes=1)
+        day = start.date()
+        # Every cron expression has a slot within 4 years, 29th of February
+        for _ in range(4 * 366 + 1):
+            if self.is_slot_day(day):
+                for hour in self._hours:
+                    for minute in self._minutes:
+                        slot = datetime.datetime.combine(
+                            day, datetime.time(hour, minute))
+                        if slot >= start:
+                            return slot
+            day += datetime.timedelta(days=1)
+        raise ValueError("Cron expression {} has no slots".format(
+            self._expression))
+
+
+class CampaignCheckpoint:
+    """
+    Progress of one campaign run saved after every (country, target) hunt,
+    so an interrupted run resumes without repeating the hunts done.
+    """
+
+    def __init__(self, filepath: str, campaign: str = None,
+                 slot: str = None, completed: list = None,
+                 finished: bool = False):
+        self._filepath = filepath
+        self.campaign = campaign
+        self.slot = slot
+        self.finished = finished
+        self._completed = set(tuple(item) for item in completed or [])
+
+    @classmethod
+    def load(cls, filepath: str):
+        """
+        :return: checkpoint saved at filepath, None if there is none
+        """
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath) as file:
+            state = json.loads(file.read())
+        return cls(filepath=filepath, **state)
+
+    def is_completed(self, country: str, target: str) -> bool:
+        return (country, target) in self._completed
+
+    def get_pending(self, country: str, targets: list) -> list:
+        return [target for target in targets
+                if not self.is_completed(country, target)]
+
+    def mark_completed(self, country: str, target: str):
+        self._completed.add((country, target))
+        self.save()
+
+    def finish(self):
+        self.finished = True
+        self.save()
+
+    def save(self):
+        create_directory_structure(self._filepath)
+        # Replace the file in one step, a crash never leaves it half written
+        temporal_filepath = self._filepath + ".tmp"
+        with open(temporal_filepath, "w") as file:
+            file.write(json.dumps({
+                "campaign": self.campaign,
+                "slot": self.slot,
+                "completed": sorted(self._completed),
+                "finished": self.finished
+            }))
+        os.replace(temporal_filepath, self._filepath)
+
+
+class CampaignScheduler:
+    """
+    Runs a campaign at every slot of a cron schedule, sleeping until the
+    next slot. A run that overlaps later slots skips them instead of
+    starting again, and an unfinished run found on start is resumed from
+    its checkpoint before waiting for the next slot.
+    """
+
+    def __init__(self, schedule: str, campaign_prefix: str,
+                 run_campaign,
+                 checkpoint_filepath: str = None,
+                 sleep=time.sleep,
+                 utcnow=datetime.datetime.utcnow):
+        """
+        :param schedule: cron expression of the slots, UTC
+        :param run_campaign: called with (campaign name, checkpoint), it
+            must skip the (country, target) hunts already completed and
+            mark the new ones
+        """
+        self._schedule = CronSchedule(schedule)
+        self._campaign_prefix = campaign_prefix
+        self._run_campaign = run_campaign
+        self._checkpoint_filepath = checkpoint_filepath \
+            if checkpoint_filepath is not None \
+            else "{}{}.json".format(CAMPAIGN_CHECKPOINTS_PATH, campaign_prefix)
+        self._sleep = sleep
+        self._utcnow = utcnow
+
+    def run_forever(self):
+        self.resume()
+        while True:
+            self.run_next_slot()
+
+    def resume(self) -> bool:
+        """
+        Finish the run of the saved checkpoint if it was interrupted.
+        :return: True if a run was resumed
+        """
+        checkpoint = CampaignCheckpoint.load(self._checkpoint_filepath)
+        if checkpoint is None or checkpoint.finished:
+            return False
+        print("Resuming campaign {}".format(checkpoint.campaign))
+        self.run_checkpoint(checkpoint)
+        return True
+
+    def run_next_slot(self):
+        # Slots that passed while the previous run lasted are skipped
+        slot = self._schedule.next_slot(self._utcnow())
+        self.wait_until(slot)
+        checkpoint = CampaignCheckpoint(
+            filepath=self._checkpoint_filepath,
+            campaign="{}_{}".format(self._campaign_prefix,
+                                    slot.strftime("%Y%m%d_%H:%M:%S")),
+            slot=slot.isoformat())
+        checkpoint.save()
+        self.run_checkpoint(checkpoint)
+
+    def run_checkpoint(self, checkpoint: CampaignCheckpoint):
+        start_time = self._utcnow()
+        self._run_campaign(checkpoint.campaign, checkpoint)
+        checkpoint.finish()
+        print("Campaign {} executed from {} to {}".format(
+            checkpoint.campaign, start_time, self._utcnow()))
+
+    def wait_until(self, slot: datetime.datetime):
+        print("Next campaign at {} UTC, schedule {}".format(
+            slot, self._schedule))
+        while True:
+            remaining = (slot - self._utcnow()).total_seconds()
+            if remaining <= 0:
+                return
+            # Sleep in bounded steps, clock changes or a suspended host
+            # would otherwise delay the slot
+            self._sleep(min(remaining, SCHEDULER_MAX_SLEEP))
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+import shapely
+# internal imports
+from ..utils.constants import (
+    STATISTICS_PATH,
+    EARTH_RADIUS_KM,
+    HUNT_PHASES,
+    STATISTICS_AREA_PERCENTILES
+)
+from ..utils.common_functions import (
+    create_directory_structure,
+    countries_in_EEE_set
+)
+from .campaign_store import CampaignStore
+
+HUNTS_COLUMNS = [
+    "id", "campaign", "target", "origin_country", "timestamp",
+    "country_result", "city_result", "discs_intersect", "intersection_area"
+] + ["phase_" + phase for phase in HUNT_PHASES]
+
+
+def hunts_to_frame(hunts) -> pd.DataFrame:
+    """
+    :param hunts: iterable of hunts as returned by CampaignStore.query
+    :return: one row per hunt with its result, intersection area in km2
+        and phase latencies in seconds
+    """
+    columns = {column: [] for column in HUNTS_COLUMNS}
+    intersections = []
+    for hunt in hunts:
+        record = hunt["record"]
+        for key in ("id", "campaign", "target", "origin_country",
+                    "timestamp"):
+            columns[key].append(hunt[key])
+        columns["country_result"].append(record["result"]["country_result"])
+        columns["city_result"].append(record["result"]["city_result"])
+        columns["discs_intersect"].append(
+            record["result"]["advanced"]["discs_intersect"])
+        intersections.append(record["result"]["advanced"]["intersection"])
+        phase_timings = record.get("phase_timings", {})
+        for phase in HUNT_PHASES:
+            columns["phase_" + phase].append(
+                phase_timings.get(phase, np.nan))
+    columns["intersection_area"] = intersections_area(intersections)
+    return pd.DataFrame(columns, columns=HUNTS_COLUMNS)
+
+
+def intersections_area(intersections: list) -> np.ndarray:
+    """
+    :param intersections: GeoJSON polygons in degrees, None when there is
+        no intersection
+    :return: approximate areas in km2, NaN when there is no intersection
+    """
+    polygons = shapely.from_geojson(np.array(intersections, dtype=object))
+    latitudes = shapely.get_y(shapely.centroid(polygons))
+    km_per_degree = EARTH_RADIUS_KM * math.pi / 180
+    return shapely.area(polygons) * km_per_degree ** 2 * \
+        np.cos(np.radians(latitudes))
+
+
+def aggregate_hunts(hunts_frame: pd.DataFrame,
+                    keys: list = ("target", "origin_country")) -> dict:
+    """
+    :param keys: columns every aggregate is grouped by
+    :return: dict with the frames summary, country_results and
+        city_results
+    """
+    keys = list(keys)
+    frame = hunts_frame.copy()
+    # Hunts without origin country are grouped together, NaN keys would not
+    # align between aggregates
+    frame[keys] = frame[keys].fillna("")
+    frame["indeterminate"] = frame["country_result"] == "Indeterminate"
+    frame["determinate"] = ~frame["indeterminate"]
+    frame["outside_eee"] = frame["determinate"] & \
+        ~frame["country_result"].isin(countries_in_EEE_set())
+
+    groups = frame.groupby(keys)
+    summary = groups.agg(
+        hunts=("id", "size"),
+        indeterminate_rate=("indeterminate", "mean"),
+        discs_intersect_rate=("discs_intersect", "mean"),
+        determinate=("determinate", "sum"),
+        outside_eee=("outside_eee", "sum"),
+        first_timestamp=("timestamp", "min"),
+        last_timestamp=("timestamp", "max")
+    )
+    summary["outside_eee_share"] = \
+        summary["outside_eee"] / summary["determinate"].replace(0, np.nan)
+    summary = summary.drop(columns=["determinate", "outside_eee"])
+
+    area_percentiles = groups["intersection_area"].quantile(
+        list(STATISTICS_AREA_PERCENTILES)).unstack()
+    area_percentiles.columns = ["intersection_area_p{}".format(
+        int(percentile * 100)) for percentile in area_percentiles.columns]
+    phases = groups[["phase_" + phase for phase in HUNT_PHASES]].median()
+    phases.columns = [column + "_median" for column in phases.columns]
+    summary = summary.join(area_percentiles).join(phases).reset_index()
+
+    return {
+        "summary": summary,
+        "country_results": results_distribution(frame, keys,
+                                                "country_result"),
+        "city_results": results_distribution(frame, keys, "city_result")
+    }
+
+
+def results_distribution(frame: pd.DataFrame, keys: list,
+                         column: str) -> pd.DataFrame:
+    distribution = frame.groupby(keys + [column]).size()
+    distribution = distribution.rename("hunts").reset_index()
+    distribution["share"] = distribution["hunts"] / \
+        distribution.groupby(keys)["hunts"].transform("sum")
+    return distribution
+
+
+AGGREGATIONS = ((("target", "origin_country"), ""),
+                (("campaign", "target", "origin_country"), "campaigns_"))
+
+
+def merge_aggregate(aggregate: pd.DataFrame, updated: pd.DataFrame,
+                    keys: list) -> pd.DataFrame:
+    """
+    :param aggregate: previous aggregate, every group in updated is dropped
+        from it
+    :param updated: aggregate rows of the groups with new hunts
+    :return: rows of both sorted by keys
+    """
+    updated_groups = pd.MultiIndex.from_frame(updated[keys].drop_duplicates())
+    kept = ~pd.MultiIndex.from_frame(aggregate[keys]).isin(updated_groups)
+    merged = pd.concat([aggregate[kept], updated], ignore_index=True) \
+        if kept.any() else updated
+    return merged.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def write_frame_atomically(frame: pd.DataFrame, filepath: str):
+    temporary_filepath = filepath + ".tmp"
+    frame.to_csv(temporary_filepath, index=False)
+    os.replace(temporary_filepath, filepath)
+
+
+class CampaignStatistics:
+    """
+    Statistics of the hunts in a CampaignStore written to statistics_path.
+    Every update only reads the hunts stored since the previous one and
+    inserts them as compact rows in hunts.sqlite in a single transaction,
+    the last stored row id is where the next update resumes. Only the
+    groups with new hunts are aggregated again from those rows and merged
+    into the aggregate CSVs, which are replaced atomically before the rows
+    are committed, so an interrupted update is redone as a whole.
+    """
+
+    def __init__(self, campaign_store: CampaignStore = None,
+                 statistics_path: str = STATISTICS_PATH):
+        self._campaign_store = campaign_store if campaign_store is not None \
+            else CampaignStore()
+        self._statistics_path = statistics_path
+        database_filepath = os.path.join(statistics_path, "hunts.sqlite")
+        create_directory_structure(database_filepath)
+        self._connection = sqlite3.connect(database_filepath)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS hunts (
+                id INTEGER PRIMARY KEY,
+                campaign TEXT NOT NULL,
+                target TEXT NOT NULL,
+                origin_country TEXT NOT NULL,
+                timestamp REAL,
+                country_result TEXT,
+                city_result TEXT,
+                discs_intersect INTEGER,
+                intersection_area REAL,
+                {}
+            );
+            CREATE INDEX IF NOT EXISTS hunts_target
+                ON hunts (target, origin_country);
+            CREATE INDEX IF NOT EXISTS hunts_campaign
+                ON hunts (campaign, target, origin_country);
+        """.format(",\n".join("phase_{} REAL".format(phase)
+                               for phase in HUNT_PHASES)))
+
+    def get_aggregate_filepath(self, prefix: str, name: str) -> str:
+        return os.path.join(self._statistics_path,
+                            "{}{}.csv".format(prefix, name))
+
+    def get_last_hunt_id(self) -> int:
+        return self._connection.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM hunts").fetchone()[0]
+
+    def load_hunts(self, column: str = None, values: list = None) \
+            -> pd.DataFrame:
+        """
+        :param column: when given, only the hunts whose column is in values
+        :return: stored hunt rows, keys without value are ""
+        """
+        query = "SELECT {} FROM hunts".format(", ".join(HUNTS_COLUMNS))
+        if column is None:
+            return pd.read_sql_query(query, self._connection)
+
+        values = list(values)
+        frames = []
+        # SQLite limits the number of host parameters per statement
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            frame = pd.read_sql_query(
+                query + " WHERE {} IN ({})".format(
+                    column, ", ".join("?" * len(chunk))),
+                self._connection, params=chunk)
+            if len(frame) > 0:
+                frames.append(frame)
+        if len(frames) == 0:
+            return pd.DataFrame(columns=HUNTS_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def store_hunts(self, hunts: pd.DataFrame):
+        """
+        Insert the rows in one transaction, a crash leaves either all of
+        them or none stored.
+        """
+        rows = hunts[HUNTS_COLUMNS].astype(object)
+        rows = rows.where(rows.notna(), None)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO hunts ({}) VALUES ({})".format(
+                    ", ".join(HUNTS_COLUMNS),
+                    ", ".join("?" * len(HUNTS_COLUMNS))),
+                rows.itertuples(index=False, name=None))
+
+    def load_aggregate(self, filepath: str, keys: list) -> pd.DataFrame:
+        if not os.path.exists(filepath):
+            return None
+        aggregate = pd.read_csv(filepath, keep_default_na=False,
+                                na_values=[""])
+        aggregate[keys] = aggregate[keys].fillna("").astype(str)
+        return aggregate
+
+    def update(self) -> int:
+        """
+        Add the hunts stored since the last update and update the
+        aggregates of their groups.
+        :return: number of new hunts
+        """
+        new_hunts = hunts_to_frame(self._campaign_store.query(
+            after_id=self.get_last_hunt_id()))
+        if len(new_hunts) == 0:
+            return 0
+        new_hunts[["campaign", "target", "origin_country"]] = \
+            new_hunts[["campaign", "target", "origin_country"]].fillna("")
+        new_hunts["discs_intersect"] = \
+            new_hunts["discs_intersect"].astype(float)
+
+        for (keys, prefix) in AGGREGATIONS:
+            keys = list(keys)
+            # Stored hunts of the groups with new hunts, read through the
+            # index of the first key
+            hunts = self.load_hunts(keys[0], new_hunts[keys[0]].unique())
+            hunts = hunts.merge(new_hunts[keys].drop_duplicates(), on=keys)
+            hunts = pd.concat([hunts, new_hunts], ignore_index=True) \
+                if len(hunts) > 0 else new_hunts
+            for name, frame in aggregate_hunts(hunts, keys).items():
+                filepath = self.get_aggregate_filepath(prefix, name)
+                aggregate = self.load_aggregate(filepath, keys)
+                if aggregate is not None:
+                    frame = merge_aggregate(aggregate, frame, keys)
+                write_frame_atomically(frame, filepath)
+
+        self.store_hunts(new_hunts)
+        return len(new_hunts)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+# internal imports
+from ..utils.constants import (
+    CAMPAIGN_STORE_FILEPATH,
+    CAMPAIGN_STORE_FETCH_SIZE,
+    MEASUREMENTS_CAMPAIGNS_PATH
+)
+from ..utils.common_functions import (
+    create_directory_structure,
+    json_file_to_dict,
+    get_list_files_in_path,
+    get_list_folders_in_path
+)
+from .result_record import build_validation_view, split_validation_filepath
+
+
+def parse_hunt_filename(filename: str) -> (str, str):
+    """
+    :param filename: campaign filename like <target>_<country>.json
+    :return: (target, origin country) or (None, None) when not parseable
+    """
+    stem = filename[:-5] if filename.endswith(".json") else filename
+    if "_" not in stem:
+        return None, None
+    (target, country) = stem.rsplit("_", 1)
+    if len(country) != 2 or not country.isalpha():
+        return None, None
+    return target, country.upper()
+
+
+class CampaignStore:
+    """
+    Append-only store of hunt records in SQLite. Every record is kept as
+    zlib compressed JSON next to indexed campaign, target, origin country
+    and timestamp columns, so a whole campaign is written as it runs and
+    filtered afterwards without listing and parsing thousands of files.
+    """
+
+    def __init__(self, filepath: str = CAMPAIGN_STORE_FILEPATH):
+        create_directory_structure(filepath)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS hunts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                campaign TEXT NOT NULL,
+                target TEXT,
+                origin_country TEXT,
+                timestamp REAL NOT NULL,
+                source TEXT UNIQUE,
+                record BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS hunts_campaign
+                ON hunts (campaign, timestamp);
+            CREATE INDEX IF NOT EXISTS hunts_target
+                ON hunts (target, timestamp);
+            CREATE INDEX IF NOT EXISTS hunts_origin_country
+                ON hunts (origin_country, timestamp);
+            CREATE INDEX IF NOT EXISTS hunts_timestamp
+                ON hunts (timestamp);
+        """)
+        self._connection.commit()
+
+    def append(self, record: dict, campaign: str,
+               origin_country: str = None, timestamp: float = None,
+               source: str = None) -> bool:
+        """
+        :param source: unique origin of the record, records with a source
+            already stored are skipped
+        :return: True if the record was stored
+        """
+        if timestamp is None:
+            timestamp = record.get("timestamp") or time.time()
+        row = (campaign, record.get("target"), origin_country, timestamp,
+               source, zlib.compress(json.dumps(record).encode()))
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO hunts (campaign, target, "
+                "origin_country, timestamp, source, record) "
+                "VALUES (?, ?, ?, ?, ?, ?)", row)
+            self._connection.commit()
+        return cursor.rowcount == 1
+
+    def query(self, campaign: str = None, target: str = None,
+              origin_country: str = None, since: float = None,
+              until: float = None, after_id: int = None,
+              with_record: bool = True):
+        """
+        Stream the hunts matching every filter given, oldest first.
+        :param after_id: only the hunts stored after the one with this id
+        :return: iterator of dicts with id, campaign, target, origin_country,
+            timestamp and the decompressed record
+        """
+        (where, parameters) = self._build_filters(
+            campaign, target, origin_country, since, until, after_id)
+        columns = "id, campaign, target, origin_country, timestamp" + \
+            (", record" if with_record else "")
+        cursor = self._connection.cursor()
+        with self._lock:
+            cursor.execute(
+                "SELECT {} FROM hunts {} ORDER BY timestamp, id".format(
+                    columns, where), parameters)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(CAMPAIGN_STORE_FETCH_SIZE)
+            if len(rows) == 0:
+                break
+            for row in rows:
+                hunt = {
+                    "id": row[0],
+                    "campaign": row[1],
+                    "target": row[2],
+                    "origin_country": row[3],
+                    "timestamp": row[4]
+                }
+                if with_record:
+                    hunt["record"] = json.loads(zlib.decompress(row[5]))
+                yield hunt
+
+    def count(self, campaign: str = None, target: str = None,
+              origin_country: str = None, since: float = None,
+              until: float = None, after_id: int = None) -> int:
+        (where, parameters) = self._build_filters(
+            campaign, target, origin_country, since, until, after_id)
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM hunts {}".format(where),
+                parameters).fetchone()[0]
+
+    def get_campaigns(self) -> list:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT campaign FROM hunts ORDER BY campaign"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def import_campaign_directory(self, path: str,
+                                  campaign: str = None) -> int:
+        """
+        Import the hunts saved as JSON files in one campaign directory.
+        Canonical records are imported as they are, hunts saved as the four
+        legacy variant files are joined into one record with their views.
+        :param campaign: name stored, the directory name if not given
+        :return: number of hunts imported
+        """
+        if campaign is None:
+            campaign = os.path.basename(os.path.normpath(path))
+        hunts_files = {}
+        for filename in sorted(get_list_files_in_path(path)):
+            if not filename.endswith(".json"):
+                continue
+            (canonical_filename, suffix) = split_validation_filepath(filename)
+            hunts_files.setdefault(canonical_filename, {})[suffix] = \
+                os.path.join(path, filename)
+
+        imported = 0
+        for canonical_filename, files in hunts_files.items():
+            try:
+                record = self._join_hunt_files(files)
+            except Exception as e:
+                print("Hunt {} not imported: {}".format(canonical_filename, e))
+                continue
+            (target, origin_country) = parse_hunt_filename(canonical_filename)
+            if origin_country is None and record.get("additional_info"):
+                origin_country = record["additional_info"].get("country")
+            source = os.path.join(os.path.abspath(path), canonical_filename)
+            timestamp = record.get("timestamp") or min(
+                os.path.getmtime(filepath) for filepath in files.values())
+            if self.append(record, campaign=campaign,
+                           origin_country=origin_country,
+                           timestamp=timestamp, source=source):
+                imported += 1
+        return imported
+
+    def import_campaigns(self,
+                         path: str = MEASUREMENTS_CAMPAIGNS_PATH) -> int:
+        """
+        Import every campaign directory under path.
+        :return: number of hunts imported
+        """
+        return sum(self.import_campaign_directory(os.path.join(path, folder))
+                   for folder in sorted(get_list_folders_in_path(path)))
+
+    def _join_hunt_files(self, files: dict) -> dict:
+        if None in files:
+            return json_file_to_dict(files[None])
+        # The no_ip_validation variant is the one with every measurement
+        variants = {suffix: json_file_to_dict(filepath)
+                    for suffix, filepath in files.items()}
+        record = dict(variants.get("no_ip_validation",
+                                   next(iter(variants.values()))))
+        record["validation_views"] = {
+            suffix: build_validation_view(variant)
+            for suffix, variant in variants.items()
+        }
+        return record
+
+    def _build_filters(self, campaign, target, origin_country,
+                       since, until, after_id) -> (str, list):
+        conditions = []
+        parameters = []
+        for (column, value) in (("campaign", campaign),
+                                ("target", target),
+                                ("origin_country", origin_country)):
+            if value is not None:
+                conditions.append("{} = ?".format(column))
+                parameters.append(value)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(since)
+        if until is not None:
+            conditions.append("timestamp < ?")
+            parameters.append(until)
+        if after_id is not None:
+            conditions.append("id > ?")
+            parameters.append(after_id)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, parameters
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# internal imports
+from ..utils.constants import (
+    IPINFO_API_BASE_URL,
+    KEY_FILEPATH,
+    GEOLOCATION_CACHE_FILEPATH,
+    GEOLOCATION_CACHE_SIZE,
+    GEOLOCATION_CACHE_TTL,
+    IPINFO_BATCH_MAX_SIZE
+)
+from ..utils.common_functions import json_file_to_dict
+from ..utils.custom_exceptions import GeolocationNotFound
+from .persistent_cache import PersistentLruCache
+from .http_client import HttpClient, get_http_client
+from .ip_range_index import IpRangeIndex, get_ip_range_index
+
+
+def parse_ipinfo_loc(loc: str) -> dict:
+    (latitude, longitude) = loc.split(",")
+    return {
+        "latitude": latitude,
+        "longitude": longitude
+    }
+
+
+class IpGeolocationService:
+    """
+    IP geolocation shared by every hunt. The offline IP range index is
+    consulted first when available, the rest go to ipinfo through a
+    persistent cache where found and not found answers are kept for ttl
+    seconds, cache misses are resolved with the ipinfo batch endpoint.
+    """
+
+    def __init__(self,
+                 http_client: HttpClient = None,
+                 access_token: str = None,
+                 cache_filepath: str = GEOLOCATION_CACHE_FILEPATH,
+                 max_size: int = GEOLOCATION_CACHE_SIZE,
+                 ttl: float = GEOLOCATION_CACHE_TTL,
+                 ip_range_index: IpRangeIndex = None):
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._access_token = access_token
+        self._ip_range_index = ip_range_index if ip_range_index is not None \
+            else get_ip_range_index()
+        self._cache = PersistentLruCache(filepath=cache_filepath,
+                                         table="ip_geolocations",
+                                         max_size=max_size,
+                                         ttl=ttl)
+
+    def get_access_token(self) -> str:
+        if self._access_token is None:
+            self._access_token = \
+                json_file_to_dict(KEY_FILEPATH)["ipinfo_token"]
+        return self._access_token
+
+    def geolocate(self, ip: str) -> dict:
+        """
+        :return: {"latitude", "longitude"} as returned by ipinfo
+        :raise GeolocationNotFound: when ipinfo has no location for ip
+        """
+        location = self.geolocate_many([ip]).get(ip)
+        if location is None:
+            raise GeolocationNotFound(ip)
+        return location
+
+    def geolocate_host(self) -> dict:
+        """
+        Location ipinfo gives to the public IP of this host, or of the VPN
+        exit when connected. It is never cached, it changes with the VPN.
+        :raise GeolocationNotFound: when ipinfo has no location for it
+        """
+        details = self._http_client.get(
+            "{}json".format(IPINFO_API_BASE_URL),
+            headers={"Authorization": "Bearer {}".format(
+                self.get_access_token())}
+        ).json()
+        if not details.get("loc"):
+            raise GeolocationNotFound(details.get("error", "host"))
+        return parse_ipinfo_loc(details["loc"])
+
+    def geolocate_many(self, ips: list) -> dict:
+        """
+        :return: dict ip -> location for the ips with a known location
+        """
+        ips = [ip for ip in dict.fromkeys(ips) if ip not in ("", "*")]
+        locations = {}
+        if self._ip_range_index is not None:
+            locations.update(self._ip_range_index.lookup_many(ips))
+            ips = [ip for ip in ips if ip not in locations]
+        locations.update(self._cache.get_many(ips))
+        missing = [ip for ip in ips if ip not in locations]
+        if len(missing) > 0:
+            fetched = self.fetch_locations(missing)
+            self._cache.put_many(fetched)
+            locations.update(fetched)
+        return {ip: location for ip, location in locations.items()
+                if location is not None}
+
+    def fetch_locations(self, ips: list) -> dict:
+        """
+        :return: dict ip -> location or None when ipinfo answered without
+            location, ips that could not be queried are left out
+        """
+        locations = {}
+        for start in range(0, len(ips), IPINFO_BATCH_MAX_SIZE):
+            chunk = ips[start:start + IPINFO_BATCH_MAX_SIZE]
+            try:
+                if len(chunk) == 1:
+                    locations.update(self._fetch_location(chunk[0]))
+                else:
+                    locations.update(self._fetch_batch(chunk))
+            except Exception as e:
+                print("Geolocation of {} failed: {}".format(chunk, e))
+        return locations
+
+    def _fetch_location(self, ip: str) -> dict:
+        details = self._http_client.get(
+            "{}{}/json".format(IPINFO_API_BASE_URL, ip),
+            headers={"Authorization": "Bearer {}".format(
+                self.get_access_token())}
+        ).json()
+        if "error" in details and "loc" not in details:
+            raise GeolocationNotFound(details["error"])
+        loc = details.get("loc")
+        return {ip: parse_ipinfo_loc(loc) if loc else None}
+
+    def _fetch_batch(self, ips: list) -> dict:
+        response = self._http_client.post(
+            "{}batch".format(IPINFO_API_BASE_URL),
+            json=["{}/loc".format(ip) for ip in ips],
+            headers={"Authorization": "Bearer {}".format(
+                self.get_access_token())}
+        ).json()
+        locations = {}
+        for ip in ips:
+            loc = response.get("{}/loc".format(ip))
+            if isinstance(loc, str) and loc != "":
+                locations[ip] = parse_ipinfo_loc(loc)
+            elif isinstance(loc, dict):
+                # Bogon or unknown address, ipinfo has no location for it
+                locations[ip] = None
+        return locations
+
+
+__geolocation_service = None
+
+
+def get_geolocation_service() -> IpGeolocationService:
+    global __geolocation_service
+    if __geolocation_service is None:
+        __geolocation_service = IpGeolocationService()
+    return __geolocation_service
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import socket
+import threading
+# internal imports
+from ..utils.constants import HOST_ROUTE_CHECK_ADDRESS
+
+
+def get_host_source_address() -> str:
+    """
+    Local address of the default route, it changes when a VPN connects or
+    the host moves to another network. Connecting a UDP socket only selects
+    the route, no packet is sent.
+    :return: source address, None if the host has no route
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as route_socket:
+            route_socket.connect((HOST_ROUTE_CHECK_ADDRESS, 53))
+            return route_socket.getsockname()[0]
+    except OSError:
+        return None
+
+
+def locate_public_ip() -> (str, (float, float)):
+    """
+    :return: (public IP, (latitude, longitude)) of the host
+    """
+    # geocoder pulls requests and its providers, import it only when used
+    import geocoder
+
+    location = geocoder.ip("me")
+    return location.ip, tuple(location.latlng)
+
+
+class HostLocationProvider:
+    """
+    Public IP of the host and its location shared by every Hunter. They
+    are resolved once and kept while the default route source address
+    stays the same, invalidate() forces a new resolution, e.g. after
+    connecting a VPN whose tunnel address may repeat between servers.
+    """
+
+    def __init__(self, locate=locate_public_ip,
+                 get_network_key=get_host_source_address):
+        self._locate = locate
+        self._get_network_key = get_network_key
+        self._lock = threading.Lock()
+        self._public_ip = None
+        self._location = None
+        self._network_key = None
+
+    def resolve(self) -> (str, (float, float)):
+        """
+        :return: (public IP, (latitude, longitude)), (None, (0, 0)) when
+            they can not be resolved
+        """
+        network_key = self._get_network_key()
+        with self._lock:
+            if self._location is None or network_key != self._network_key:
+                try:
+                    (self._public_ip, self._location) = self._locate()
+                    self._network_key = network_key
+                except Exception as e:
+                    # Failures are not kept, next hunt tries again
+                    print("Host location failed: {}".format(e))
+                    return None, (0, 0)
+            return self._public_ip, self._location
+
+    def get_location(self) -> (float, float):
+        return self.resolve()[1]
+
+    def get_public_ip(self) -> str:
+        return self.resolve()[0]
+
+    def invalidate(self):
+        with self._lock:
+            self._location = None
+
+
+__host_location_provider = None
+
+
+def get_host_location_provider() -> HostLocationProvider:
+    global __host_location_provider
+    if __host_location_provider is None:
+        __host_location_provider = HostLocationProvider()
+    return __host_location_provider
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+# internal imports
+from ..utils.constants import (
+    HTTP_TIMEOUT,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE
+)
+
+
+class HttpClient:
+    """
+    requests.Session shared by every RIPE Atlas, ipinfo and target request.
+    Connections are kept alive in per-host pools of at most pool_maxsize
+    sockets, requests get a default timeout and idempotent ones are retried
+    with exponential backoff. POSTs are only retried when the connection
+    could not be opened, so a measurement is never submitted twice.
+    """
+
+    def __init__(self,
+                 timeout: float = HTTP_TIMEOUT,
+                 retries: int = HTTP_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                 pool_connections: int = HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE):
+        self._timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(max_retries=retry,
+                              pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              pool_block=True)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        with self._lock:
+            self._counters[(method.upper(), urlsplit(url).hostname)] += 1
+        return self._session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self) -> dict:
+        """
+        :return: dict "METHOD host" -> number of requests sent
+        """
+        with self._lock:
+            return {"{} {}".format(method, host): count
+                    for (method, host), count in self._counters.items()}
+
+    def close(self):
+        self._session.close()
+
+
+__http_client = None
+
+
+def get_http_client() -> HttpClient:
+    global __http_client
+    if __http_client is None:
+        __http_client = HttpClient()
+    return __http_client
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from shapely import Geometry, from_geojson
+# internal imports
+from ..utils.common_functions import (
+    check_all_discs_intersect,
+    get_distances_from_rtts,
+    calculate_hunter_pings_intersection_area,
+    get_nearest_airport_to_point
+)
+from ..utils.airport_catalog import get_airport_catalog
+from ..utils.rtt_distance import RttDistanceInverter
+from .traceroute_runner import parse_traceroute_line
+
+
+def build_empty_result() -> dict:
+    return {
+        "country_result": "Indeterminate",
+        "city_result": "Indeterminate",
+        "advanced": {
+            "countries_list": [],
+            "cities_list": [],
+            "airports_list": [],
+            "discs_intersect": False,
+            "intersection": None,
+            "centroid": None
+        }
+    }
+
+
+def build_hops_directions_list(traceroute: list,
+                               traceroute_from_host: bool) -> list:
+    """
+    :param traceroute: host traceroute output lines or RIPE Atlas
+        traceroute results
+    :return: list with the distinct IPs answering every hop, "*" for
+        the hops without answer
+    """
+    directions_list = []
+    if traceroute_from_host:
+        for line in traceroute:
+            hop = parse_traceroute_line(line)
+            directions_list.append(hop.get_directions()
+                                   if hop is not None else [])
+    else:
+        for hop in traceroute[0]["result"]:
+            hop_directions = []
+            for hop_result in hop["result"]:
+                if "x" in hop_result.keys():
+                    hop_directions.append("*")
+                else:
+                    hop_directions.append(hop_result["from"])
+            hop_directions = list(dict.fromkeys(hop_directions))
+            directions_list.append(hop_directions)
+    return directions_list
+
+
+def build_ping_discs(pings: list, probes_locations: dict,
+                     rtt_distance_inverter: RttDistanceInverter = None) \
+        -> list:
+    """
+    :param probes_locations: dict probe_id -> dict with latitude and
+        longitude of the probes in pings, pings from probes missing or
+        without coordinates are skipped
+    :param rtt_distance_inverter: RTT to distance model, the shared one
+        if not given
+    """
+    located_pings = []
+    for ping_result in pings:
+        probe_location = probes_locations.get(ping_result["prb_id"])
+        if probe_location is None or \
+                probe_location.get("latitude") is None or \
+                probe_location.get("longitude") is None:
+            print("Ping from probe {} skipped, its location is "
+                  "unknown".format(ping_result["prb_id"]))
+            continue
+        located_pings.append(ping_result)
+    pings = located_pings
+
+    pings_radius = get_distances_from_rtts(
+        [ping_result["min"] for ping_result in pings],
+        rtt_distance_inverter=rtt_distance_inverter)
+    ping_discs = []
+    for ping_result, ping_radius in zip(pings, pings_radius):
+        probe_location = probes_locations[ping_result["prb_id"]]
+        ping_discs.append({
+            "probe_id": ping_result["prb_id"],
+            "latitude": probe_location["latitude"],
+            "longitude": probe_location["longitude"],
+            "rtt_min": ping_result["min"],
+            "radius": ping_radius
+        })
+    return ping_discs
+
+
+def check_ping_discs_intersect(ping_discs: list) -> bool:
+    if all(ping["radius"] == -1 for ping in ping_discs):
+        return False
+    return check_all_discs_intersect(ping_discs)
+
+
+def locate_airports_inside_intersection(intersection: Geometry,
+                                        centroid: str,
+                                        ping_discs: list) -> dict:
+    """
+    :param intersection: prepared discs intersection geometry, as given by
+        calculate_hunter_pings_intersection_area
+    :param centroid: GeoJSON of the discs intersection centroid, its
+        nearest airport is the answer when no airport is inside the
+        intersection
+    :param ping_discs: discs of the intersection, a disc with radius -1
+        leaves no airport inside, as the test against every disc did
+    :return: dict with city_result, country_result, cities_list,
+        countries_list and airports_list
+    """
+    airports_catalog = get_airport_catalog()
+    if any(disc["radius"] == -1 for disc in ping_discs):
+        airports_inside = []
+    else:
+        airports_inside = airports_catalog.airports_inside_polygon(
+            intersection)
+    airports_inside_df = \
+        airports_catalog.airports_df.iloc[airports_inside].copy()
+
+    cities_results = list(airports_inside_df["city"].unique())
+    countries_results = list(airports_inside_df["country_code"].unique())
+    airports_inside_df.rename(columns={"#IATA": "IATA_code"}, inplace=True)
+    airports_located = airports_inside_df.to_dict("records")
+    for airport_located in airports_located:
+        (lat, lon) = airport_located["lat long"].split(" ")
+        airport_located["latitude"] = float(lat)
+        airport_located["longitude"] = float(lon)
+        airport_located.pop("lat long", None)
+
+    if len(airports_located) == 0 and centroid is not None:
+        airports_located = [get_nearest_airport_to_point(
+            point=from_geojson(centroid))]
+        cities_results = [airports_located[0]["city"]]
+        countries_results = [airports_located[0]["country_code"]]
+
+    return {
+        "city_result": cities_results[0]
+        if len(cities_results) == 1 else "Indeterminate",
+        "country_result": countries_results[0]
+        if len(countries_results) == 1 else "Indeterminate",
+        "cities_list": cities_results,
+        "countries_list": countries_results,
+        "airports_list": airports_located
+    }
+
+
+def analyse_ping_discs(ping_discs: list) -> dict:
+    """
+    Hunt result from the ping discs alone: their intersection, its
+    centroid and the airports, cities and countries inside it.
+    """
+    result = build_empty_result()
+    if not check_ping_discs_intersect(ping_discs):
+        return result
+
+    result["advanced"]["discs_intersect"] = True
+    intersection_info = calculate_hunter_pings_intersection_area(ping_discs)
+    result["advanced"]["intersection"] = intersection_info["intersection"]
+    result["advanced"]["centroid"] = intersection_info["centroid"]
+
+    airports_info = locate_airports_inside_intersection(
+        intersection_info["geometry"], intersection_info["centroid"],
+        ping_discs)
+    result["city_result"] = airports_info["city_result"]
+    result["country_result"] = airports_info["country_result"]
+    for key in ("cities_list", "countries_list", "airports_list"):
+        result["advanced"][key] = airports_info[key]
+    return result
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import itertools
+import time
+# internal imports
+from ..utils.constants import (
+    KEY_FILEPATH,
+    RESULTS_QUORUM
+)
+from ..utils.common_functions import json_file_to_dict
+from ..utils.airport_catalog import get_airport_catalog
+from ..utils.rtt_distance import get_rtt_distance_inverter
+from ..old_hunter.hunter import Hunter
+from .http_client import HttpClient, get_http_client
+from .probe_catalog import ProbeCatalog, get_probe_catalog
+from .probe_cache import ProbeCache, get_probe_cache
+from .result_poller import MeasurementResultsPoller
+from .measurement_batcher import MeasurementBatcher
+from .geolocation import IpGeolocationService, get_geolocation_service
+from .host_location import HostLocationProvider, get_host_location_provider
+from .traceroute_cache import (
+    CachedTracerouteRunner,
+    get_cached_traceroute_runner
+)
+from .result_record import materialize_validation_variant
+
+
+class HuntResult:
+    """
+    Result of one hunt, independent of the pipeline that produced it.
+    """
+
+    def __init__(self, record: dict):
+        self.record = record
+
+    @property
+    def target(self) -> str:
+        return self.record["target"]
+
+    @property
+    def country_result(self) -> str:
+        return self.record["result"]["country_result"]
+
+    @property
+    def city_result(self) -> str:
+        return self.record["result"]["city_result"]
+
+    def get_validation_variant(self, suffix: str) -> dict:
+        """
+        :param suffix: one of VALIDATION_SUFFIXES
+        """
+        return materialize_validation_variant(self.record, suffix)
+
+    def to_dict(self) -> dict:
+        return self.record
+
+
+class HuntPipeline:
+    """
+    Long-lived hunt pipeline. Credentials, HTTP session, probe catalog,
+    caches and lookups are set up once, every hunt() call keeps its state
+    in its own Hunter and returns an independent HuntResult, so the same
+    pipeline can run hunts from several threads at the same time.
+    """
+
+    def __init__(self,
+                 http_client: HttpClient = None,
+                 probe_catalog: ProbeCatalog = None,
+                 probe_cache: ProbeCache = None,
+                 measurement_batcher: MeasurementBatcher = None,
+                 geolocation_service: IpGeolocationService = None,
+                 host_location_provider: HostLocationProvider = None,
+                 ripe_key: str = None,
+                 results_quorum: float = RESULTS_QUORUM,
+                 results_poller: MeasurementResultsPoller = None,
+                 traceroute_runner: CachedTracerouteRunner = None):
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._probe_catalog = probe_catalog if probe_catalog is not None \
+            else get_probe_catalog()
+        self._probe_cache = probe_cache if probe_cache is not None \
+            else get_probe_cache()
+        self._measurement_batcher = measurement_batcher
+        self._geolocation_service = geolocation_service \
+            if geolocation_service is not None \
+            else get_geolocation_service()
+        self._host_location_provider = host_location_provider \
+            if host_location_provider is not None \
+            else get_host_location_provider()
+        self._traceroute_runner = traceroute_runner \
+            if traceroute_runner is not None \
+            else get_cached_traceroute_runner()
+        self._ripe_key = ripe_key if ripe_key is not None \
+            else json_file_to_dict(KEY_FILEPATH)["ripe_token"]
+        self._results_poller = results_poller \
+            if results_poller is not None \
+            else MeasurementResultsPoller(http_client=self._http_client)
+        self._results_quorum = results_quorum
+        self._hunt_counter = itertools.count()
+        # Build shared lookups once, before concurrent hunts race to do it
+        get_airport_catalog()
+        get_rtt_distance_inverter()
+
+    def get_ripe_key(self) -> str:
+        return self._ripe_key
+
+    def hunt(self, target: str, origin: (float, float) = (),
+             save_to_file: bool = False, output_filename: str = None,
+             **hunt_options) -> HuntResult:
+        """
+        :param origin: (latitude, longitude), the host location if empty
+        :param save_to_file: also write the record under MEASUREMENTS_PATH,
+            the returned HuntResult is the result otherwise
+        :param output_filename: file of the record, one unique to this hunt
+            from target and time if not given, so concurrent hunts never
+            write the same file
+        :param hunt_options: check_cf_ray, gt_info, additional_info and
+            probe_selection_seed, as accepted by Hunter
+        """
+        if output_filename is None:
+            output_filename = "{}_{}_{}.json".format(
+                target, time.time_ns(), next(self._hunt_counter))
+        hunter = Hunter(target=target,
+                        origin=origin,
+                        save_to_file=save_to_file,
+                        output_filename=output_filename,
+                        probe_catalog=self._probe_catalog,
+                        probe_cache=self._probe_cache,
+                        http_client=self._http_client,
+                        results_poller=self._results_poller,
+                        results_quorum=self._results_quorum,
+                        measurement_batcher=self._measurement_batcher,
+                        geolocation_service=self._geolocation_service,
+                        host_location_provider=self._host_location_provider,
+                        ripe_key=self._ripe_key,
+                        traceroute_runner=self._traceroute_runner,
+                        **hunt_options)
+        hunter.hunt()
+        return HuntResult(hunter.get_hunt_record())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import csv
+import ipaddress
+import os
+import numpy as np
+# internal imports
+from ..utils.constants import IP_RANGE_INDEX_PATH
+
+
+def _split_ipv6(ip_int: int) -> (int, int):
+    return ip_int >> 64, ip_int & ((1 << 64) - 1)
+
+
+def _format_coordinate(value: float) -> str:
+    # Same register as ipinfo, which answers coordinates as strings
+    return str(round(float(value), 4))
+
+
+def build_ip_range_index(csv_filepath: str,
+                         index_path: str = IP_RANGE_INDEX_PATH,
+                         start_column="start_ip",
+                         end_column="end_ip",
+                         latitude_column="latitude",
+                         longitude_column="longitude",
+                         has_header: bool = True) -> dict:
+    """
+    Build the offline index from a CSV dump of IP ranges with coordinates,
+    like the ipinfo, DB-IP or IP2Location city dumps.
+    :param start_column: column name, or index when has_header is False
+    :return: number of IPv4 and IPv6 ranges indexed
+    """
+    ipv4_rows = []
+    ipv6_rows = []
+    with open(csv_filepath, newline="") as file:
+        reader = csv.DictReader(file) if has_header else csv.reader(file)
+        for row in reader:
+            try:
+                start = ipaddress.ip_address(row[start_column].strip())
+                end = ipaddress.ip_address(row[end_column].strip())
+                latitude = float(row[latitude_column])
+                longitude = float(row[longitude_column])
+            except (ValueError, KeyError, IndexError):
+                continue
+            if start.version != end.version:
+                continue
+            if start.version == 4:
+                ipv4_rows.append((int(start), int(end), latitude, longitude))
+            else:
+                ipv6_rows.append((int(start), int(end), latitude, longitude))
+
+    ipv4_rows.sort()
+    ipv6_rows.sort()
+    os.makedirs(index_path, exist_ok=True)
+    np.save(os.path.join(index_path, "ipv4_starts.npy"),
+            np.array([row[0] for row in ipv4_rows], dtype=np.uint32))
+    np.save(os.path.join(index_path, "ipv4_ends.npy"),
+            np.array([row[1] for row in ipv4_rows], dtype=np.uint32))
+    np.save(os.path.join(index_path, "ipv4_locations.npy"),
+            np.array([row[2:] for row in ipv4_rows],
+                     dtype=float).reshape(-1, 2))
+
+    for (name, values) in (("starts", [row[0] for row in ipv6_rows]),
+                           ("ends", [row[1] for row in ipv6_rows])):
+        halves = [_split_ipv6(value) for value in values]
+        np.save(os.path.join(index_path, "ipv6_{}_high.npy".format(name)),
+                np.array([half[0] for half in halves], dtype=np.uint64))
+        np.save(os.path.join(index_path, "ipv6_{}_low.npy".format(name)),
+                np.array([half[1] for half in halves], dtype=np.uint64))
+    np.save(os.path.join(index_path, "ipv6_locations.npy"),
+            np.array([row[2:] for row in ipv6_rows],
+                     dtype=float).reshape(-1, 2))
+
+    return {"ipv4": len(ipv4_rows), "ipv6": len(ipv6_rows)}
+
+
+class IpRangeIndex:
+    """
+    Offline IP range -> location lookup. Ranges are kept in sorted integer
+    arrays memory-mapped from disk and found by binary search, IPv6
+    addresses are compared as (high, low) 64 bit halves.
+    """
+
+    def __init__(self, index_path: str = IP_RANGE_INDEX_PATH):
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(index_path, name + ".npy"),
+                           mmap_mode="r")
+
+        self._ipv4_starts = load("ipv4_starts")
+        self._ipv4_ends = load("ipv4_ends")
+        self._ipv4_locations = load("ipv4_locations")
+        self._ipv6_starts_high = load("ipv6_starts_high")
+        self._ipv6_starts_low = load("ipv6_starts_low")
+        self._ipv6_ends_high = load("ipv6_ends_high")
+        self._ipv6_ends_low = load("ipv6_ends_low")
+        self._ipv6_locations = load("ipv6_locations")
+
+    def __len__(self) -> int:
+        return len(self._ipv4_starts) + len(self._ipv6_starts_high)
+
+    def lookup(self, ip: str) -> dict:
+        """
+        :return: {"latitude", "longitude"} or None if no range contains ip
+        """
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        if address.version == 4:
+            position = self._find_ipv4(int(address))
+            locations = self._ipv4_locations
+        else:
+            position = self._find_ipv6(int(address))
+            locations = self._ipv6_locations
+        if position is None:
+            return None
+        return {
+            "latitude": _format_coordinate(locations[position][0]),
+            "longitude": _format_coordinate(locations[position][1])
+        }
+
+    def lookup_many(self, ips: list) -> dict:
+        """
+        :return: dict ip -> location for the ips inside an indexed range
+        """
+        locations = {}
+        for ip in ips:
+            location = self.lookup(ip)
+            if location is not None:
+                locations[ip] = location
+        return locations
+
+    def _find_ipv4(self, ip_int: int):
+        position = np.searchsorted(self._ipv4_starts, ip_int,
+                                   side="right") - 1
+        if position < 0 or self._ipv4_ends[position] < ip_int:
+            return None
+        return position
+
+    def _find_ipv6(self, ip_int: int):
+        (high, low) = _split_ipv6(ip_int)
+        high = np.uint64(high)
+        low = np.uint64(low)
+        # Ranges starting with the same high half, then by the low half
+        left = np.searchsorted(self._ipv6_starts_high, high, side="left")
+        right = np.searchsorted(self._ipv6_starts_high, high, side="right")
+        position = left + np.searchsorted(
+            self._ipv6_starts_low[left:right], low, side="right") - 1
+        if position < 0:
+            return None
+        end_high = self._ipv6_ends_high[position]
+        end_low = self._ipv6_ends_low[position]
+        if end_high < high or (end_high == high and end_low < low):
+            return None
+        return position
+
+
+__ip_range_index = None
+
+
+def get_ip_range_index() -> IpRangeIndex:
+    """
+    :return: index at IP_RANGE_INDEX_PATH, None when it was never built
+    """
+    global __ip_range_index
+    if __ip_range_index is None and \
+            os.path.exists(os.path.join(IP_RANGE_INDEX_PATH,
+                                        "ipv4_starts.npy")):
+        __ip_range_index = IpRangeIndex()
+    return __ip_range_index
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import threading
+from concurrent.futures import Future
+# internal imports
+from ..utils.constants import (
+    MEASUREMENT_BATCH_WINDOW,
+    MEASUREMENT_BATCH_MAX_SIZE
+)
+from ..utils.custom_exceptions import RequestSubmissionError
+from .http_client import HttpClient, get_http_client
+
+
+class MeasurementBatcher:
+    """
+    Packs the measurement definitions submitted by concurrent hunts into
+    shared RIPE Atlas POSTs. The probes of a request apply to all of its
+    definitions, so only definitions with the same probes are packed
+    together. Each submitter gets back the id of its own measurement.
+    """
+
+    def __init__(self, url: str,
+                 http_client: HttpClient = None,
+                 window: float = MEASUREMENT_BATCH_WINDOW,
+                 max_size: int = MEASUREMENT_BATCH_MAX_SIZE):
+        """
+        :param url: measurements creation url, including the API key
+        :param window: seconds a definition waits for others to join
+        :param max_size: definitions packed in one request at most
+        """
+        self._url = url
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._window = window
+        self._max_size = max_size
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def submit(self, definition: dict, probes: list) -> Future:
+        """
+        :return: future resolved with the measurement id
+        """
+        future = Future()
+        batch = []
+        with self._lock:
+            self._pending.append((definition, probes, future))
+            if len(self._pending) >= self._max_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(batch)
+        return future
+
+    def submit_measurement(self, data: dict) -> list:
+        """
+        Blocking helper taking the same body make_ripe_measurement posts.
+        :return: measurement ids in the order of data["definitions"]
+        """
+        futures = [self.submit(definition, data["probes"])
+                   for definition in data["definitions"]]
+        return [future.result() for future in futures]
+
+    def flush(self):
+        with self._lock:
+            batch = self._take_pending()
+        self._send(batch)
+
+    def _take_pending(self) -> list:
+        batch = self._pending
+        self._pending = []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _send(self, batch: list):
+        groups = {}
+        for (definition, probes, future) in batch:
+            probes_key = json.dumps(probes, sort_keys=True)
+            groups.setdefault(probes_key, (probes, []))[1].append(
+                (definition, future))
+
+        for (probes, submissions) in groups.values():
+            for start in range(0, len(submissions), self._max_size):
+                self._post(probes, submissions[start:start + self._max_size])
+
+    def _post(self, probes: list, submissions: list):
+        data = {
+            "definitions": [definition for (definition, _) in submissions],
+            "probes": probes
+        }
+        response = {}
+        try:
+            response = self._http_client.post(self._url, json=data).json()
+            measurement_ids = response["measurements"]
+            if len(measurement_ids) != len(submissions):
+                raise RequestSubmissionError(response)
+        except Exception as e:
+            print("Batch of {} measurements could not start: {}".format(
+                len(submissions), e))
+            error = e if isinstance(e, RequestSubmissionError) \
+                else RequestSubmissionError(response)
+            for (_, future) in submissions:
+                future.set_exception(error)
+            return
+
+        print("Batch of {} measurements started".format(len(submissions)))
+        for (_, future), measurement_id in zip(submissions, measurement_ids):
+            future.set_result(measurement_id)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+# internal imports
+from ..utils.common_functions import create_directory_structure
+
+
+class PersistentLruCache:
+    """
+    Key-value cache with an in-memory LRU in front of a SQLite table.
+    Values are stored as JSON and expire ttl seconds after being written,
+    entries never expire when ttl is None.
+    """
+
+    def __init__(self, filepath: str, table: str, max_size: int,
+                 ttl: float = None):
+        self._table = table
+        self._max_size = max_size
+        self._ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        create_directory_structure(filepath)
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS {} ("
+            "key PRIMARY KEY, value TEXT, updated_at REAL NOT NULL)".format(
+                table))
+        self._connection.commit()
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys: list) -> dict:
+        """
+        :return: dict key -> value for the keys cached and not expired
+        """
+        found = {}
+        missing = []
+        now = time.time()
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None and not self._is_expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    missing.append(key)
+
+            # SQLite limits the number of host parameters per statement
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._connection.execute(
+                    "SELECT key, value, updated_at FROM {} "
+                    "WHERE key IN ({})".format(self._table,
+                                               ",".join("?" * len(chunk))),
+                    chunk).fetchall()
+                for (key, value, updated_at) in rows:
+                    if self._is_expired(updated_at, now):
+                        continue
+                    value = json.loads(value)
+                    self._remember(key, value, updated_at)
+                    found[key] = value
+        return found
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def put_many(self, items: dict):
+        if len(items) == 0:
+            return
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value, now)
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO {} (key, value, updated_at) "
+                "VALUES (?, ?, ?)".format(self._table),
+                [(key, json.dumps(value), now)
+                 for key, value in items.items()])
+            self._connection.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._connection.execute(
+                "DELETE FROM {} WHERE key = ?".format(self._table), (key,))
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._connection.execute("DELETE FROM {}".format(self._table))
+            self._connection.commit()
+
+    def _is_expired(self, updated_at: float, now: float) -> bool:
+        return self._ttl is not None and now - updated_at > self._ttl
+
+    def _remember(self, key, value, updated_at: float):
+        self._memory[key] = (value, updated_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import copy
+# internal imports
+from ..utils.constants import (
+    RIPESTAT_NETWORK_INFO_URL,
+    ANNOUNCED_PREFIXES_CACHE_FILEPATH,
+    ANNOUNCED_PREFIXES_CACHE_SIZE,
+    ANNOUNCED_PREFIXES_CACHE_TTL,
+    PREFIX_GROUP_SPOT_CHECKS
+)
+from .persistent_cache import PersistentLruCache
+from .http_client import HttpClient, get_http_client
+from .hunt_pipeline import HuntResult
+from .async_hunter import AsyncHuntEngine
+from .traceroute_cache import get_target_prefix
+
+
+class AnnouncedPrefixResolver:
+    """
+    BGP prefix announcing every IP, as seen by RIPEstat, kept in a
+    persistent cache for ttl seconds. IPs without an announced prefix or
+    that could not be resolved fall back to their /24 or /48.
+    """
+
+    def __init__(self,
+                 http_client: HttpClient = None,
+                 cache_filepath: str = ANNOUNCED_PREFIXES_CACHE_FILEPATH,
+                 max_size: int = ANNOUNCED_PREFIXES_CACHE_SIZE,
+                 ttl: float = ANNOUNCED_PREFIXES_CACHE_TTL):
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._cache = PersistentLruCache(filepath=cache_filepath,
+                                         table="announced_prefixes",
+                                         max_size=max_size,
+                                         ttl=ttl)
+
+    def resolve_many(self, ips: list) -> dict:
+        """
+        :return: dict ip -> prefix
+        """
+        prefixes = self._cache.get_many(ips)
+        fetched = {}
+        for ip in dict.fromkeys(ips):
+            if ip in prefixes:
+                continue
+            try:
+                fetched[ip] = self.fetch_prefix(ip)
+            except Exception as e:
+                print("Announced prefix of {} failed: {}".format(ip, e))
+        self._cache.put_many(fetched)
+        prefixes.update(fetched)
+        return {ip: prefixes.get(ip) or get_target_prefix(ip) or ip
+                for ip in ips}
+
+    def fetch_prefix(self, ip: str) -> str:
+        """
+        :return: announced prefix, "" when ip is not announced
+        """
+        response = self._http_client.get(
+            RIPESTAT_NETWORK_INFO_URL, params={"resource": ip})
+        response.raise_for_status()
+        return response.json()["data"].get("prefix") or ""
+
+
+class HuntGroup:
+    """
+    Targets announced in the same prefix. Only the representative and the
+    spot checks are hunted while the group is confirmed, the rest of the
+    targets take the representative result.
+    """
+
+    def __init__(self, prefix: str, targets: list):
+        self.prefix = prefix
+        self.targets = targets
+
+    @property
+    def representative(self) -> str:
+        return self.targets[0]
+
+    def get_spot_checks(self, spot_checks: int) -> list:
+        """
+        :return: up to spot_checks members spread over the group
+        """
+        return spread_targets(self.targets[1:], spot_checks)
+
+
+class LastHopHuntGroup(HuntGroup):
+    """
+    Prefix groups whose representatives agree through the same last hop,
+    confirmed as a single group. The first representative stands for all
+    the targets, the other representatives are spot checks along with
+    spot_checks members spread over all the prefixes.
+    """
+
+    def __init__(self, last_hop: str, groups: list):
+        self.last_hop = last_hop
+        self.groups = groups
+        super().__init__(
+            prefix=" ".join(group.prefix for group in groups),
+            targets=[group.representative for group in groups] +
+            [target for group in groups for target in group.targets[1:]])
+
+    def get_spot_checks(self, spot_checks: int) -> list:
+        representatives = self.targets[1:len(self.groups)]
+        return representatives + spread_targets(
+            self.targets[len(self.groups):], spot_checks)
+
+
+def spread_targets(targets: list, count: int) -> list:
+    """
+    :return: up to count targets evenly spread over targets
+    """
+    count = min(count, len(targets))
+    return [targets[(i + 1) * len(targets) // count - 1]
+            for i in range(count)]
+
+
+def group_targets_by_prefix(targets: list, prefixes: dict) -> list:
+    """
+    :param prefixes: dict target -> prefix
+    :return: list of HuntGroup in the order their first target appears
+    """
+    groups = {}
+    for target in dict.fromkeys(targets):
+        groups.setdefault(prefixes[target], []).append(target)
+    return [HuntGroup(prefix=prefix, targets=group_targets)
+            for prefix, group_targets in groups.items()]
+
+
+def get_last_hop_ip(hunt_result: HuntResult) -> str:
+    return hunt_result.record["measurements"]["last_hop"].get("ip", "")
+
+
+def hunt_results_agree(hunt_result: HuntResult,
+                       other_hunt_result: HuntResult) -> bool:
+    """
+    Same catchment: the same country and city results, backed by the same
+    last hop when both saw one, or else by a determinate country. Two
+    Indeterminate results without a common last hop prove nothing.
+    """
+    if hunt_result.country_result != other_hunt_result.country_result or \
+            hunt_result.city_result != other_hunt_result.city_result:
+        return False
+    last_hops = (get_last_hop_ip(hunt_result),
+                 get_last_hop_ip(other_hunt_result))
+    if "" not in last_hops:
+        return last_hops[0] == last_hops[1]
+    return hunt_result.country_result != "Indeterminate"
+
+
+def merge_groups_by_last_hop(groups: list, results: dict) -> list:
+    """
+    :param results: dict target -> HuntResult, or the exception raised,
+        with the results of the representatives
+    :return: groups with the ones whose representative agrees with the
+        first representative seen through the same last hop merged into a
+        LastHopHuntGroup, in the order their first group appears
+    """
+    merged = []
+    last_hop_groups = {}
+    for group in groups:
+        hunt_result = results.get(group.representative)
+        last_hop = get_last_hop_ip(hunt_result) \
+            if isinstance(hunt_result, HuntResult) else ""
+        if last_hop == "":
+            merged.append([group])
+            continue
+        last_hop_group = last_hop_groups.get(last_hop)
+        if last_hop_group is not None and hunt_results_agree(
+                results[last_hop_group[0].representative], hunt_result):
+            last_hop_group.append(group)
+            continue
+        last_hop_group = [group]
+        last_hop_groups.setdefault(last_hop, last_hop_group)
+        merged.append(last_hop_group)
+    return [LastHopHuntGroup(
+                last_hop=get_last_hop_ip(results[group[0].representative]),
+                groups=group)
+            if len(group) > 1 else group[0]
+            for group in merged]
+
+
+def propagate_hunt_result(hunt_result: HuntResult, hunt: dict) -> HuntResult:
+    """
+    :param hunt: hunt of the member, its gt_info and additional_info
+        are kept
+    :return: copy of hunt_result for the member target, propagated_from
+        tells the target actually hunted
+    """
+    record = copy.deepcopy(hunt_result.record)
+    record["propagated_from"] = hunt_result.target
+    record["target"] = hunt["target"]
+    for key in ("gt_info", "additional_info"):
+        if key in hunt:
+            record[key] = hunt[key]
+    return HuntResult(record)
+
+
+class PrefixHuntPlanner:
+    """
+    Hunts a list of targets once per announced prefix. The first round
+    hunts the representative of every prefix, the prefixes whose
+    representatives agree through the same observed last hop are merged
+    and confirmed together, as one group. The second round hunts the spot
+    checks of every group, or all its members when its representative
+    failed. Groups whose spot checks agree with the representative
+    propagate its result to the rest of the members, the members of the
+    groups that do not agree are hunted in a third round.
+    """
+
+    def __init__(self,
+                 hunt_engine: AsyncHuntEngine = None,
+                 prefix_resolver: AnnouncedPrefixResolver = None,
+                 spot_checks: int = PREFIX_GROUP_SPOT_CHECKS):
+        self._hunt_engine = hunt_engine if hunt_engine is not None \
+            else AsyncHuntEngine()
+        self._prefix_resolver = prefix_resolver \
+            if prefix_resolver is not None \
+            else AnnouncedPrefixResolver()
+        self._spot_checks = spot_checks
+
+    def plan(self, targets: list) -> list:
+        """
+        :return: list of HuntGroup
+        """
+        return group_targets_by_prefix(
+            targets, self._prefix_resolver.resolve_many(targets))
+
+    def run(self, hunts: list, on_result=None, on_error=None) -> list:
+        """
+        :param hunts: list of dicts with target and any other
+            HuntPipeline.hunt argument, as in AsyncHuntEngine.run
+        :param on_result: called with (target, HuntResult) for the hunted
+            and the propagated targets
+        :param on_error: called with (target, exception) when a hunt fails
+        :return: HuntResult in the same order as hunts, failed hunts are
+            returned as the exception raised
+        """
+        hunts_by_target = {hunt["target"]: hunt for hunt in hunts}
+        groups = self.plan(list(hunts_by_target))
+        results = {}
+
+        def collect_result(target: str, hunt_result: HuntResult):
+            results[target] = hunt_result
+            if on_result is not None:
+                on_result(target, hunt_result)
+
+        def collect_error(target: str, exception: Exception):
+            results[target] = exception
+            if on_error is not None:
+                on_error(target, exception)
+
+        def hunt_round(targets: list):
+            if len(targets) > 0:
+                self._hunt_engine.run([hunts_by_target[target]
+                                       for target in targets],
+                                      on_result=collect_result,
+                                      on_error=collect_error)
+
+        prefixes = len(groups)
+        hunt_round([group.representative for group in groups])
+        groups = merge_groups_by_last_hop(groups, results)
+        print("Hunting {} targets in {} groups of {} prefixes".format(
+            len(hunts_by_target), len(groups), prefixes))
+
+        second_round = []
+        for group in groups:
+            if isinstance(results.get(group.representative), HuntResult):
+                targets = group.get_spot_checks(self._spot_checks)
+            else:
+                targets = group.targets
+            second_round.extend(target for target in targets
+                                if target not in results)
+        hunt_round(second_round)
+
+        third_round = []
+        for group in groups:
+            remaining = [target for target in group.targets
+                         if target not in results]
+            if len(remaining) == 0:
+                continue
+            if self.is_group_confirmed(group, results):
+                representative_result = results[group.representative]
+                for target in remaining:
+                    collect_result(target, propagate_hunt_result(
+                        representative_result, hunts_by_target[target]))
+            else:
+                print("Prefix {} not confirmed, hunting its {} targets".format(
+                    group.prefix, len(remaining)))
+                third_round.extend(remaining)
+        hunt_round(third_round)
+
+        return [results.get(hunt["target"]) for hunt in hunts]
+
+    def is_group_confirmed(self, group: HuntGroup, results: dict) -> bool:
+        representative_result = results.get(group.representative)
+        if not isinstance(representative_result, HuntResult):
+            return False
+        for target in group.get_spot_checks(self._spot_checks):
+            spot_check_result = results.get(target)
+            if not isinstance(spot_check_result, HuntResult) or \
+                    not hunt_results_agree(representative_result,
+                                           spot_check_result):
+                return False
+        return True
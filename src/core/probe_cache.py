@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# internal imports
+from ..utils.constants import (
+    RIPE_ATLAS_PROBES_BASE_URL,
+    PROBES_CACHE_FILEPATH,
+    PROBES_CACHE_SIZE
+)
+from .probe_catalog import normalize_probe
+from .persistent_cache import PersistentLruCache
+from .http_client import HttpClient, get_http_client
+
+
+class ProbeCache:
+    """
+    Probe metadata shared between hunts. An in-memory LRU sits in front of a
+    SQLite store, misses in both are fetched in one bulk probes API query.
+    """
+
+    def __init__(self,
+                 filepath: str = PROBES_CACHE_FILEPATH,
+                 max_size: int = PROBES_CACHE_SIZE,
+                 http_client: HttpClient = None):
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._cache = PersistentLruCache(filepath=filepath,
+                                         table="probe_metadata",
+                                         max_size=max_size)
+
+    def put(self, probe: dict):
+        self.put_many([probe])
+
+    def put_many(self, probes: list):
+        self._cache.put_many({probe["id"]: probe
+                              for probe in probes if probe is not None})
+
+    def get(self, probe_id: int) -> dict:
+        return self.get_many([probe_id]).get(probe_id)
+
+    def get_many(self, probe_ids: list, fetch_missing: bool = True) -> dict:
+        """
+        :param fetch_missing: query the probes API for the probes not cached
+        :return: dict probe_id -> probe for every probe that could be found
+        """
+        found = self._cache.get_many(probe_ids)
+        missing = [probe_id for probe_id in dict.fromkeys(probe_ids)
+                   if probe_id not in found]
+        if fetch_missing and len(missing) > 0:
+            fetched = self.fetch_probes(missing)
+            self.put_many(fetched)
+            found.update({probe["id"]: probe for probe in fetched})
+        return found
+
+    def fetch_probes(self, probe_ids: list) -> list:
+        url = "{}?id__in={}&fields=id,geometry,status,address_v4," \
+              "address_v6&page_size={}".format(
+                RIPE_ATLAS_PROBES_BASE_URL,
+                ",".join(map(str, probe_ids)),
+                len(probe_ids))
+        try:
+            response = self._http_client.get(url).json()
+            return [normalize_probe(probe) for probe in response["results"]]
+        except Exception as e:
+            print("Probes {} could not be fetched: {}".format(probe_ids, e))
+            return []
+
+
+__probe_cache = None
+
+
+def get_probe_cache() -> ProbeCache:
+    global __probe_cache
+    if __probe_cache is None:
+        __probe_cache = ProbeCache()
+    return __probe_cache
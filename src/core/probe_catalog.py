@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import bz2
+import json
+import os
+import random
+import threading
+import time
+import numpy as np
+from rtree import index
+# internal imports
+from ..utils.constants import (
+    RIPE_ATLAS_PROBES_ARCHIVE_URL,
+    PROBES_CATALOG_FILEPATH,
+    PROBES_CATALOG_TTL,
+    EARTH_RADIUS_KM
+)
+from ..utils.common_functions import (
+    json_file_to_dict,
+    create_directory_structure
+)
+from ..utils.geo_distance import distances_one_to_many
+from ..utils.custom_exceptions import ProbeCatalogUnavailable
+from .http_client import HttpClient, get_http_client
+
+
+def normalize_probe(probe: dict) -> dict:
+    """
+    Reduce a probe from the bulk dump or from the probes API to the fields
+    Hunter uses: id, status, latitude, longitude and addresses.
+    """
+    if "geometry" in probe and probe["geometry"] is not None:
+        (longitude, latitude) = probe["geometry"]["coordinates"][:2]
+    else:
+        (longitude, latitude) = (probe.get("longitude"),
+                                 probe.get("latitude"))
+
+    if isinstance(probe.get("status"), dict):
+        status = probe["status"].get("name")
+    else:
+        status = probe.get("status_name", probe.get("status"))
+
+    return {
+        "id": probe["id"],
+        "status": status,
+        "latitude": latitude,
+        "longitude": longitude,
+        "address_v4": probe.get("address_v4"),
+        "address_v6": probe.get("address_v6")
+    }
+
+
+def sample_probes(probes: list, num_probes: int, latitude: float,
+                  longitude: float, radius: float,
+                  selection_seed: int = None) -> list:
+    """
+    Random sample of num_probes probes.
+    :param selection_seed: when given, the sample is the same for the same
+        search area and seed, so concurrent hunts measuring from the same
+        area share their probes and their measurements can be submitted
+        together
+    """
+    num_probes = min(num_probes, len(probes))
+    if selection_seed is None:
+        return random.sample(probes, num_probes)
+    seed = "{},{:.4f},{:.4f},{},{}".format(
+        selection_seed, float(latitude), float(longitude), radius,
+        num_probes)
+    probes = sorted(probes, key=lambda probe: probe["id"])
+    return random.Random(seed).sample(probes, num_probes)
+
+
+class ProbeCatalog:
+    """
+    Local copy of the RIPE Atlas probes, refreshed from the bulk dump when
+    older than ttl seconds. Connected probes with coordinates are kept in an
+    R-tree so probe selection runs in process without API queries.
+    """
+
+    def __init__(self,
+                 cache_filepath: str = PROBES_CATALOG_FILEPATH,
+                 ttl: int = PROBES_CATALOG_TTL,
+                 dump_url: str = RIPE_ATLAS_PROBES_ARCHIVE_URL,
+                 http_client: HttpClient = None):
+        self._cache_filepath = cache_filepath
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._ttl = ttl
+        self._dump_url = dump_url
+        self._loaded_at = 0
+        self._probes = {}
+        self._connected_ids = np.empty(0, dtype=int)
+        self._latitudes = np.empty(0)
+        self._longitudes = np.empty(0)
+        self._spatial_index = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self.ensure_loaded()
+        return len(self._probes)
+
+    def is_stale(self) -> bool:
+        return time.time() - self._loaded_at > self._ttl
+
+    def ensure_loaded(self):
+        if not self.is_stale():
+            return
+        with self._lock:
+            # Another hunt may have loaded it while waiting for the lock
+            if not self.is_stale():
+                return
+            if self.cache_age() <= self._ttl:
+                self.load()
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Probe catalog refresh failed: {}".format(e))
+                if os.path.exists(self._cache_filepath):
+                    # Stale data is still better than no data
+                    self.load()
+                else:
+                    raise ProbeCatalogUnavailable(e)
+
+    def cache_age(self) -> float:
+        try:
+            return time.time() - os.path.getmtime(self._cache_filepath)
+        except OSError:
+            return float("inf")
+
+    def load(self):
+        self.build_index(json_file_to_dict(self._cache_filepath)["probes"])
+
+    def refresh(self, dump_filepath: str = None):
+        """
+        :param dump_filepath: local bulk dump, downloaded from dump_url if
+            not given. Both bz2 compressed and plain JSON are accepted.
+        """
+        if dump_filepath is None:
+            response = self._http_client.get(self._dump_url, timeout=120)
+            response.raise_for_status()
+            raw_dump = response.content
+        else:
+            with open(dump_filepath, "rb") as file:
+                raw_dump = file.read()
+        if raw_dump[:3] == b"BZh":
+            raw_dump = bz2.decompress(raw_dump)
+
+        dump = json.loads(raw_dump)
+        if isinstance(dump, dict):
+            dump = dump.get("objects", dump.get("results", []))
+        probes = [normalize_probe(probe) for probe in dump]
+
+        create_directory_structure(self._cache_filepath)
+        with open(self._cache_filepath, "w") as file:
+            file.write(json.dumps({"probes": probes}))
+        self.build_index(probes)
+
+    def build_index(self, probes: list):
+        self._probes = {probe["id"]: probe for probe in probes}
+        connected = [
+            probe for probe in probes
+            if probe["status"] == "Connected" and
+            probe["latitude"] is not None and probe["longitude"] is not None
+        ]
+        self._connected_ids = np.array([probe["id"] for probe in connected],
+                                       dtype=int)
+        self._latitudes = np.array([probe["latitude"] for probe in connected],
+                                   dtype=float)
+        self._longitudes = np.array(
+            [probe["longitude"] for probe in connected], dtype=float)
+        self._spatial_index = index.Index(
+            (position, (lon, lat, lon, lat), None)
+            for position, (lon, lat) in enumerate(
+                zip(self._longitudes, self._latitudes))
+        ) if len(connected) > 0 else None
+        self._loaded_at = time.time()
+
+    def get_probe(self, probe_id: int) -> dict:
+        self.ensure_loaded()
+        return self._probes.get(probe_id)
+
+    def probes_in_circle(self, latitude: float, longitude: float,
+                         radius: float, excluded_ip: str = None) -> list:
+        """
+        :return: connected probes closer than radius km, nearest first
+        """
+        # Geolocation services may give coordinates as strings
+        (latitude, longitude) = (float(latitude), float(longitude))
+        self.ensure_loaded()
+        if self._spatial_index is None:
+            return []
+
+        latitude_delta = np.degrees(radius / EARTH_RADIUS_KM)
+        if abs(latitude) + latitude_delta >= 90:
+            candidates = np.arange(len(self._connected_ids))
+        else:
+            longitude_delta = np.degrees(np.arcsin(min(
+                1.0,
+                np.sin(radius / EARTH_RADIUS_KM) /
+                np.cos(np.radians(latitude)))))
+            bounds = (longitude - longitude_delta, latitude - latitude_delta,
+                      longitude + longitude_delta, latitude + latitude_delta)
+            candidates = np.fromiter(
+                self._spatial_index.intersection(bounds), dtype=int)
+            # Boxes across the antimeridian, query the wrapped side too
+            for shift in (-360, 360):
+                if -180 <= bounds[0] + shift <= 180 or \
+                        -180 <= bounds[2] + shift <= 180:
+                    candidates = np.concatenate([
+                        candidates,
+                        np.fromiter(self._spatial_index.intersection(
+                            (bounds[0] + shift, bounds[1],
+                             bounds[2] + shift, bounds[3])), dtype=int)
+                    ])
+
+        distances = distances_one_to_many(
+            latitude, longitude,
+            self._latitudes[candidates], self._longitudes[candidates])
+        order = np.argsort(distances, kind="stable")
+        probes = [
+            self._probes[self._connected_ids[candidates[position]].item()]
+            for position in order if distances[position] <= radius
+        ]
+        if excluded_ip is not None:
+            probes = [probe for probe in probes
+                      if probe["address_v4"] != excluded_ip and
+                      probe["address_v6"] != excluded_ip]
+        return probes
+
+    def select_probes(self, latitude: float, longitude: float,
+                      radius: float, num_probes: int,
+                      excluded_ip: str = None,
+                      selection_seed: int = None) -> list:
+        """
+        Expanding ring selection, the radius doubles until num_probes are
+        available and then num_probes of them are sampled with
+        sample_probes.
+        :param selection_seed: seed of sample_probes, a fresh sample if None
+        :return: list of probe ids
+        """
+        max_radius = np.pi * EARTH_RADIUS_KM
+        initial_radius = radius
+        probes = self.probes_in_circle(latitude, longitude, radius,
+                                       excluded_ip)
+        while len(probes) < num_probes and radius < max_radius:
+            print("Less than {} probes suitable in a {} km circle".format(
+                num_probes, radius))
+            radius = min(radius * 2, max_radius)
+            probes = self.probes_in_circle(latitude, longitude, radius,
+                                           excluded_ip)
+
+        probes_selected = sample_probes(probes, num_probes, latitude,
+                                        longitude, initial_radius,
+                                        selection_seed)
+        return [probe["id"] for probe in probes_selected]
+
+
+__probe_catalog = None
+
+
+def get_probe_catalog() -> ProbeCatalog:
+    global __probe_catalog
+    if __probe_catalog is None:
+        __probe_catalog = ProbeCatalog()
+    return __probe_catalog
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import copy
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+# internal imports
+from ..utils.constants import (
+    VERLOC_APROX_PATH,
+    PROBES_CACHE_FILEPATH,
+    REANALYSIS_TASKS_PER_PROCESS
+)
+from ..utils.common_functions import (
+    dict_to_json_file,
+    generate_approximation_numeric_values
+)
+from ..utils.rtt_distance import RttDistanceInverter
+from .hunt_analysis import (
+    build_hops_directions_list,
+    build_ping_discs,
+    analyse_ping_discs
+)
+from .probe_cache import ProbeCache
+from .result_record import load_hunt_result
+from .campaign_store import CampaignStore
+
+
+def reanalyse_hunt_record(record: dict,
+                          rtt_distance_inverter: RttDistanceInverter = None,
+                          probe_cache: ProbeCache = None) -> dict:
+    """
+    Recompute the hops list, ping discs, intersection and result of a
+    stored hunt from its raw traceroute and pings, without network access.
+    The last hop geolocation and the raw measurements are kept as stored.
+    :param probe_cache: probe locations missing from the stored ping discs
+        are read from it, pings of probes not found are left out
+    :return: reanalysed copy of record
+    """
+    reanalysed = copy.deepcopy(record)
+    measurements = reanalysed["measurements"]
+    if len(measurements["traceroute"]) > 0:
+        measurements["hops_directions_list"] = build_hops_directions_list(
+            traceroute=measurements["traceroute"],
+            traceroute_from_host=reanalysed["traceroute_from_host"])
+
+    pings = measurements["pings"]
+    if len(pings) == 0:
+        return reanalysed
+
+    probes_locations = {disc["probe_id"]: disc
+                        for disc in measurements["ping_discs"]}
+    missing = [ping["prb_id"] for ping in pings
+               if ping["prb_id"] not in probes_locations]
+    if len(missing) > 0 and probe_cache is not None:
+        probes_locations.update(
+            probe_cache.get_many(missing, fetch_missing=False))
+    pings = [ping for ping in pings if ping["prb_id"] in probes_locations]
+
+    measurements["ping_discs"] = build_ping_discs(
+        pings, probes_locations, rtt_distance_inverter=rtt_distance_inverter)
+    reanalysed["result"] = analyse_ping_discs(measurements["ping_discs"])
+    # Only the variants decided after the pings share the hunt result
+    for view in reanalysed.get("validation_views", {}).values():
+        if "pings" in view["measurements"]:
+            view["result"] = copy.deepcopy(reanalysed["result"])
+    return reanalysed
+
+
+def compare_results(record: dict, reanalysed: dict) -> dict:
+    return {
+        "target": record["target"],
+        "country_result": (record["result"]["country_result"],
+                           reanalysed["result"]["country_result"]),
+        "city_result": (record["result"]["city_result"],
+                        reanalysed["result"]["city_result"]),
+        "changed": record["result"]["country_result"] !=
+        reanalysed["result"]["country_result"] or
+        record["result"]["city_result"] !=
+        reanalysed["result"]["city_result"]
+    }
+
+
+# State of every worker process, set once by _init_worker
+__worker_rtt_distance_inverter = None
+__worker_probe_cache = None
+
+
+def _init_worker(approximation_filepath: str, probes_cache_filepath: str):
+    global __worker_rtt_distance_inverter, __worker_probe_cache
+    __worker_rtt_distance_inverter = RttDistanceInverter(
+        approximation_filepath)
+    if probes_cache_filepath is not None and \
+            os.path.exists(probes_cache_filepath):
+        __worker_probe_cache = ProbeCache(filepath=probes_cache_filepath)
+
+
+def _reanalyse_in_worker(record: dict) -> dict:
+    return reanalyse_hunt_record(
+        record,
+        rtt_distance_inverter=__worker_rtt_distance_inverter,
+        probe_cache=__worker_probe_cache)
+
+
+def _reanalyse_file_in_worker(filepath: str) -> (dict, dict):
+    record = load_hunt_result(filepath)
+    return record, _reanalyse_in_worker(record)
+
+
+def _capture_exceptions(function, argument):
+    try:
+        return function(argument)
+    except Exception as e:
+        return e
+
+
+class ReanalysisEngine:
+    """
+    Reanalyses stored hunts in a pool of processes. Inputs are streamed to
+    the pool keeping a few tasks per process in flight, so whole campaign
+    archives are processed without loading them in memory. Every process
+    loads the RTT to distance approximation at approximation_filepath, so
+    a model change is evaluated by regenerating it first.
+    """
+
+    def __init__(self,
+                 processes: int = None,
+                 approximation_filepath: str = VERLOC_APROX_PATH,
+                 regenerate_approximation: bool = False,
+                 probes_cache_filepath: str = PROBES_CACHE_FILEPATH):
+        """
+        :param processes: number of worker processes, CPUs count if None
+        :param regenerate_approximation: rebuild approximation_filepath from
+            get_time_from_distance before starting the workers
+        """
+        self._processes = processes if processes is not None \
+            else os.cpu_count()
+        self._approximation_filepath = approximation_filepath
+        self._probes_cache_filepath = probes_cache_filepath
+        if regenerate_approximation:
+            generate_approximation_numeric_values(approximation_filepath)
+
+    def reanalyse_files(self, filepaths: list, output_path: str = None):
+        """
+        :param output_path: directory where every reanalysed record is
+            written with its file name, not written if None
+        :return: iterator of (filepath, record, reanalysed record) in the
+            order of filepaths, the failed ones with the exception raised
+            as reanalysed record
+        """
+        filepaths = list(filepaths)
+        for filepath, result in zip(
+                filepaths,
+                self._map(_reanalyse_file_in_worker, filepaths)):
+            if isinstance(result, Exception):
+                yield filepath, None, result
+                continue
+            (record, reanalysed) = result
+            if output_path is not None:
+                dict_to_json_file(reanalysed, os.path.join(
+                    output_path, os.path.basename(filepath)))
+            yield filepath, record, reanalysed
+
+    def reanalyse_campaign(self, campaign_store: CampaignStore, **filters):
+        """
+        :param filters: campaign, target, origin_country, since and until,
+            as accepted by CampaignStore.query
+        :return: iterator of (hunt, reanalysed record), hunt as returned by
+            CampaignStore.query
+        """
+        hunts = deque()
+
+        def records():
+            for hunt in campaign_store.query(**filters):
+                hunts.append(hunt)
+                yield hunt["record"]
+
+        for reanalysed in self._map(_reanalyse_in_worker, records()):
+            yield hunts.popleft(), reanalysed
+
+    def _map(self, function, arguments):
+        """
+        Ordered map over the pool submitting arguments as results are
+        consumed, ProcessPoolExecutor.map submits every argument upfront.
+        """
+        max_in_flight = self._processes * REANALYSIS_TASKS_PER_PROCESS
+        with ProcessPoolExecutor(
+                max_workers=self._processes,
+                initializer=_init_worker,
+                initargs=(self._approximation_filepath,
+                          self._probes_cache_filepath)) as executor:
+            futures = deque()
+            for argument in arguments:
+                futures.append(executor.submit(
+                    _capture_exceptions, function, argument))
+                if len(futures) >= max_in_flight:
+                    yield futures.popleft().result()
+            while len(futures) > 0:
+                yield futures.popleft().result()
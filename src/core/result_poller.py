@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+# internal imports
+from ..utils.constants import (
+    RIPE_ATLAS_MEASUREMENTS_BASE_URL,
+    POLLING_PARAMETERS,
+    POLLING_TIMESTAMP_MARGIN,
+    RESULTS_POLLING_WORKERS,
+    RESULTS_POLLING_MARGIN,
+    MEASUREMENT_FINAL_STATUSES
+)
+from .http_client import HttpClient, get_http_client
+
+
+def quorum_reached(results_count: int, probes_scheduled: int,
+                   quorum: float) -> bool:
+    """
+    :param probes_scheduled: as reported by RIPE Atlas, it is 0 or unknown
+        until the measurement is scheduled, which is never a quorum
+    """
+    if not probes_scheduled or results_count == 0:
+        return False
+    return results_count >= math.ceil(quorum * probes_scheduled)
+
+
+def parse_measurement_state(measurement: dict) -> dict:
+    """
+    :param measurement: measurement as returned by the RIPE Atlas API
+    :return: {"probes_scheduled": int or None, "status": str or None}
+    """
+    status = measurement.get("status")
+    if isinstance(status, dict):
+        status = status.get("name")
+    probes_scheduled = measurement.get("probes_scheduled")
+    return {
+        "probes_scheduled": int(probes_scheduled)
+        if probes_scheduled is not None else None,
+        "status": status
+    }
+
+
+class MeasurementPolling:
+    """
+    Polling progress of one measurement: results seen, probes scheduled,
+    attempts made and the delay before the next one.
+    """
+
+    def __init__(self, measurement_id: int, measurement_type: str = "ping",
+                 probe_ids: list = None, quorum: float = 1.0):
+        self.measurement_id = measurement_id
+        self.probe_ids = probe_ids
+        self.quorum = quorum
+        self.seen = {}
+        self.probes_scheduled = None
+        self.attempts = 0
+        self._parameters = POLLING_PARAMETERS.get(
+            measurement_type, POLLING_PARAMETERS["default"])
+        self._delay = self._parameters["initial_delay"]
+        self._deadline = time.monotonic() + self._parameters["max_wait"]
+
+    def next_delay(self) -> float:
+        return self._delay * random.uniform(1 - self._parameters["jitter"],
+                                            1 + self._parameters["jitter"])
+
+    def needs_state(self) -> bool:
+        # Probes are scheduled after the measurement is created
+        return not self.probes_scheduled or self.attempts % 3 == 0
+
+    def get_pending_probe_ids(self) -> list:
+        """
+        :return: probes requested that have not reported, None if the
+            probes requested are not known
+        """
+        if self.probe_ids is None:
+            return None
+        reported_probes = {prb_id for (prb_id, _) in self.seen.keys()}
+        return [probe_id for probe_id in self.probe_ids
+                if probe_id not in reported_probes]
+
+    def update(self, state: dict) -> bool:
+        """
+        :param state: measurement state read in this attempt, None if it
+            was not read
+        :return: True when polling is over
+        """
+        status = None
+        if state is not None:
+            status = state["status"]
+            if state["probes_scheduled"] is not None:
+                self.probes_scheduled = state["probes_scheduled"]
+        print("Obtained response from {} probes of measurement {}".format(
+            len(self.seen), self.measurement_id))
+
+        if quorum_reached(len(self.seen), self.probes_scheduled, self.quorum):
+            print("Results retrieved")
+            return True
+        if status in MEASUREMENT_FINAL_STATUSES:
+            print("Measurement finished with status {}".format(status))
+            return True
+        if self.attempts >= self._parameters["max_attempts"] or \
+                time.monotonic() >= self._deadline:
+            print("Giving up waiting for results")
+            return True
+        self._delay = min(self._delay * self._parameters["backoff"],
+                          self._parameters["max_delay"])
+        return False
+
+    def get_results(self) -> list:
+        return list(self.seen.values())
+
+
+class MeasurementResultsPoller:
+    """
+    Waits for the results of a one-off RIPE Atlas measurement. Delays grow
+    exponentially with jitter following POLLING_PARAMETERS for the
+    measurement type, only results not seen yet are downloaded and polling
+    ends as soon as the quorum of scheduled probes has reported.
+    """
+
+    def __init__(self, http_client: HttpClient = None, sleep=time.sleep):
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._sleep = sleep
+
+    def get_measurement_state(self, measurement_id: int) -> dict:
+        """
+        :return: {"probes_scheduled": int or None, "status": str or None}
+        """
+        url = RIPE_ATLAS_MEASUREMENTS_BASE_URL + \
+            "{}/?fields=probes_scheduled,status".format(measurement_id)
+        try:
+            response = self._http_client.get(url).json()
+        except Exception as e:
+            print("Measurement state not available: {}".format(e))
+            return {"probes_scheduled": None, "status": None}
+        return parse_measurement_state(response)
+
+    def fetch_new_results(self, measurement_id: int, seen: dict,
+                          pending_probe_ids: list = None) -> list:
+        """
+        :param seen: (prb_id, timestamp) -> result already downloaded, new
+            results are added to it
+        :param pending_probe_ids: probes still missing, when known only
+            their results are requested
+        :return: results not seen before
+        """
+        url = RIPE_ATLAS_MEASUREMENTS_BASE_URL + "{}/results/".format(
+            measurement_id)
+        params = {}
+        if pending_probe_ids:
+            params["probe_ids"] = ",".join(map(str, pending_probe_ids))
+        elif len(seen) > 0:
+            # Results arrive out of order, look back a margin and dedupe
+            params["start"] = max(
+                timestamp for (_, timestamp) in seen.keys()
+            ) - POLLING_TIMESTAMP_MARGIN
+
+        response = self._http_client.get(url, params=params).json()
+        new_results = []
+        for result in response:
+            key = (result.get("prb_id"), result.get("timestamp"))
+            if key not in seen:
+                seen[key] = result
+                new_results.append(result)
+        return new_results
+
+    def fetch_polling_results(self, polling: MeasurementPolling):
+        try:
+            self.fetch_new_results(polling.measurement_id, polling.seen,
+                                   polling.get_pending_probe_ids())
+        except Exception as e:
+            print("Results not available yet: {}".format(e))
+
+    def poll(self, measurement_id: int, measurement_type: str = "ping",
+             probe_ids: list = None, quorum: float = 1.0) -> list:
+        """
+        :param probe_ids: probes requested for the measurement, if given
+            only the ones that have not reported are queried
+        :param quorum: fraction of the scheduled probes that is enough
+        :return: list of results in arrival order
+        """
+        polling = MeasurementPolling(measurement_id, measurement_type,
+                                     probe_ids, quorum)
+        while True:
+            delay = polling.next_delay()
+            print("Wait {:.1f} seconds for results. Number of attempts {}"
+                  .format(delay, polling.attempts))
+            self._sleep(delay)
+            polling.attempts += 1
+
+            state = None
+            if polling.needs_state():
+                state = self.get_measurement_state(measurement_id)
+            self.fetch_polling_results(polling)
+            if polling.update(state):
+                return polling.get_results()
+
+
+class BatchedResultsPoller(MeasurementResultsPoller):
+    """
+    Polls the measurements of concurrent hunts together. One thread wakes
+    up when the earliest measurement is due, reads the state of every
+    measurement due within RESULTS_POLLING_MARGIN in one request and
+    downloads their new results in parallel. Every measurement keeps its
+    own delays and quorum, poll() blocks its caller until its measurement
+    is done.
+    """
+
+    def __init__(self, http_client: HttpClient = None,
+                 max_workers: int = RESULTS_POLLING_WORKERS):
+        super().__init__(http_client=http_client)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # measurement_id -> (MeasurementPolling, due time, Future)
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def poll(self, measurement_id: int, measurement_type: str = "ping",
+             probe_ids: list = None, quorum: float = 1.0) -> list:
+        polling = MeasurementPolling(measurement_id, measurement_type,
+                                     probe_ids, quorum)
+        future = Future()
+        with self._condition:
+            self._pending[measurement_id] = (
+                polling, time.monotonic() + polling.next_delay(), future)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future.result()
+
+    def get_measurement_states(self, measurement_ids: list) -> dict:
+        """
+        :return: dict measurement_id -> state, as get_measurement_state,
+            for the measurements whose state could be read
+        """
+        url = RIPE_ATLAS_MEASUREMENTS_BASE_URL + \
+            "?id__in={}&fields=id,probes_scheduled,status&page_size={}".format(
+                ",".join(map(str, measurement_ids)), len(measurement_ids))
+        try:
+            response = self._http_client.get(url).json()
+        except Exception as e:
+            print("Measurements state not available: {}".format(e))
+            return {}
+        return {measurement["id"]: parse_measurement_state(measurement)
+                for measurement in response.get("results", [])}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while len(self._pending) == 0:
+                    self._condition.wait()
+                now = time.monotonic()
+                next_due = min(due for (_, due, _) in self._pending.values())
+                if next_due > now:
+                    self._condition.wait(next_due - now)
+                    continue
+                due_pollings = [
+                    (polling, future)
+                    for (polling, due, future) in self._pending.values()
+                    if due <= now + RESULTS_POLLING_MARGIN]
+            try:
+                self._poll_due(due_pollings)
+            except Exception as e:
+                for (polling, future) in due_pollings:
+                    with self._condition:
+                        self._pending.pop(polling.measurement_id, None)
+                    future.set_exception(e)
+
+    def _poll_due(self, due_pollings: list):
+        for (polling, _) in due_pollings:
+            polling.attempts += 1
+        state_ids = [polling.measurement_id for (polling, _) in due_pollings
+                     if polling.needs_state()]
+        states = self.get_measurement_states(state_ids) \
+            if len(state_ids) > 0 else {}
+        # Results of every due measurement are downloaded in parallel
+        list(self._executor.map(
+            lambda due_polling: self.fetch_polling_results(due_polling[0]),
+            due_pollings))
+
+        for (polling, future) in due_pollings:
+            finished = polling.update(states.get(polling.measurement_id))
+            with self._condition:
+                if finished:
+                    self._pending.pop(polling.measurement_id, None)
+                else:
+                    self._pending[polling.measurement_id] = (
+                        polling, time.monotonic() + polling.next_delay(),
+                        future)
+            if finished:
+                future.set_result(polling.get_results())
+
+
+__results_poller = None
+
+
+def get_results_poller() -> MeasurementResultsPoller:
+    global __results_poller
+    if __results_poller is None:
+        __results_poller = MeasurementResultsPoller()
+    return __results_poller
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import copy
+import os
+# internal imports
+from ..utils.constants import VALIDATION_SUFFIXES
+from ..utils.common_functions import json_file_to_dict, dict_to_json_file
+
+# Value of every measurement before the hunt fills it
+__EMPTY_MEASUREMENTS = {
+    "last_hop": {},
+    "hops_directions_list": [],
+    "traceroute": [],
+    "ping_discs": [],
+    "pings": []
+}
+
+
+def build_validation_view(results_measurements: dict) -> dict:
+    """
+    Small snapshot of one validation variant: its flags, its result and
+    which raw measurements were already taken when it was decided. The raw
+    measurements themselves live once in the canonical record.
+    """
+    return {
+        "target_validation": results_measurements["target_validation"],
+        "last_hop_validation": results_measurements["last_hop_validation"],
+        "result": copy.deepcopy(results_measurements["result"]),
+        "measurements": [
+            key for key, value in results_measurements["measurements"].items()
+            if value != __EMPTY_MEASUREMENTS.get(key)
+        ]
+    }
+
+
+def materialize_validation_variant(record: dict, suffix: str) -> dict:
+    """
+    :param record: canonical record with validation_views
+    :param suffix: one of VALIDATION_SUFFIXES
+    :return: the document save_result used to write for that variant
+    """
+    view = record["validation_views"][suffix]
+    variant = {key: value for key, value in record.items()
+               if key != "validation_views"}
+    variant["target_validation"] = view["target_validation"]
+    variant["last_hop_validation"] = view["last_hop_validation"]
+    variant["result"] = copy.deepcopy(view["result"])
+    variant["measurements"] = {
+        key: value if key in view["measurements"]
+        else copy.deepcopy(__EMPTY_MEASUREMENTS.get(key, value))
+        for key, value in record["measurements"].items()
+    }
+    return variant
+
+
+def split_validation_filepath(filepath: str) -> (str, str):
+    """
+    :return: (canonical filepath, suffix) of a per variant filepath,
+        suffix is None when filepath is not a variant
+    """
+    base = filepath[:-5] if filepath.endswith(".json") else filepath
+    for suffix in VALIDATION_SUFFIXES:
+        if base.endswith("_" + suffix):
+            return base[:-len(suffix) - 1] + ".json", suffix
+    return filepath, None
+
+
+def load_hunt_result(filepath: str) -> dict:
+    """
+    Read a hunt result from filepath. Per variant paths that do not exist
+    on disk are materialized from their canonical record.
+    """
+    if os.path.exists(filepath):
+        return json_file_to_dict(filepath)
+    (canonical_filepath, suffix) = split_validation_filepath(filepath)
+    if suffix is None:
+        return json_file_to_dict(filepath)
+    return materialize_validation_variant(
+        json_file_to_dict(canonical_filepath), suffix)
+
+
+def write_validation_variant_files(canonical_filepath: str) -> list:
+    """
+    Write the four per variant files next to a canonical record, for tools
+    that still read them from disk.
+    :return: filepaths written
+    """
+    record = json_file_to_dict(canonical_filepath)
+    filepaths = []
+    for suffix in record["validation_views"].keys():
+        filepath = "{}_{}.json".format(canonical_filepath[:-5], suffix)
+        dict_to_json_file(materialize_validation_variant(record, suffix),
+                          filepath)
+        filepaths.append(filepath)
+    return filepaths
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import ipaddress
+import time
+# internal imports
+from ..utils.constants import (
+    TRACEROUTE_CACHE_FILEPATH,
+    TRACEROUTE_CACHE_SIZE,
+    TRACEROUTE_CACHE_REUSE,
+    TRACEROUTE_CACHE_FRESHNESS,
+    TRACEROUTE_CACHE_TAIL_HOPS
+)
+from .persistent_cache import PersistentLruCache
+from .host_location import get_host_location_provider
+from .traceroute_runner import (
+    HostTracerouteRunner,
+    TracerouteHop,
+    get_traceroute_runner,
+    parse_traceroute_line
+)
+
+
+def get_target_prefix(target: str) -> str:
+    """
+    :return: /24 of an IPv4 target or /48 of an IPv6 one, None if target
+        is not an IP
+    """
+    try:
+        ip = ipaddress.ip_address(target)
+    except ValueError:
+        return None
+    prefix_length = 24 if ip.version == 4 else 48
+    return str(ipaddress.ip_network("{}/{}".format(ip, prefix_length),
+                                    strict=False))
+
+
+def _parse_lines(lines: list, from_cache: bool) -> list:
+    hops = []
+    for line in lines:
+        hop = parse_traceroute_line(line)
+        if hop is not None:
+            hop.from_cache = from_cache
+            hops.append(hop)
+    return hops
+
+
+class CachedTracerouteRunner:
+    """
+    Host traceroutes cached by origin, target prefix and protocol. The
+    origin is the public IP of the host, the VPN exit when connected, so
+    every exit keeps its own paths even if their tunnel addresses repeat.
+    A traceroute to the same target within reuse seconds
+    is taken as it is. Within freshness seconds only the last tail_hops
+    hops are measured again, starting at the cached hop before them, and
+    the cached head is kept if that hop still answers with a cached IP.
+    Older entries, other targets whose head changed and misses run the
+    full traceroute, which is cached afterwards.
+    """
+
+    def __init__(self,
+                 traceroute_runner: HostTracerouteRunner = None,
+                 cache_filepath: str = TRACEROUTE_CACHE_FILEPATH,
+                 max_size: int = TRACEROUTE_CACHE_SIZE,
+                 reuse: float = TRACEROUTE_CACHE_REUSE,
+                 freshness: float = TRACEROUTE_CACHE_FRESHNESS,
+                 tail_hops: int = TRACEROUTE_CACHE_TAIL_HOPS,
+                 get_network_key=None):
+        """
+        :param get_network_key: returns the origin of the traceroutes, None
+            when unknown, the public IP of the shared HostLocationProvider
+            if not given
+        """
+        self._traceroute_runner = traceroute_runner \
+            if traceroute_runner is not None \
+            else get_traceroute_runner()
+        self._cache = PersistentLruCache(filepath=cache_filepath,
+                                         table="traceroutes",
+                                         max_size=max_size,
+                                         ttl=freshness)
+        self._reuse = reuse
+        self._freshness = freshness
+        self._tail_hops = tail_hops
+        self._get_network_key = get_network_key \
+            if get_network_key is not None \
+            else get_host_location_provider().get_public_ip
+
+    def get_cache_key(self, target: str) -> str:
+        """
+        :return: None when target is not an IP or the origin is unknown
+        """
+        target_prefix = get_target_prefix(target)
+        network_key = self._get_network_key()
+        if target_prefix is None or network_key is None:
+            return None
+        return "{}|{}|{}".format(network_key, target_prefix,
+                                 self._traceroute_runner.get_protocol())
+
+    def run(self, target: str, on_hop=None) -> list:
+        """
+        :param on_hop: called with every TracerouteHop measured now
+        :return: list of TracerouteHop, from_cache set on the cached ones
+        """
+        cache_key = self.get_cache_key(target)
+        if cache_key is None:
+            return self._traceroute_runner.run(target, on_hop=on_hop)
+
+        now = time.time()
+        entry = self._cache.get(cache_key)
+        if entry is not None and now - entry["created_at"] < self._freshness:
+            if entry["target"] == target and \
+                    now - entry["revalidated_at"] < self._reuse:
+                return _parse_lines(entry["lines"], from_cache=True)
+            hops = self.revalidate(target, entry, on_hop)
+            if hops is not None:
+                self._cache.put(cache_key, dict(
+                    entry, target=target, revalidated_at=now,
+                    lines=[hop.line for hop in hops]))
+                return hops
+
+        hops = self._traceroute_runner.run(target, on_hop=on_hop)
+        if len(hops) > 0:
+            self._cache.put(cache_key, {
+                "target": target,
+                "lines": [hop.line for hop in hops],
+                "created_at": now,
+                "revalidated_at": now
+            })
+        return hops
+
+    def invalidate(self):
+        """
+        Drop every cached traceroute, e.g. after connecting to another VPN
+        server.
+        """
+        self._cache.clear()
+
+    def revalidate(self, target: str, entry: dict, on_hop=None) -> list:
+        """
+        :return: cached head followed by the tail measured now, None if
+            the cached path can not be kept
+        """
+        cached_hops = _parse_lines(entry["lines"], from_cache=True)
+        anchor = self.find_anchor_hop(cached_hops)
+        if anchor is None:
+            return None
+        tail_hops = self._traceroute_runner.run(target, on_hop=on_hop,
+                                                first_hop=anchor.number)
+        if len(tail_hops) == 0 or tail_hops[0].number != anchor.number or \
+                not set(tail_hops[0].get_ips()) & set(anchor.get_ips()):
+            print("Cached traceroute to {} changed at hop {}".format(
+                target, anchor.number))
+            return None
+        return [hop for hop in cached_hops if hop.number < anchor.number] + \
+            tail_hops
+
+    def find_anchor_hop(self, hops: list) -> TracerouteHop:
+        """
+        :return: last hop answering before the tail, None when measuring
+            from it would save no hop
+        """
+        for hop in reversed(hops[:len(hops) - self._tail_hops]):
+            if len(hop.get_ips()) > 0:
+                return hop if hop.number > 1 else None
+        return None
+
+
+__cached_traceroute_runner = None
+
+
+def get_cached_traceroute_runner() -> CachedTracerouteRunner:
+    global __cached_traceroute_runner
+    if __cached_traceroute_runner is None:
+        __cached_traceroute_runner = CachedTracerouteRunner()
+    return __cached_traceroute_runner
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import ipaddress
+import os
+import signal
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# internal imports
+from ..utils.constants import (
+    HOST_TRACEROUTE_COMMAND,
+    HOST_TRACEROUTE_CONCURRENCY,
+    HOST_TRACEROUTE_TIMEOUT
+)
+
+
+def _parse_ip(token: str) -> str:
+    if token[0] == "(" and token[-1] == ")":
+        token = token[1:-1]
+    try:
+        return str(ipaddress.ip_address(token))
+    except ValueError:
+        return None
+
+
+def _kill_process_group(process: subprocess.Popen,
+                        signal_number: int = signal.SIGKILL):
+    # Children of the command would keep the output open otherwise
+    try:
+        os.killpg(process.pid, signal_number)
+    except ProcessLookupError:
+        pass
+
+
+class TracerouteHop:
+    """
+    One hop of a host traceroute. replies keeps every probe answer as
+    (ip, rtt in ms), "*" as ip for the probes without answer and None as
+    rtt when no time was printed. from_cache marks the hops taken from a
+    previous traceroute instead of measured now.
+    """
+
+    def __init__(self, number: int, replies: list, line: str,
+                 from_cache: bool = False):
+        self.number = number
+        self.replies = replies
+        self.line = line
+        self.from_cache = from_cache
+
+    def get_ips(self) -> list:
+        return list(dict.fromkeys(
+            ip for (ip, rtt) in self.replies if ip != "*"))
+
+    def get_rtts(self) -> list:
+        return [rtt for (ip, rtt) in self.replies if rtt is not None]
+
+    def get_directions(self) -> list:
+        """
+        :return: distinct IPs and "*" in the order they answered, as
+            stored in hops_directions_list
+        """
+        return list(dict.fromkeys(ip for (ip, rtt) in self.replies))
+
+    def to_dict(self) -> dict:
+        return {
+            "hop": self.number,
+            "replies": [{"ip": ip, "rtt": rtt} for (ip, rtt) in self.replies]
+        }
+
+
+def parse_traceroute_line(line: str) -> TracerouteHop:
+    """
+    :param line: hop line of traceroute, with or without -n
+    :return: hop parsed, None for the header and other lines
+    """
+    tokens = line.split()
+    if len(tokens) == 0 or not tokens[0].isdigit():
+        return None
+
+    replies = []
+    current_ip = None
+    # IP printed and waiting for its times
+    pending = False
+    for position, token in enumerate(tokens[1:], start=1):
+        if token == "*":
+            if pending:
+                replies.append((current_ip, None))
+            pending = False
+            replies.append(("*", None))
+        elif token == "ms":
+            continue
+        elif position + 1 < len(tokens) and tokens[position + 1] == "ms":
+            try:
+                rtt = float(token)
+            except ValueError:
+                continue
+            replies.append((current_ip, rtt))
+            pending = False
+        else:
+            ip = _parse_ip(token)
+            # Hostnames and annotations like !H are skipped
+            if ip is None or (pending and ip == current_ip):
+                continue
+            if pending:
+                replies.append((current_ip, None))
+            current_ip = ip
+            pending = True
+    if pending:
+        replies.append((current_ip, None))
+    return TracerouteHop(number=int(tokens[0]), replies=replies, line=line)
+
+
+class HostTracerouteRunner:
+    """
+    Runs traceroutes from this host. A bounded number of them run at the
+    same time across every caller, their output is parsed hop by hop as
+    it is printed and a traceroute can stop as soon as the destination
+    answers instead of waiting for the last probes to time out.
+    """
+
+    def __init__(self,
+                 max_concurrent: int = HOST_TRACEROUTE_CONCURRENCY,
+                 command: tuple = HOST_TRACEROUTE_COMMAND,
+                 timeout: float = HOST_TRACEROUTE_TIMEOUT,
+                 stop_at_destination: bool = True):
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._max_concurrent = max_concurrent
+        self._command = list(command)
+        self._timeout = timeout
+        self._stop_at_destination = stop_at_destination
+
+    def get_protocol(self) -> str:
+        if "--tcp" in self._command or "-T" in self._command:
+            return "tcp"
+        if "--icmp" in self._command or "-I" in self._command:
+            return "icmp"
+        return "udp"
+
+    def run(self, target: str, on_hop=None, first_hop: int = 1) -> list:
+        """
+        :param on_hop: called with every TracerouteHop as it is read
+        :param first_hop: TTL of the first hop probed, the hops before it
+            are not measured nor returned
+        :return: list of TracerouteHop
+        """
+        destination = _parse_ip(target) or target
+        first_hop_option = ["-f", str(first_hop)] if first_hop > 1 else []
+        with self._slots:
+            process = subprocess.Popen(
+                self._command + first_hop_option + [target],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                errors="replace",
+                start_new_session=True)
+            watchdog = threading.Timer(self._timeout, _kill_process_group,
+                                       args=(process,))
+            watchdog.start()
+            hops = []
+            try:
+                for line in process.stdout:
+                    hop = parse_traceroute_line(line.rstrip("\n"))
+                    if hop is None:
+                        continue
+                    hops.append(hop)
+                    if on_hop is not None:
+                        on_hop(hop)
+                    if self._stop_at_destination and \
+                            destination in hop.get_ips():
+                        _kill_process_group(process, signal.SIGTERM)
+                        break
+            finally:
+                watchdog.cancel()
+                process.stdout.close()
+                process.wait()
+            return hops
+
+    def run_many(self, targets: list):
+        """
+        :return: iterator of (target, hops) as every traceroute finishes,
+            failed ones with the exception raised as hops
+        """
+        with ThreadPoolExecutor(max_workers=self._max_concurrent) \
+                as executor:
+            futures = {executor.submit(self.run, target): target
+                       for target in targets}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+
+__traceroute_runner = None
+
+
+def get_traceroute_runner() -> HostTracerouteRunner:
+    global __traceroute_runner
+    if __traceroute_runner is None:
+        __traceroute_runner = HostTracerouteRunner()
+    return __traceroute_runner
@@ -2,32 +2,54 @@
 # -*- coding: utf-8 -*-
 
 # external imports
-import pandas as pd
-import requests
-import geocoder
-import random
 import time
-import subprocess
-import ipinfo
-from shapely import from_geojson
+from shapely import Geometry
 # internal imports
 from ..utils.constants import (
     RIPE_ATLAS_MEASUREMENTS_BASE_URL,
     RIPE_ATLAS_PROBES_BASE_URL,
     KEY_FILEPATH,
     MEASUREMENTS_PATH,
-    AIRPORTS_INFO_FILEPATH
+    RESULTS_QUORUM
 )
 from ..utils.common_functions import (
     json_file_to_dict,
     dict_to_json_file,
-    check_discs_intersect,
-    distance,
-    get_distance_from_rtt,
     calculate_hunter_pings_intersection_area,
     check_ip,
-    is_ipv6,
-    get_nearest_airport_to_point
+    is_ipv6
+)
+from ..utils.airport_catalog import get_airport_catalog
+from ..utils.custom_exceptions import ProbeCatalogUnavailable
+from ..core.probe_catalog import (
+    ProbeCatalog,
+    get_probe_catalog,
+    normalize_probe,
+    sample_probes
+)
+from ..core.probe_cache import ProbeCache, get_probe_cache
+from ..core.http_client import HttpClient, get_http_client
+from ..core.result_poller import MeasurementResultsPoller
+from ..core.measurement_batcher import MeasurementBatcher
+from ..core.result_record import build_validation_view
+from ..core.hunt_analysis import (
+    build_empty_result,
+    build_hops_directions_list,
+    build_ping_discs,
+    check_ping_discs_intersect,
+    locate_airports_inside_intersection
+)
+from ..core.traceroute_cache import (
+    CachedTracerouteRunner,
+    get_cached_traceroute_runner
+)
+from ..core.host_location import (
+    HostLocationProvider,
+    get_host_location_provider
+)
+from ..core.geolocation import (
+    IpGeolocationService,
+    get_geolocation_service
 )
 
 
@@ -36,18 +58,29 @@ class Hunter:
                  output_filename: str = "test.json",
                  check_cf_ray: bool = True,
                  gt_info: dict = None,
-                 additional_info: dict = None):
+                 additional_info: dict = None,
+                 probe_catalog: ProbeCatalog = None,
+                 probe_cache: ProbeCache = None,
+                 http_client: HttpClient = None,
+                 results_poller: MeasurementResultsPoller = None,
+                 results_quorum: float = RESULTS_QUORUM,
+                 measurement_batcher: MeasurementBatcher = None,
+                 geolocation_service: IpGeolocationService = None,
+                 save_to_file: bool = True,
+                 host_location_provider: HostLocationProvider = None,
+                 ripe_key: str = None,
+                 traceroute_runner: CachedTracerouteRunner = None,
+                 probe_selection_seed: int = None):
         self._target = target
         # origin format = (latitude, longitude)
         if origin != ():
             self._origin = origin
             self._traceroute_from_host = False
         else:
-            try:
-                (latitude, longitude) = geocoder.ip("me").latlng
-            except:
-                (latitude, longitude) = (0, 0)
-            self._origin = (latitude, longitude)
+            host_location_provider = host_location_provider \
+                if host_location_provider is not None \
+                else get_host_location_provider()
+            self._origin = host_location_provider.get_location()
             self._traceroute_from_host = True
 
         self._last_hop_validation = True
@@ -55,41 +88,54 @@ class Hunter:
 
         self._radius = 20
         self._url = RIPE_ATLAS_MEASUREMENTS_BASE_URL + "/?key={}".format(
-            self.get_ripe_key()
+            ripe_key if ripe_key is not None else self.get_ripe_key()
         )
         self._measurement_id = 0
         self._output_filename = output_filename
         self._result_filepath = ""
+        self._save_to_file = save_to_file
         self._ping_discs = []
         self._check_cf_ray = check_cf_ray
         self._gt_info = gt_info
         self._additional_info = additional_info
+        self._http_client = http_client if http_client is not None \
+            else get_http_client()
+        self._results_poller = results_poller \
+            if results_poller is not None \
+            else MeasurementResultsPoller(http_client=self._http_client)
+        self._results_quorum = results_quorum
+        self._measurement_batcher = measurement_batcher
+        self._geolocation_service = geolocation_service \
+            if geolocation_service is not None \
+            else get_geolocation_service()
+        self._traceroute_runner = traceroute_runner \
+            if traceroute_runner is not None \
+            else get_cached_traceroute_runner()
+        self._probe_catalog = probe_catalog if probe_catalog is not None \
+            else get_probe_catalog()
+        self._probe_cache = probe_cache if probe_cache is not None \
+            else get_probe_cache()
+        # Hunts given the same seed sample the same probes for an area
+        self._probe_selection_seed = probe_selection_seed
         self._results_measurements = {}
         self.reset_results_measurements()
 
     def reset_results_measurements(self):
+        self._validation_views = {}
         self._results_measurements = {
             "target": self._target,
+            "timestamp": None,
+            "phase_timings": {},
             "origin": {
                 "latitude": self._origin[0],
                 "longitude": self._origin[1]
             },
             "traceroute_from_host": self._traceroute_from_host,
+            "traceroute_cached_hops": 0,
             "last_hop_validation": self._last_hop_validation,
             "target_validation": self._target_validation,
             "gt_info": self._gt_info,
-            "result": {
-                "country_result": "Indeterminate",
-                "city_result": "Indeterminate",
-                "advanced": {
-                    "countries_list": [],
-                    "cities_list": [],
-                    "airports_list": [],
-                    "discs_intersect": False,
-                    "intersection": None,
-                    "centroid": None
-                }
-            },
+            "result": build_empty_result(),
             "measurements": {
                 "last_hop": {},
                 "hops_directions_list": [],
@@ -127,14 +173,21 @@ class Hunter:
         self._additional_info = additional_info
         self.reset_results_measurements()
 
+    def get_results_measurements(self) -> dict:
+        return self._results_measurements
+
     def hunt(self):
         if self._target is None or self._target == "":
             print("Target not valid")
             return
 
+        self._results_measurements["timestamp"] = time.time()
+        phase_start = time.monotonic()
         if self._check_cf_ray:
             self.obtain_cf_ray()
+            phase_start = self.record_phase_timing("cf_ray", phase_start)
         self.make_traceroute_measurement()
+        phase_start = self.record_phase_timing("traceroute", phase_start)
         self.build_measurement_filepath()
 
         if self._target_validation:
@@ -156,6 +209,7 @@ class Hunter:
         # save ip_all_validation, fail last_hop o
         # save _ip_last_hop_validation, fail last_hop
         last_hop = self.geolocate_last_hop()
+        phase_start = self.record_phase_timing("last_hop", phase_start)
         print("Last Hop location: ", last_hop)
         self._results_measurements["measurements"]["last_hop"] = last_hop
         if last_hop["geolocation"] == {}:
@@ -164,6 +218,7 @@ class Hunter:
 
         # Pings from near last hop geo
         self.obtain_pings_near_last_hop(last_hop["geolocation"])
+        phase_start = self.record_phase_timing("pings", phase_start)
 
         # Intersection of discs from pings
         if self.check_ping_discs_intersection():
@@ -178,12 +233,24 @@ class Hunter:
             self._results_measurements["result"]["advanced"]["centroid"] = \
                 intersection_info["centroid"]
             # Location of airports inside intersection
-            self.check_airports_inside_intersection()
+            self.check_airports_inside_intersection(
+                intersection_info["geometry"])
         else:
             print("Some pings do not intersect. Bad scenario")
+        self.record_phase_timing("intersection", phase_start)
 
         self.save_result_with_double_target_validation()
 
+    def record_phase_timing(self, phase: str, phase_start: float) -> float:
+        """
+        :param phase_start: time.monotonic() when the phase started
+        :return: time.monotonic() now, start of the next phase
+        """
+        now = time.monotonic()
+        self._results_measurements["phase_timings"][phase] = \
+            now - phase_start
+        return now
+
     def make_traceroute_measurement(self):
         print("###########")
         print("Traceroute phase initiated")
@@ -195,14 +262,11 @@ class Hunter:
             self.ripe_traceroute_measurement()
 
     def host_traceroute_measurement(self):
-        result_traceroute = subprocess.run([
-            #"sudo",
-            "traceroute",
-            #"--tcp",
-            #"--icmp",
-            self._target], stdout=subprocess.PIPE)
-        hops_list = ((str(result_traceroute.stdout)).split("\\n")[1:])[:-1]
-        self._results_measurements["measurements"]["traceroute"] = hops_list
+        hops = self._traceroute_runner.run(self._target)
+        self._results_measurements["measurements"]["traceroute"] = \
+            [hop.line for hop in hops]
+        self._results_measurements["traceroute_cached_hops"] = \
+            sum(hop.from_cache for hop in hops)
 
     def ripe_traceroute_measurement(self):
         # Make traceroute from origin
@@ -244,30 +308,30 @@ class Hunter:
             print("Measure ID: ", self._measurement_id)
         # Obtain results
         self._results_measurements["measurements"]["traceroute"] = \
-            self.get_measurement_results()
+            self.get_measurement_results(measurement_type="traceroute",
+                                         probe_ids=probe_id)
 
     def make_ripe_measurement(self, data: dict):
         # Start the measurement and get measurement id
+        if self._measurement_batcher is not None:
+            try:
+                self._measurement_id = \
+                    self._measurement_batcher.submit_measurement(data)[0]
+            except Exception as e:
+                print(e.__str__())
+            return
+
         response = {}
         try:
-            response = requests.post(self._url, json=data).json()
+            response = self._http_client.post(self._url, json=data).json()
             self._measurement_id = response["measurements"][0]
         except Exception as e:
             print(e.__str__())
             print(response)
 
     def get_probes_scheduled(self) -> int:
-        probes_scheduled_url = RIPE_ATLAS_MEASUREMENTS_BASE_URL + \
-                               "{}/?fields=probes_scheduled".format(
-                                   self._measurement_id)
-        retrieved = False
-        while not retrieved:
-            time.sleep(1)
-            try:
-                response = requests.get(probes_scheduled_url).json()
-                return int(response["probes_scheduled"])
-            except:
-                print("Measure not scheduled yet")
+        return self._results_poller.get_measurement_state(
+            self._measurement_id)["probes_scheduled"]
 
     def build_measurement_filepath(self):
         if self._output_filename == "hunter_measurement.json":
@@ -279,49 +343,31 @@ class Hunter:
         else:
             self._result_filepath = MEASUREMENTS_PATH + self._output_filename
 
-    def add_validation_suffix(self):
+    def get_validation_suffix(self) -> str:
         if self._target_validation and self._last_hop_validation:
-            suffix = "ip_all_validation"
+            return "ip_all_validation"
         elif self._target_validation and not self._last_hop_validation:
-            suffix = "ip_target_validation"
+            return "ip_target_validation"
         elif not self._target_validation and self._last_hop_validation:
-            suffix = "ip_last_hop_validation"
+            return "ip_last_hop_validation"
         else:
-            suffix = "no_ip_validation"
+            return "no_ip_validation"
 
+    def add_validation_suffix(self):
+        suffix = self.get_validation_suffix()
         self.build_measurement_filepath()
         filename = self._result_filepath[:-5]
         filename = filename + "_" + suffix
         self._result_filepath = filename + ".json"
 
-    def get_measurement_results(self) -> list:
-        results_measurement_url = \
-            RIPE_ATLAS_MEASUREMENTS_BASE_URL + "{}/results".format(
-                self._measurement_id
-            )
-        delay = 5
-        enough_results = False
-        attempts = 0
-        response = []
-
-        while not enough_results:
-            print("Wait {} seconds for results. Number of attempts {}".
-                  format(delay, attempts))
-            time.sleep(delay)
-            delay = 15
-            attempts += 1
-            probes_scheduled = self.get_probes_scheduled()
-            print("Total probes scheduled for measurement: ", probes_scheduled)
-            response = requests.get(results_measurement_url).json()
-            print("Obtained response from {} probes".format(len(response)))
-            if len(response) == probes_scheduled:
-                print("Results retrieved")
-                enough_results = True
-            elif attempts >= 10:
-                enough_results = True
-            else:
-                enough_results = False
-        return response
+    def get_measurement_results(self, measurement_type: str = "ping",
+                                probe_ids: list = None) -> list:
+        return self._results_poller.poll(
+            measurement_id=self._measurement_id,
+            measurement_type=measurement_type,
+            probe_ids=probe_ids,
+            quorum=self._results_quorum
+        )
 
     def geolocate_last_hop(self) -> dict:
         directions_list = self.build_hops_directions_list()
@@ -345,19 +391,15 @@ class Hunter:
                 self._results_measurements["last_hop_validation"] = False
 
         last_hop = {"ip": "", "geolocation": {}}
+        locations = self._geolocation_service.geolocate_many(
+            directions_list[-2])
         for last_hop_ip in directions_list[-2]:
-            if last_hop_ip != "*":
-                try:
-                    location = self.geolocate_with_ipinfo(ip=last_hop_ip)
-                    last_hop = {
-                        "ip": last_hop_ip,
-                        "geolocation": location
-                    }
-                except:
-                    continue
+            if last_hop_ip in locations:
+                last_hop = {
+                    "ip": last_hop_ip,
+                    "geolocation": locations[last_hop_ip]
+                }
                 break
-            else:
-                continue
 
         print("Last Hop IP direction valid: ", last_hop["ip"])
         return last_hop
@@ -392,8 +434,13 @@ class Hunter:
 
         try:
             # TODO geolocate last_hop_direction better
-            last_hop_geo = self.geolocate_with_ipinfo(
-                ip=last_hop_direction)
+            if last_hop_direction == "":
+                # ipinfo answered an empty IP with the host location, hunts
+                # without a last hop keep using it
+                last_hop_geo = self._geolocation_service.geolocate_host()
+            else:
+                last_hop_geo = self.geolocate_with_ipinfo(
+                    ip=last_hop_direction)
         except Exception as e:
             print("Exception in last_hop geolocation")
             print(e)
@@ -412,34 +459,10 @@ class Hunter:
             return False
 
     def build_hops_directions_list(self) -> list:
-        directions_list = []
-        if self._traceroute_from_host:
-            for result in self._results_measurements["measurements"]["traceroute"]:
-                hop_directions = []
-                for split in result.split(" "):
-                    if split == "":
-                        continue
-                    elif split == "*":
-                        hop_directions.append(split)
-                    elif split[0] == "(" and split[-1] == ")":
-                        hop_directions.append(split[1:-1])
-                    else:
-                        continue
-                hop_directions = list(dict.fromkeys(hop_directions))
-                directions_list.append(hop_directions)
-        else:
-            traceroute_results = \
-                self._results_measurements["traceroute"][0]["result"]
-            for hop in traceroute_results:
-                hop_directions = []
-                for hop_result in hop["result"]:
-                    if "x" in hop_result.keys():
-                        hop_directions.append("*")
-                    else:
-                        hop_directions.append(hop_result["from"])
-                hop_directions = list(dict.fromkeys(hop_directions))
-                directions_list.append(hop_directions)
-
+        directions_list = build_hops_directions_list(
+            traceroute=self._results_measurements["measurements"][
+                "traceroute"],
+            traceroute_from_host=self._traceroute_from_host)
         self._results_measurements["measurements"]["hops_directions_list"] = \
             directions_list
         return directions_list
@@ -485,120 +508,61 @@ class Hunter:
             print("Measure ID: ", self._measurement_id)
         # Obtain results
         self._results_measurements["measurements"]["pings"] = \
-            self.get_measurement_results()
+            self.get_measurement_results(measurement_type="ping",
+                                         probe_ids=probes_id_list)
 
     def check_ping_discs_intersection(self) -> bool:
         # Build discs
-        for ping_result in self._results_measurements["measurements"]["pings"]:
-            min_rtt = ping_result["min"]
-            ping_radius = get_distance_from_rtt(min_rtt)
-            probe_location = self.get_probe_coordinates(ping_result["prb_id"])
-            self._ping_discs.append({
-                "probe_id": ping_result["prb_id"],
-                "latitude": probe_location["latitude"],
-                "longitude": probe_location["longitude"],
-                "rtt_min": ping_result["min"],
-                "radius": ping_radius
-            })
+        pings_results = self._results_measurements["measurements"]["pings"]
+        probes_info = self._probe_cache.get_many(
+            [ping_result["prb_id"] for ping_result in pings_results])
+        self._ping_discs.extend(build_ping_discs(pings_results, probes_info))
 
         self._results_measurements["measurements"]["ping_discs"] = \
             self._ping_discs
 
-        if all(ping["radius"] == -1 for ping in self._ping_discs):
-            return False
-
         # Check all disc intersection
-        for disc1 in self._ping_discs:
-            for disc2 in self._ping_discs:
-                if disc1 == disc2:
-                    continue
-                elif disc1["radius"] == -1 or disc2["radius"] == -1:
-                    continue
-                elif check_discs_intersect(disc1, disc2):
-                    continue
-                else:
-                    return False
-        return True
-
-    def check_airports_inside_intersection(self):
-        airports_df = pd.read_csv(AIRPORTS_INFO_FILEPATH, sep="\t")
-        airports_df.drop(["pop",
-                          "heuristic",
-                          "1", "2", "3"], axis=1, inplace=True)
-
-        def check_inside_intersection(airport_code) -> bool:
-            airport_to_check = airports_df[
-                (airports_df["#IATA"] == airport_code)
-            ]
-            lat_long_string = airport_to_check["lat long"].values[0]
-            (airport_lat, airport_lon) = lat_long_string.split(" ")
-            a = {"latitude": float(airport_lat),
-                 "longitude": float(airport_lon)}
-            for disc in self._ping_discs:
-                b = {"latitude": disc["latitude"],
-                     "longitude": disc["longitude"]}
-                if distance(a=a, b=b) < disc["radius"]:
-                    continue
-                else:
-                    return False
-            return True
-
-        airports_df["inside_intersection"] = airports_df["#IATA"].apply(
-            lambda airport_code: check_inside_intersection(airport_code)
-        )
-
-        airports_inside_df = airports_df[(
-                airports_df["inside_intersection"] == True
-        )].copy()
-
-        cities_results = list(airports_inside_df["city"].unique())
-        countries_results = list(airports_inside_df["country_code"].unique())
-        airports_inside_df.drop(["inside_intersection"], axis=1, inplace=True)
-        airports_inside_df.rename(columns={"#IATA": "IATA_code"}, inplace=True)
-        airports_located = airports_inside_df.to_dict("records")
-        for airport_located in airports_located:
-            (lat, lon) = airport_located["lat long"].split(" ")
-            airport_located["latitude"] = float(lat)
-            airport_located["longitude"] = float(lon)
-            airport_located.pop("lat long", None)
-
-        if len(airports_located) == 0:
-            centroid = from_geojson(
-                self._results_measurements["result"]["advanced"]["centroid"])
-            airports_located = [get_nearest_airport_to_point(point=centroid)]
-
-            cities_results = [airports_located[0]["city"]]
-            countries_results = [airports_located[0]["country_code"]]
-
-        if len(cities_results) == 1:
-            self._results_measurements["result"]["city_result"] = \
-                cities_results[0]
-        else:
-            self._results_measurements["result"]["city_result"] = \
-                "Indeterminate"
-
-        if len(countries_results) == 1:
-            self._results_measurements["result"]["country_result"] = \
-                countries_results[0]
-        else:
-            self._results_measurements["result"]["country_result"] = \
-                "Indeterminate"
-
+        return check_ping_discs_intersect(self._ping_discs)
+
+    def check_airports_inside_intersection(self, intersection: Geometry):
+        airports_info = locate_airports_inside_intersection(
+            intersection=intersection,
+            centroid=self._results_measurements["result"]["advanced"][
+                "centroid"],
+            ping_discs=self._ping_discs)
+
+        self._results_measurements["result"]["city_result"] = \
+            airports_info["city_result"]
+        self._results_measurements["result"]["country_result"] = \
+            airports_info["country_result"]
         self._results_measurements["result"]["advanced"]["cities_list"] = \
-            cities_results
+            airports_info["cities_list"]
         self._results_measurements["result"]["advanced"]["countries_list"] = \
-            countries_results
+            airports_info["countries_list"]
         self._results_measurements["result"]["advanced"]["airports_list"] = \
-            airports_located
+            airports_info["airports_list"]
 
         print("Cities locations detected: ")
-        [print(city) for city in cities_results]
+        [print(city) for city in airports_info["cities_list"]]
         print("Countries detected: ")
-        [print(country) for country in countries_results]
+        [print(country) for country in airports_info["countries_list"]]
 
     def save_result(self):
-        self.add_validation_suffix()
-        dict_to_json_file(self._results_measurements, self._result_filepath)
+        # Keep the current validation variant as a small view, all of them
+        # are written with the raw measurements by save_hunt_record
+        self._validation_views[self.get_validation_suffix()] = \
+            build_validation_view(self._results_measurements)
+
+    def get_hunt_record(self) -> dict:
+        hunt_record = dict(self._results_measurements)
+        hunt_record["validation_views"] = self._validation_views
+        return hunt_record
+
+    def save_hunt_record(self):
+        if not self._save_to_file:
+            return
+        self.build_measurement_filepath()
+        dict_to_json_file(self.get_hunt_record(), self._result_filepath)
 
     def save_result_with_double_target_validation(self):
         if self._target_validation and self._last_hop_validation:
@@ -645,11 +609,40 @@ class Hunter:
             # save no_ip_validation
             self.save_result()
 
+        self.save_hunt_record()
+
 # Not class exclusive functions
 
     def find_probes_in_circle(self,
                               latitude: float, longitude: float,
                               radius: float, num_probes: int) -> list:
+        try:
+            ids_selected = self._probe_catalog.select_probes(
+                latitude=latitude,
+                longitude=longitude,
+                radius=radius,
+                num_probes=num_probes,
+                excluded_ip=self._target,
+                selection_seed=self._probe_selection_seed
+            )
+            # Ping discs will need these probes coordinates
+            self._probe_cache.put_many([
+                self._probe_catalog.get_probe(probe_id)
+                for probe_id in ids_selected
+            ])
+            return ids_selected
+        except ProbeCatalogUnavailable:
+            print("Probe catalog unavailable, querying RIPE Atlas")
+            return self.find_probes_in_circle_online(
+                latitude=latitude,
+                longitude=longitude,
+                radius=radius,
+                num_probes=num_probes
+            )
+
+    def find_probes_in_circle_online(self,
+                                     latitude: float, longitude: float,
+                                     radius: float, num_probes: int) -> list:
         radius_filter = "radius={},{}:{}".format(latitude, longitude, radius)
         connected_filter = "status_name=Connected"
         fields = "fields=id,geometry,address_v4"
@@ -657,14 +650,14 @@ class Hunter:
                                    radius_filter,
                                    connected_filter,
                                    fields)
-        probes_inside = requests.get(url=url).json()
+        probes_inside = self._http_client.get(url=url).json()
         not_target_ip_probes = list(filter(
             lambda probe: probe["address_v4"] != self._target,
             probes_inside["results"]
         ))
         if len(not_target_ip_probes) == 0:
             print("No probes in a {} km circle.".format(radius))
-            return self.find_probes_in_circle(
+            return self.find_probes_in_circle_online(
                 latitude=latitude,
                 longitude=longitude,
                 radius=radius + 10,
@@ -672,14 +665,18 @@ class Hunter:
             )
         elif len(not_target_ip_probes) < num_probes:
             print("Less than {} probes suitable in area".format(num_probes))
-            return self.find_probes_in_circle(
+            return self.find_probes_in_circle_online(
                 latitude=latitude,
                 longitude=longitude,
                 radius=radius + 10,
                 num_probes=num_probes
             )
         else:
-            probes_selected = random.sample(not_target_ip_probes, num_probes)
+            probes_selected = sample_probes(not_target_ip_probes, num_probes,
+                                            latitude, longitude, radius,
+                                            self._probe_selection_seed)
+            self._probe_cache.put_many(
+                [normalize_probe(probe) for probe in probes_selected])
             ids_selected = [probe["id"] for probe in probes_selected]
             return ids_selected
 
@@ -692,32 +689,8 @@ class Hunter:
         else:
             return True
 
-    def geolocate_with_geocoder(self, ip: str) -> dict:
-        (latitude, longitude) = geocoder.ip(ip).latlng
-        return {
-            "latitude": latitude,
-            "longitude": longitude
-        }
-
     def geolocate_with_ipinfo(self, ip: str) -> dict:
-        access_token = json_file_to_dict(KEY_FILEPATH)["ipinfo_token"]
-        handler = ipinfo.getHandler(access_token)
-        details = handler.getDetails(ip)
-        return {
-            "latitude": details.latitude,
-            "longitude": details.longitude
-        }
-
-    def get_probe_coordinates(self, probe_id: int) -> dict:
-        url = RIPE_ATLAS_PROBES_BASE_URL + "/%s" % probe_id
-        probe_response = requests.get(url).json()
-
-        latitude = probe_response["geometry"]["coordinates"][1]
-        longitude = probe_response["geometry"]["coordinates"][0]
-        return {
-            "latitude": latitude,
-            "longitude": longitude
-        }
+        return self._geolocation_service.geolocate(ip)
 
     # def make_box_centered_on_origin(self) -> Polygon:
     #     return box(xmin=self._origin[0] - self._separation,
@@ -727,15 +700,12 @@ class Hunter:
 
     def obtain_cf_ray(self):
         try:
-            headers = requests.get("http://{}".format(self._target)).headers
+            headers = self._http_client.get(
+                "http://{}".format(self._target)).headers
             cf_ray_iata_code = headers["cf-ray"].split("-")[1]
 
-            airports_df = pd.read_csv(AIRPORTS_INFO_FILEPATH, sep="\t")
-            airports_df.drop(["pop",
-                              "heuristic",
-                              "1", "2", "3"], axis=1, inplace=True)
-            mask = airports_df["#IATA"].values == cf_ray_iata_code
-            airport_cf_ray = airports_df[mask].to_dict("records")[0]
+            airport_cf_ray = get_airport_catalog().get_airport(
+                cf_ray_iata_code)
 
             self._results_measurements["gt_info"] = airport_cf_ray
 
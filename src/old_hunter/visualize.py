@@ -8,14 +8,14 @@ from shapely import Point, Polygon, MultiPolygon
 
 # internal imports
 from ..utils.common_functions import (
-    json_file_to_dict,
     convert_km_radius_to_degrees,
 )
+from ..core.result_record import load_hunt_result
 
 
 def plot_file(filepath: str) -> None:
     try:
-        data_keys = json_file_to_dict(filepath).keys()
+        data_keys = load_hunt_result(filepath).keys()
     except Exception as e:
         print("Exception provocated because bad file")
         print(e)
@@ -28,7 +28,7 @@ def plot_file(filepath: str) -> None:
 
 
 def plot_hunter_result(filepath: str) -> None:
-    hunter_result = json_file_to_dict(filepath)
+    hunter_result = load_hunt_result(filepath)
     fig = go.Figure()
     # Add origin
     fig.add_trace(go.Scattergeo(
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import numpy as np
+from typing import TYPE_CHECKING
+from shapely import Geometry, contains_xy, prepare
+from shapely.affinity import translate
+# internal imports
+from .constants import (
+    AIRPORTS_INFO_FILEPATH,
+    EARTH_RADIUS_KM
+)
+from .geo_distance import distances_one_to_many
+
+if TYPE_CHECKING:
+    import pandas
+
+
+class AirportCatalog:
+    """
+    Airports file parsed once into float coordinate arrays, an IATA index and
+    an R-tree over (longitude, latitude) points. Records are returned with
+    the same keys the airports DataFrame used to produce.
+    """
+
+    def __init__(self, filepath: str = AIRPORTS_INFO_FILEPATH):
+        # Imported here, only hunts consulting airports pay their import
+        import pandas as pd
+        from rtree import index
+
+        airports_df = pd.read_csv(filepath, sep="\t")
+        airports_df.drop(["pop",
+                          "heuristic",
+                          "1", "2", "3"], axis=1, inplace=True)
+        airports_df.reset_index(drop=True, inplace=True)
+        self._airports_df = airports_df
+        self._records = airports_df.to_dict("records")
+
+        airports_location = airports_df["lat long"].str.split(" ", expand=True)
+        self._latitudes = airports_location[0].astype(float).values
+        self._longitudes = airports_location[1].astype(float).values
+
+        # First appearance wins, as the boolean mask lookups did
+        self._iata_index = {}
+        for position, iata_code in enumerate(airports_df["#IATA"].values):
+            self._iata_index.setdefault(iata_code, position)
+
+        self._spatial_index = index.Index(
+            (position, (lon, lat, lon, lat), None)
+            for position, (lon, lat) in enumerate(
+                zip(self._longitudes, self._latitudes))
+        )
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def airports_df(self) -> "pandas.DataFrame":
+        return self._airports_df
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self._latitudes
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self._longitudes
+
+    def get_record(self, position: int) -> dict:
+        return dict(self._records[position])
+
+    def get_airport(self, iata_code: str) -> dict:
+        return self.get_record(self._iata_index[iata_code])
+
+    def nearest_airport(self, latitude: float, longitude: float) -> dict:
+        # The R-tree nearest is planar, it only bounds the exact search
+        planar_nearest = next(self._spatial_index.nearest(
+            (longitude, latitude, longitude, latitude), 1))
+        radius = distances_one_to_many(
+            latitude, longitude,
+            self._latitudes[planar_nearest],
+            self._longitudes[planar_nearest]).item()
+
+        candidates = self._positions_in_radius_box(latitude, longitude, radius)
+        distances = distances_one_to_many(
+            latitude, longitude,
+            self._latitudes[candidates], self._longitudes[candidates])
+        nearest_index = np.flatnonzero(distances == distances.min())
+        # Keep file order on ties
+        nearest = nearest_index[np.argmin(candidates[nearest_index])]
+
+        airport = self.get_record(candidates[nearest])
+        airport["distance"] = distances[nearest].item()
+        return airport
+
+    def airports_inside_polygon(self, polygon: Geometry) -> np.ndarray:
+        """
+        :param polygon: shapely geometry in (longitude, latitude) coordinates,
+            it may cross the antimeridian
+        :return: positions of airports inside polygon, in file order
+        """
+        if polygon is None or polygon.is_empty:
+            return np.empty(0, dtype=int)
+        inside = []
+        # Parts beyond +-180 are looked up again one turn away
+        for longitude_offset in (-360, 0, 360):
+            shifted = polygon if longitude_offset == 0 \
+                else translate(polygon, xoff=longitude_offset)
+            (lon_min, lat_min, lon_max, lat_max) = shifted.bounds
+            if lon_max < -180 or lon_min > 180:
+                continue
+            candidates = np.fromiter(self._spatial_index.intersection(
+                (lon_min, lat_min, lon_max, lat_max)), dtype=int)
+            prepare(shifted)
+            inside.append(candidates[contains_xy(
+                shifted,
+                self._longitudes[candidates],
+                self._latitudes[candidates])])
+        return np.unique(np.concatenate(inside)) if len(inside) > 0 \
+            else np.empty(0, dtype=int)
+
+    def _positions_in_radius_box(self, latitude: float, longitude: float,
+                                 radius: float) -> np.ndarray:
+        latitude_delta = math.degrees(radius / EARTH_RADIUS_KM)
+        latitude_min = latitude - latitude_delta
+        latitude_max = latitude + latitude_delta
+        if latitude_min <= -90 or latitude_max >= 90:
+            return np.arange(len(self._records))
+
+        # Widest longitude extent of a spherical cap centered at latitude
+        longitude_delta = math.degrees(math.asin(min(
+            1.0,
+            math.sin(radius / EARTH_RADIUS_KM) /
+            math.cos(math.radians(latitude)))))
+        longitude_min = longitude - longitude_delta
+        longitude_max = longitude + longitude_delta
+        if longitude_min < -180 or longitude_max > 180:
+            return np.arange(len(self._records))
+
+        # Small margin so points on the border are never lost
+        return np.sort(np.fromiter(self._spatial_index.intersection((
+            longitude_min - 1e-6, latitude_min - 1e-6,
+            longitude_max + 1e-6, latitude_max + 1e-6
+        )), dtype=int))
+
+
+__airport_catalog = None
+
+
+def get_airport_catalog() -> AirportCatalog:
+    global __airport_catalog
+    if __airport_catalog is None:
+        __airport_catalog = AirportCatalog()
+    return __airport_catalog
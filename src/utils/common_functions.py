@@ -2,14 +2,13 @@
 # -*- coding: utf-8 -*-
 
 # external imports
-import requests
 import json
 import csv
 import math
 import os
-import pandas as pd
+import numpy as np
 from shapely import Point, Polygon, box
-from shapely import intersection_all, centroid
+from shapely import centroid
 from shapely import to_geojson
 import socket
 # internal imports
@@ -23,8 +22,15 @@ from .constants import (
     SPEED_OF_LIGHT,
     VERLOC_APROX_PATH,
     VERLOC_GAP,
-    AIRPORTS_INFO_FILEPATH
+    DISC_POLYGON_VERTICES
 )
+from .rtt_distance import RttDistanceInverter, get_rtt_distance_inverter
+from .geo_distance import (
+    great_circle_distances,
+    pairwise_distances
+)
+from .airport_catalog import get_airport_catalog
+from .disc_intersection import intersect_geodesic_discs
 
 
 def create_directory_structure(path: str) -> None:
@@ -38,6 +44,8 @@ def create_directory_structure(path: str) -> None:
 
 
 def update_root_servers_json():
+    import requests
+
     for root_name in ROOT_SERVERS_NAMES:
         request = requests.get(
             url=ROOT_SERVERS_URL + root_name + "/json").json()
@@ -87,41 +95,10 @@ def list_of_dicts_to_csv(list: list, file_path: str):
 
 
 def distance(a: dict, b: dict) -> float:
-    lat1 = a["latitude"]
-    lat2 = b["latitude"]
-    lon1 = a["longitude"]
-    lon2 = b["longitude"]
-
-    # Convert latitude and longitude to
-    # spherical coordinates in radians.
-    degrees_to_radians = math.pi / 180.0
-
-    # phi = 90 - latitude
-    phi1 = (90.0 - lat1) * degrees_to_radians
-    phi2 = (90.0 - lat2) * degrees_to_radians
-
-    # theta = longitude
-    theta1 = lon1 * degrees_to_radians
-    theta2 = lon2 * degrees_to_radians
-
-    # Compute spherical distance from spherical coordinates.
-
-    # For two locations in spherical coordinates
-    # (1, theta, phi) and (1, theta, phi)
-    # cosine( arc length ) =
-    #    sin phi sin phi' cos(theta-theta') + cos phi cos phi'
-    # distance = rho * arc length
-
-    cos = (math.sin(phi1) * math.sin(phi2) * math.cos(theta1 - theta2) +
-           math.cos(phi1) * math.cos(phi2))
-    if abs(cos - 1.0) < 0.000000000000001:
-        arc = 0.0
-    else:
-        arc = math.acos(cos)
-
-    # Remember to multiply arc by the radius of the earth
-    # in your favorite set of units to get length.
-    return arc * EARTH_RADIUS_KM
+    return great_circle_distances(
+        a["latitude"], a["longitude"],
+        b["latitude"], b["longitude"]
+    ).item()
 
 
 def check_discs_intersect(disc1: dict, disc2: dict) -> bool:
@@ -140,6 +117,25 @@ def check_discs_intersect(disc1: dict, disc2: dict) -> bool:
         return False
 
 
+def check_all_discs_intersect(discs: list) -> bool:
+    """
+    :param discs: list of dicts with latitude, longitude and radius
+    :return: True if every pair of discs intersect, discs with radius -1
+        are ignored
+    """
+    latitudes = np.array([disc["latitude"] for disc in discs], dtype=float)
+    longitudes = np.array([disc["longitude"] for disc in discs], dtype=float)
+    radius = np.array([disc["radius"] for disc in discs], dtype=float)
+
+    centers_separation = pairwise_distances(latitudes, longitudes)
+    discs_intersect = centers_separation < (radius[:, np.newaxis] +
+                                            radius[np.newaxis, :])
+    valid = radius != -1
+    valid_pairs = valid[:, np.newaxis] & valid[np.newaxis, :]
+    np.fill_diagonal(valid_pairs, False)
+    return bool(np.all(discs_intersect | ~valid_pairs))
+
+
 def get_light_factor_from_distance(dist: float) -> float:
     return 0.0061699 * (dist ** 0.480214) + 0.0497791
     # return 0.152616 * math.log(0.251783 * dist + 130.598) - 0.693072
@@ -149,7 +145,8 @@ def get_time_from_distance(dist: float) -> float:
     return dist / (get_light_factor_from_distance(dist) * SPEED_OF_LIGHT)
 
 
-def generate_approximation_numeric_values():
+def generate_approximation_numeric_values(
+        file_path: str = VERLOC_APROX_PATH):
     max_distance_calculated = 5000 + VERLOC_GAP
     distances = list(range(0, max_distance_calculated, VERLOC_GAP))
     time_results = {}
@@ -158,31 +155,23 @@ def generate_approximation_numeric_values():
         time_travel = get_time_from_distance(dist) * 1000
         time_results[time_travel] = dist
 
-    dict_to_json_file(time_results, VERLOC_APROX_PATH)
+    dict_to_json_file(time_results, file_path)
 
 
 def get_distance_from_rtt(rtt: float) -> float:
     # We do not have the direct function, so we approximate it with the inverse
-    # Set approximation values
-    if rtt < 0:
-        return rtt
+    return get_rtt_distance_inverter().distance_from_rtt(rtt)
 
-    try:
-        time_results = json_file_to_dict(VERLOC_APROX_PATH)
-    except:
-        generate_approximation_numeric_values()
-        time_results = json_file_to_dict(VERLOC_APROX_PATH)
-
-    trip_time_ms = rtt / 2
-    # Get nearest value from calculated
-    nearest_value = min(time_results,
-                        key=lambda x: abs(float(x) - trip_time_ms))
-
-    distance_result = time_results[nearest_value]
-    if distance_result == 0:
-        return VERLOC_GAP
-    else:
-        return distance_result
+
+def get_distances_from_rtts(
+        rtts: list,
+        rtt_distance_inverter: RttDistanceInverter = None) -> list:
+    if rtt_distance_inverter is None:
+        rtt_distance_inverter = get_rtt_distance_inverter()
+    distances = rtt_distance_inverter.distances_from_rtts(rtts)
+    # Negative RTTs are returned as given, as get_distance_from_rtt does
+    return [rtt if rtt < 0 else int(dist) if dist.is_integer() else dist
+            for rtt, dist in zip(rtts, distances.tolist())]
 
 
 def alpha2_code_to_alpha3(alpha2: str) -> str:
@@ -257,53 +246,28 @@ def convert_km_radius_to_degrees(km_radius: float) -> float:
 
 
 def get_nearest_airport_to_point(point: Point) -> dict:
-    airports_df = pd.read_csv(AIRPORTS_INFO_FILEPATH, sep="\t")
-    airports_df.drop(["pop",
-                      "heuristic",
-                      "1", "2", "3"], axis=1, inplace=True)
-
-    airports_df["distance"] = airports_df["lat long"].apply(
-        lambda airport_location: distance(
-            a={
-                "latitude": point.y,
-                "longitude": point.x
-            },
-            b={
-                "latitude": float(airport_location.split(" ")[0]),
-                "longitude": float(airport_location.split(" ")[1])
-            }
-        )
+    return get_airport_catalog().nearest_airport(
+        latitude=point.y,
+        longitude=point.x
     )
 
-    return airports_df[
-        airports_df["distance"] == airports_df["distance"].min()
-        ].to_dict("records")[0]
-
-
-def calculate_hunter_pings_intersection_area(ping_discs: list) -> dict:
-    discs_to_intersect = []
-    for ping_disc in ping_discs:
-        if ping_disc["radius"] == -1:
-            continue
-
-        disc = Point(
-            ping_disc["longitude"],
-            ping_disc["latitude"]
-        ).buffer(convert_km_radius_to_degrees(ping_disc["radius"]))
-        discs_to_intersect.append(disc)
 
-    intersection = intersection_all(discs_to_intersect)
-    intersection_centroid = centroid(intersection)
+def calculate_hunter_pings_intersection_area(
+        ping_discs: list,
+        vertices: int = DISC_POLYGON_VERTICES) -> dict:
+    intersection = intersect_geodesic_discs(ping_discs, vertices=vertices)
 
-    if intersection.is_empty:
+    if intersection is None:
         return {
             "intersection": None,
-            "centroid": None
+            "centroid": None,
+            "geometry": None
         }
     else:
         return {
             "intersection": to_geojson(intersection),
-            "centroid": to_geojson(intersection_centroid)
+            "centroid": to_geojson(centroid(intersection)),
+            "geometry": intersection
         }
 
 
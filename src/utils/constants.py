@@ -29,6 +29,15 @@ __GROUND_TRUTH_PATH = __DATA_PATH + "ground-truth/"
 ROOT_SERVERS_PATH = __GROUND_TRUTH_PATH + "root_servers/"
 CLOUDFARE_PATH = __GROUND_TRUTH_PATH + "cloudfare/"
 
+# Caches
+__CACHE_PATH = __DATA_PATH + "cache/"
+PROBES_CATALOG_FILEPATH = __CACHE_PATH + "probes_catalog.json"
+PROBES_CACHE_FILEPATH = __CACHE_PATH + "probes.sqlite"
+GEOLOCATION_CACHE_FILEPATH = __CACHE_PATH + "geolocation.sqlite"
+TRACEROUTE_CACHE_FILEPATH = __CACHE_PATH + "traceroutes.sqlite"
+ANNOUNCED_PREFIXES_CACHE_FILEPATH = __CACHE_PATH + "announced_prefixes.sqlite"
+IP_RANGE_INDEX_PATH = __CACHE_PATH + "ip_range_index/"
+
 ###############################################################################
 
 # Results path
@@ -37,10 +46,14 @@ __RESULTS_PATH = "results/"
 # Measurements
 MEASUREMENTS_PATH = __RESULTS_PATH + "measurements/"
 MEASUREMENTS_CAMPAIGNS_PATH = MEASUREMENTS_PATH + "campaigns/"
+CAMPAIGN_STORE_FILEPATH = MEASUREMENTS_CAMPAIGNS_PATH + "campaigns.sqlite"
 
 # Statistics
 STATISTICS_PATH = __RESULTS_PATH + "statistics/"
 
+# Progress of the campaign runs
+CAMPAIGN_CHECKPOINTS_PATH = __RESULTS_PATH + "checkpoints/"
+
 ###############################################################################
 
 # URLs
@@ -48,6 +61,21 @@ ROOT_SERVERS_URL = "https://root-servers.org/root/"
 RIPE_ATLAS_API_BASE_URL = "https://atlas.ripe.net/api/v2/"
 RIPE_ATLAS_MEASUREMENTS_BASE_URL = RIPE_ATLAS_API_BASE_URL + "measurements/"
 RIPE_ATLAS_PROBES_BASE_URL = RIPE_ATLAS_API_BASE_URL + "probes/"
+IPINFO_API_BASE_URL = "https://ipinfo.io/"
+RIPESTAT_NETWORK_INFO_URL = \
+    "https://stat.ripe.net/data/network-info/data.json"
+# Public address whose route tells the host network, never contacted
+HOST_ROUTE_CHECK_ADDRESS = "8.8.8.8"
+RIPE_ATLAS_PROBES_ARCHIVE_URL = \
+    "https://ftp.ripe.net/ripe/atlas/probes/archive/meta-latest"
+
+# Validation variants of every hunt result
+VALIDATION_SUFFIXES = (
+    "ip_all_validation",
+    "ip_target_validation",
+    "ip_last_hop_validation",
+    "no_ip_validation"
+)
 
 # Others
 ROOT_SERVERS_NAMES = [
@@ -74,3 +102,74 @@ NEAR_CITY_TP_KM = 100
 # Units = [km/s]
 SPEED_OF_LIGHT = 299792.458
 VERLOC_GAP = 5
+# HTTP client, units = [s]
+HTTP_TIMEOUT = 30
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 10
+# Results polling per measurement type, units = [s]
+POLLING_PARAMETERS = {
+    "traceroute": {
+        "initial_delay": 10, "backoff": 1.5, "max_delay": 30, "jitter": 0.2,
+        "max_attempts": 15, "max_wait": 300
+    },
+    "ping": {
+        "initial_delay": 4, "backoff": 1.5, "max_delay": 20, "jitter": 0.2,
+        "max_attempts": 15, "max_wait": 200
+    },
+    "default": {
+        "initial_delay": 5, "backoff": 1.5, "max_delay": 15, "jitter": 0.2,
+        "max_attempts": 10, "max_wait": 150
+    }
+}
+POLLING_TIMESTAMP_MARGIN = 300
+# Results downloads in parallel when polling concurrent hunts together
+RESULTS_POLLING_WORKERS = 8
+# Measurements due this close to the earliest one are polled with it
+RESULTS_POLLING_MARGIN = 0.5
+# Fraction of the scheduled probes whose results are enough
+RESULTS_QUORUM = 1.0
+MEASUREMENT_FINAL_STATUSES = (
+    "Stopped", "Forced to stop", "No suitable probes", "Failed", "Denied",
+    "Canceled"
+)
+# Measurement definitions packed per RIPE Atlas request, units = [s]
+MEASUREMENT_BATCH_WINDOW = 2
+MEASUREMENT_BATCH_MAX_SIZE = 100
+# Hunts in flight at the same time
+HUNT_CONCURRENCY = 8
+# Host traceroutes, add "--tcp" or "--icmp" to change the protocol
+HOST_TRACEROUTE_COMMAND = ("traceroute", "-n")
+HOST_TRACEROUTE_CONCURRENCY = 8
+# Units = [s]
+HOST_TRACEROUTE_TIMEOUT = 120
+# Units = [s]
+PROBES_CATALOG_TTL = 24 * 60 * 60
+PROBES_CACHE_SIZE = 4096
+GEOLOCATION_CACHE_SIZE = 16384
+GEOLOCATION_CACHE_TTL = 7 * 24 * 60 * 60
+# Host traceroutes cached per (origin, target prefix, protocol). Within
+# the reuse window a traceroute to the same target is taken as it is,
+# within the freshness window only the tail is measured again
+TRACEROUTE_CACHE_SIZE = 4096
+TRACEROUTE_CACHE_REUSE = 60 * 60
+TRACEROUTE_CACHE_FRESHNESS = 24 * 60 * 60
+# Hops measured again before the destination when revalidating
+TRACEROUTE_CACHE_TAIL_HOPS = 2
+ANNOUNCED_PREFIXES_CACHE_SIZE = 16384
+ANNOUNCED_PREFIXES_CACHE_TTL = 7 * 24 * 60 * 60
+# Members of every announced prefix hunted to confirm its result
+PREFIX_GROUP_SPOT_CHECKS = 1
+IPINFO_BATCH_MAX_SIZE = 1000
+# Vertices of every geodesic ping disc polygon
+DISC_POLYGON_VERTICES = 64
+# Hunts read from the campaign store per SQLite fetch
+CAMPAIGN_STORE_FETCH_SIZE = 256
+# Stored hunts queued per process while reanalysing
+REANALYSIS_TASKS_PER_PROCESS = 4
+# Phases timed by Hunter.hunt, in order
+HUNT_PHASES = ("cf_ray", "traceroute", "last_hop", "pings", "intersection")
+STATISTICS_AREA_PERCENTILES = (0.1, 0.5, 0.9)
+# Longest single sleep while waiting for the next campaign slot, units = [s]
+SCHEDULER_MAX_SLEEP = 300
@@ -31,3 +31,11 @@ class IncompatibleArguments(Exception):
 
 class InternalError(Exception):
     pass
+
+
+class ProbeCatalogUnavailable(Exception):
+    pass
+
+
+class GeolocationNotFound(Exception):
+    pass
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import numpy as np
+from shapely import Polygon, box, intersection, prepare
+from shapely.affinity import translate
+# internal imports
+from .constants import (
+    EARTH_RADIUS_KM,
+    DISC_POLYGON_VERTICES
+)
+
+
+def unwrap_longitude(longitude: float, reference: float) -> float:
+    """
+    :return: longitude shifted by whole turns to be closest to reference
+    """
+    return longitude - 360 * round((longitude - reference) / 360)
+
+
+def geodesic_disc_bounds(latitude: float, longitude: float,
+                         radius: float) -> tuple:
+    """
+    :return: (lon_min, lat_min, lon_max, lat_max) of the spherical cap, the
+        longitudes are not normalized to [-180, 180]
+    """
+    angular_radius = math.degrees(radius / EARTH_RADIUS_KM)
+    latitude_min = latitude - angular_radius
+    latitude_max = latitude + angular_radius
+    if latitude_max >= 90 or latitude_min <= -90:
+        return (longitude - 180, max(latitude_min, -90),
+                longitude + 180, min(latitude_max, 90))
+
+    longitude_delta = math.degrees(math.asin(min(
+        1.0,
+        math.sin(radius / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+    )))
+    return (longitude - longitude_delta, latitude_min,
+            longitude + longitude_delta, latitude_max)
+
+
+def geodesic_disc_polygon(latitude: float, longitude: float, radius: float,
+                          vertices: int = DISC_POLYGON_VERTICES) -> Polygon:
+    """
+    Polygon in (longitude, latitude) whose vertices are at radius km from
+    the center along vertices evenly spaced bearings. Caps over a pole are
+    closed along the pole line, so they stay valid planar polygons.
+    """
+    angular_radius = radius / EARTH_RADIUS_KM
+    if angular_radius >= math.pi:
+        return box(longitude - 180, -90, longitude + 180, 90)
+
+    center_latitude = math.radians(latitude)
+    bearings = np.linspace(0, 2 * np.pi, vertices + 1)
+    ring_latitudes = np.arcsin(
+        math.sin(center_latitude) * math.cos(angular_radius) +
+        math.cos(center_latitude) * math.sin(angular_radius) *
+        np.cos(bearings))
+    longitude_offsets = np.arctan2(
+        np.sin(bearings) * math.sin(angular_radius) *
+        math.cos(center_latitude),
+        math.cos(angular_radius) -
+        math.sin(center_latitude) * np.sin(ring_latitudes))
+    ring_longitudes = longitude + np.degrees(np.unwrap(longitude_offsets))
+    ring_latitudes = np.degrees(ring_latitudes)
+
+    north_pole_inside = math.degrees(angular_radius) >= 90 - latitude
+    south_pole_inside = math.degrees(angular_radius) >= 90 + latitude
+    if north_pole_inside and south_pole_inside:
+        return box(longitude - 180, -90, longitude + 180, 90)
+
+    ring = list(zip(ring_longitudes, ring_latitudes))
+    if north_pole_inside or south_pole_inside:
+        pole_latitude = 90 if north_pole_inside else -90
+        ring.append((ring_longitudes[-1], pole_latitude))
+        ring.append((ring_longitudes[0], pole_latitude))
+    return Polygon(ring)
+
+
+def intersect_geodesic_discs(discs: list,
+                             vertices: int = DISC_POLYGON_VERTICES):
+    """
+    :param discs: list of dicts with latitude, longitude and radius in km,
+        discs with radius -1 are ignored
+    :param vertices: vertices used for every disc polygon
+    :return: prepared intersection geometry, None when discs do not
+        intersect or no disc is valid
+    """
+    valid_discs = sorted(
+        [disc for disc in discs if disc["radius"] != -1],
+        key=lambda disc: disc["radius"])
+    if len(valid_discs) == 0:
+        return None
+
+    # Every disc is placed in the longitude frame of the smallest one
+    reference_longitude = float(valid_discs[0]["longitude"])
+    discs_centers = [
+        (float(disc["latitude"]),
+         unwrap_longitude(float(disc["longitude"]), reference_longitude),
+         float(disc["radius"]))
+        for disc in valid_discs
+    ]
+
+    # Cheap rejection with bounding boxes before building any polygon
+    (lon_min, lat_min, lon_max, lat_max) = (-math.inf, -math.inf,
+                                            math.inf, math.inf)
+    for (latitude, longitude, radius) in discs_centers:
+        bounds = geodesic_disc_bounds(latitude, longitude, radius)
+        lon_min = max(lon_min, bounds[0])
+        lat_min = max(lat_min, bounds[1])
+        lon_max = min(lon_max, bounds[2])
+        lat_max = min(lat_max, bounds[3])
+        if lon_min > lon_max or lat_min > lat_max:
+            return None
+
+    # Smallest discs first keep the running intersection small
+    area = None
+    for (latitude, longitude, radius) in discs_centers:
+        disc = geodesic_disc_polygon(latitude, longitude, radius, vertices)
+        area = disc if area is None else intersection(area, disc)
+        if area.is_empty:
+            return None
+
+    # Move the result back to [-180, 180] when the frame was shifted
+    area_longitude = area.centroid.x
+    if area_longitude > 180 or area_longitude < -180:
+        area = translate(area,
+                         xoff=unwrap_longitude(area_longitude, 0) -
+                         area_longitude)
+    prepare(area)
+    return area
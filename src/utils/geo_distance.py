@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+# internal imports
+from .constants import EARTH_RADIUS_KM
+
+
+def great_circle_distances(latitudes_a, longitudes_a,
+                           latitudes_b, longitudes_b) -> np.ndarray:
+    """
+    Element-wise spherical distance in km, inputs in degrees are broadcast
+    following NumPy rules.
+    """
+    phi_a = np.radians(90.0 - np.asarray(latitudes_a, dtype=float))
+    phi_b = np.radians(90.0 - np.asarray(latitudes_b, dtype=float))
+    theta_a = np.radians(np.asarray(longitudes_a, dtype=float))
+    theta_b = np.radians(np.asarray(longitudes_b, dtype=float))
+
+    # cosine( arc length ) =
+    #    sin phi sin phi' cos(theta-theta') + cos phi cos phi'
+    cos = (np.sin(phi_a) * np.sin(phi_b) * np.cos(theta_a - theta_b) +
+           np.cos(phi_a) * np.cos(phi_b))
+    arc = np.where(np.abs(cos - 1.0) < 0.000000000000001,
+                   0.0,
+                   np.arccos(np.clip(cos, -1.0, 1.0)))
+    return arc * EARTH_RADIUS_KM
+
+
+def distances_one_to_many(latitude: float, longitude: float,
+                          latitudes, longitudes) -> np.ndarray:
+    """
+    :return: shape (n,) distances from one point to n points
+    """
+    return great_circle_distances(latitude, longitude, latitudes, longitudes)
+
+
+def distance_matrix(latitudes_a, longitudes_a,
+                    latitudes_b, longitudes_b) -> np.ndarray:
+    """
+    :return: shape (n, m) distances from every point in a to every point in b
+    """
+    return great_circle_distances(
+        np.asarray(latitudes_a, dtype=float)[:, np.newaxis],
+        np.asarray(longitudes_a, dtype=float)[:, np.newaxis],
+        np.asarray(latitudes_b, dtype=float)[np.newaxis, :],
+        np.asarray(longitudes_b, dtype=float)[np.newaxis, :])
+
+
+def pairwise_distances(latitudes, longitudes) -> np.ndarray:
+    """
+    :return: shape (n, n) symmetric distances between n points
+    """
+    return distance_matrix(latitudes, longitudes, latitudes, longitudes)
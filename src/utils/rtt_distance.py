@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import numpy as np
+# internal imports
+from .constants import (
+    VERLOC_APROX_PATH,
+    VERLOC_GAP
+)
+
+
+class RttDistanceInverter:
+    """
+    In-memory inverse of get_time_from_distance. The approximation table is
+    read once into sorted numeric arrays and every query is a bisection over
+    them, returning the same nearest-value distance the JSON lookup used to.
+    """
+
+    def __init__(self, approximation_filepath: str = VERLOC_APROX_PATH):
+        self._approximation_filepath = approximation_filepath
+        self._times_ms = np.empty(0)
+        self._distances = np.empty(0)
+        self.load()
+
+    def load(self):
+        try:
+            with open(self._approximation_filepath) as file:
+                time_results = json.loads(file.read())
+        except (OSError, ValueError):
+            # Avoid circular import, common_functions depends on this module
+            from .common_functions import generate_approximation_numeric_values
+            generate_approximation_numeric_values()
+            with open(self._approximation_filepath) as file:
+                time_results = json.loads(file.read())
+
+        times_ms = np.array([float(key) for key in time_results.keys()])
+        distances = np.array(list(time_results.values()))
+        order = np.argsort(times_ms, kind="stable")
+        self._times_ms = times_ms[order]
+        self._distances = distances[order]
+
+    def distances_from_rtts(self, rtts) -> np.ndarray:
+        """
+        :param rtts: array-like of RTTs in ms, negative values mean no reply
+        :return: array of radius in km, negative RTTs are returned untouched
+        """
+        rtts = np.asarray(rtts, dtype=float)
+        trip_times_ms = rtts / 2
+
+        # Nearest table value, ties resolved to the lower one as min() did
+        upper = np.searchsorted(self._times_ms, trip_times_ms, side="left")
+        upper = np.clip(upper, 1, len(self._times_ms) - 1)
+        lower = upper - 1
+        nearest = np.where(
+            np.abs(trip_times_ms - self._times_ms[lower]) <=
+            np.abs(self._times_ms[upper] - trip_times_ms),
+            lower, upper)
+
+        distances = self._distances[nearest].astype(float)
+        distances[distances == 0] = VERLOC_GAP
+        return np.where(rtts < 0, rtts, distances)
+
+    def distance_from_rtt(self, rtt: float) -> float:
+        if rtt < 0:
+            return rtt
+        distance_result = self.distances_from_rtts([rtt])[0].item()
+        if distance_result.is_integer():
+            return int(distance_result)
+        return distance_result
+
+
+__rtt_distance_inverter = None
+
+
+def get_rtt_distance_inverter() -> RttDistanceInverter:
+    global __rtt_distance_inverter
+    if __rtt_distance_inverter is None:
+        __rtt_distance_inverter = RttDistanceInverter()
+    return __rtt_distance_inverter
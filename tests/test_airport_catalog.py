@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import unittest
+import numpy as np
+from shapely import from_geojson
+# internal imports
+from src.utils.constants import EARTH_RADIUS_KM
+from src.utils.airport_catalog import AirportCatalog, get_airport_catalog
+from src.utils.common_functions import (
+    calculate_hunter_pings_intersection_area,
+    get_nearest_airport_to_point
+)
+from src.core.hunt_analysis import locate_airports_inside_intersection
+
+# The disc polygons are inscribed, airports closer to a disc edge than
+# this share of its radius may fall on either side
+EDGE_TOLERANCE = 0.005
+
+
+def baseline_distance(latitude_a: float, longitude_a: float,
+                      latitude_b: float, longitude_b: float) -> float:
+    degrees_to_radians = math.pi / 180.0
+    phi1 = (90.0 - latitude_a) * degrees_to_radians
+    phi2 = (90.0 - latitude_b) * degrees_to_radians
+    theta1 = longitude_a * degrees_to_radians
+    theta2 = longitude_b * degrees_to_radians
+    cos = (math.sin(phi1) * math.sin(phi2) * math.cos(theta1 - theta2) +
+           math.cos(phi1) * math.cos(phi2))
+    if abs(cos - 1.0) < 0.000000000000001:
+        return 0.0
+    return math.acos(cos) * EARTH_RADIUS_KM
+
+
+def baseline_disc_margins(airports_df, discs: list) -> np.ndarray:
+    """
+    Per-airport loop of Hunter.check_airports_inside_intersection before
+    the polygon lookup, keeping how deep inside every disc each airport is.
+    The baseline took the location of the first row of every IATA code,
+    here every row uses its own as the catalog does.
+    :return: for every airport, the smallest (radius - distance) / radius
+        over the discs, positive when it is inside all of them
+    """
+    margins = []
+    for lat_long_string in airports_df["lat long"]:
+        (airport_lat, airport_lon) = map(float, lat_long_string.split(" "))
+        margins.append(min(
+            (disc["radius"] - baseline_distance(
+                airport_lat, airport_lon,
+                disc["latitude"], disc["longitude"])) / abs(disc["radius"])
+            for disc in discs))
+    return np.array(margins)
+
+
+def wrap_longitude(longitude: float) -> float:
+    return (longitude + 180) % 360 - 180
+
+
+class AirportsInsidePolygonTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._catalog = AirportCatalog()
+
+    def airports_inside_polygon(self, discs: list) -> np.ndarray:
+        intersection = calculate_hunter_pings_intersection_area(discs)
+        return self._catalog.airports_inside_polygon(
+            intersection["geometry"])
+
+    def assert_matches_baseline(self, discs: list) -> np.ndarray:
+        inside = self.airports_inside_polygon(discs)
+        margins = baseline_disc_margins(self._catalog.airports_df, discs)
+        self.assertEqual(inside.tolist(), sorted(inside.tolist()))
+        inside_mask = np.zeros(len(self._catalog), dtype=bool)
+        inside_mask[inside] = True
+        self.assertEqual(
+            np.flatnonzero(~inside_mask & (margins > EDGE_TOLERANCE))
+            .tolist(), [])
+        self.assertEqual(
+            np.flatnonzero(inside_mask & (margins < -EDGE_TOLERANCE))
+            .tolist(), [])
+        return inside
+
+    def test_matches_the_baseline(self):
+        rng = np.random.default_rng(0)
+        found = 0
+        for _ in range(40):
+            # Discs around a random airport, as pings towards a target
+            position = rng.integers(len(self._catalog))
+            latitude = self._catalog.latitudes[position]
+            longitude = self._catalog.longitudes[position]
+            discs = [{"latitude": latitude + rng.uniform(-4, 4),
+                      "longitude": wrap_longitude(
+                          longitude + rng.uniform(-4, 4)),
+                      "radius": rng.uniform(50, 1500)}
+                     for _ in range(rng.integers(1, 5))]
+            found += len(self.assert_matches_baseline(discs)) > 0
+        self.assertGreater(found, 20)
+
+    def test_discs_across_the_antimeridian(self):
+        # Fiji west of the antimeridian, Tonga and Samoa east of it
+        discs = [{"latitude": -18.0, "longitude": 179.5, "radius": 900},
+                 {"latitude": -17.0, "longitude": -176.0, "radius": 900}]
+        inside = self.assert_matches_baseline(discs)
+        longitudes = self._catalog.longitudes[inside]
+        self.assertTrue(np.any(longitudes > 170))
+        self.assertTrue(np.any(longitudes < -170))
+        # Same discs with the centers given the other way round
+        self.assertEqual(self.airports_inside_polygon(discs[::-1]).tolist(),
+                         inside.tolist())
+
+    def test_disc_over_the_pole(self):
+        self.assertGreater(len(self.assert_matches_baseline([
+            {"latitude": 89.0, "longitude": 0.0, "radius": 2500}])), 0)
+
+    def test_no_intersection_leaves_no_airport(self):
+        self.assertEqual(self._catalog.airports_inside_polygon(None).size, 0)
+
+
+class LocateAirportsInsideIntersectionTest(unittest.TestCase):
+
+    def locate(self, discs: list) -> dict:
+        intersection = calculate_hunter_pings_intersection_area(discs)
+        return locate_airports_inside_intersection(
+            intersection["geometry"], intersection["centroid"], discs)
+
+    def test_airports_inside_give_the_result(self):
+        airports_info = self.locate([
+            {"latitude": 40.45, "longitude": -3.6, "radius": 30},
+            {"latitude": 40.5, "longitude": -3.55, "radius": 40}])
+        self.assertEqual(airports_info["country_result"], "ES")
+        self.assertEqual(airports_info["city_result"], "Madrid")
+
+    def test_disc_without_radius_answers_with_the_nearest_airport(self):
+        # As in the baseline loop, no airport is inside a radius -1 disc
+        discs = [{"latitude": 40.45, "longitude": -3.6, "radius": 500},
+                 {"latitude": 41.3, "longitude": 2.1, "radius": -1}]
+        airports_info = self.locate(discs)
+        nearest_airport = get_nearest_airport_to_point(from_geojson(
+            calculate_hunter_pings_intersection_area(discs)["centroid"]))
+        self.assertEqual(len(airports_info["airports_list"]), 1)
+        self.assertEqual(airports_info["airports_list"][0]["#IATA"],
+                         nearest_airport["#IATA"])
+        self.assertEqual(airports_info["city_result"],
+                         nearest_airport["city"])
+        # The intersection of the valid disc alone holds many airports
+        self.assertGreater(len(get_airport_catalog().airports_inside_polygon(
+            calculate_hunter_pings_intersection_area(discs)["geometry"])), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import io
+import threading
+import unittest
+# internal imports
+from main import read_batch_hunts
+from src.core.async_hunter import AsyncHuntEngine
+
+
+class FakeHuntResult:
+
+    def __init__(self, target: str):
+        self.record = {"target": target}
+
+
+class FakePipeline:
+
+    def __init__(self, failing: tuple = ()):
+        self._failing = failing
+        self.hunts = []
+        self._lock = threading.Lock()
+
+    def hunt(self, target: str, **hunt_options) -> FakeHuntResult:
+        with self._lock:
+            self.hunts.append(target)
+        if target in self._failing:
+            raise RuntimeError("hunt failed")
+        return FakeHuntResult(target)
+
+
+class ReadBatchHuntsTest(unittest.TestCase):
+
+    def test_origin_is_the_default_of_lines_without_one(self):
+        batch_file = io.StringIO("192.0.2.1\n# comment\n\n"
+                                 "192.0.2.2, 40.4, -3.7\n")
+        hunts = list(read_batch_hunts(batch_file, origin=(51.5, -0.1),
+                                      check_cf_ray=True))
+        self.assertEqual([hunt["origin"] for hunt in hunts],
+                         [(51.5, -0.1), (40.4, -3.7)])
+        self.assertTrue(all(hunt["check_cf_ray"] for hunt in hunts))
+        self.assertFalse(any(hunt["save_to_file"] for hunt in hunts))
+
+    def test_without_origin_the_host_location_is_used(self):
+        hunts = list(read_batch_hunts(io.StringIO("192.0.2.1\n")))
+        self.assertNotIn("origin", hunts[0])
+        self.assertNotIn("check_cf_ray", hunts[0])
+
+
+class RunStreamTest(unittest.TestCase):
+
+    def test_hunts_start_before_the_input_ends(self):
+        first_result = threading.Event()
+        results = []
+
+        def hunts():
+            yield {"target": "192.0.2.1"}
+            # Like stdin waiting for its next line, only continues once
+            # the first hunt has finished
+            self.assertTrue(first_result.wait(timeout=10))
+            yield {"target": "192.0.2.2"}
+
+        def on_result(target, hunt_result):
+            results.append(target)
+            first_result.set()
+
+        hunts_count = AsyncHuntEngine(
+            concurrency=2, pipeline=FakePipeline()).run_stream(
+            hunts(), on_result=on_result)
+        self.assertEqual(hunts_count, 2)
+        self.assertEqual(results, ["192.0.2.1", "192.0.2.2"])
+
+    def test_failed_hunts_are_reported(self):
+        errors = []
+        pipeline = FakePipeline(failing=("192.0.2.2",))
+        AsyncHuntEngine(concurrency=1, pipeline=pipeline).run_stream(
+            ({"target": "192.0.2.{}".format(host)} for host in range(4)),
+            on_error=lambda target, e: errors.append(target))
+        self.assertEqual(errors, ["192.0.2.2"])
+        self.assertEqual(len(pipeline.hunts), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import datetime
+import os
+import tempfile
+import unittest
+# internal imports
+from src.core.campaign_scheduler import (
+    CampaignCheckpoint,
+    CampaignScheduler,
+    CronSchedule,
+    parse_cron_field
+)
+
+
+class FakeClock:
+    """
+    utcnow and sleep of the scheduler, sleeping only moves the clock.
+    """
+
+    def __init__(self, now: datetime.datetime):
+        self.now = now
+        self.sleeps = []
+
+    def utcnow(self) -> datetime.datetime:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += datetime.timedelta(seconds=seconds)
+
+
+class CronScheduleTest(unittest.TestCase):
+
+    def test_parse_cron_field(self):
+        self.assertEqual(parse_cron_field("*", 0, 6), list(range(7)))
+        self.assertEqual(parse_cron_field("4,10,16,22", 0, 23),
+                         [4, 10, 16, 22])
+        self.assertEqual(parse_cron_field("1-5/2", 0, 6), [1, 3, 5])
+        self.assertEqual(parse_cron_field("50/5", 0, 59), [50, 55])
+        with self.assertRaises(ValueError):
+            parse_cron_field("60", 0, 59)
+
+    def test_next_slot_is_strictly_after(self):
+        schedule = CronSchedule("0 4,10,16,22 * * *")
+        self.assertEqual(
+            schedule.next_slot(datetime.datetime(2024, 1, 1, 4, 0)),
+            datetime.datetime(2024, 1, 1, 10, 0))
+        self.assertEqual(
+            schedule.next_slot(datetime.datetime(2024, 1, 1, 23, 30)),
+            datetime.datetime(2024, 1, 2, 4, 0))
+
+    def test_restricted_day_fields_match_any_of_them(self):
+        # 1st of the month or Mondays, 2024-01-08 is a Monday
+        schedule = CronSchedule("0 0 1 * 1")
+        self.assertEqual(
+            schedule.next_slot(datetime.datetime(2024, 1, 1, 12, 0)),
+            datetime.datetime(2024, 1, 8, 0, 0))
+
+    def test_leap_day(self):
+        self.assertEqual(
+            CronSchedule("0 0 29 2 *").next_slot(
+                datetime.datetime(2024, 3, 1)),
+            datetime.datetime(2028, 2, 29, 0, 0))
+
+
+class CampaignSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._checkpoint_filepath = os.path.join(self._directory.name,
+                                                 "checkpoint.json")
+        self._clock = FakeClock(datetime.datetime(2024, 1, 1, 3, 50))
+        self._hunted = []
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def build_scheduler(self, run_campaign) -> CampaignScheduler:
+        return CampaignScheduler(
+            schedule="0 4,10,16,22 * * *",
+            campaign_prefix="test",
+            run_campaign=run_campaign,
+            checkpoint_filepath=self._checkpoint_filepath,
+            sleep=self._clock.sleep,
+            utcnow=self._clock.utcnow)
+
+    def run_campaign(self, campaign: str, checkpoint: CampaignCheckpoint,
+                     interrupt_after: int = None):
+        for target in checkpoint.get_pending("ES", ["a", "b", "c"]):
+            if interrupt_after is not None and \
+                    len(self._hunted) == interrupt_after:
+                raise KeyboardInterrupt
+            self._hunted.append((campaign, target))
+            checkpoint.mark_completed("ES", target)
+
+    def test_waits_for_the_slot(self):
+        self.build_scheduler(self.run_campaign).run_next_slot()
+        self.assertEqual(self._clock.now, datetime.datetime(2024, 1, 1, 4, 0))
+        self.assertEqual(self._hunted, [("test_20240101_04:00:00", target)
+                                        for target in "abc"])
+        self.assertTrue(
+            CampaignCheckpoint.load(self._checkpoint_filepath).finished)
+
+    def test_interrupted_run_resumes_pending_hunts(self):
+        scheduler = self.build_scheduler(
+            lambda campaign, checkpoint: self.run_campaign(
+                campaign, checkpoint, interrupt_after=2))
+        with self.assertRaises(KeyboardInterrupt):
+            scheduler.run_next_slot()
+        checkpoint = CampaignCheckpoint.load(self._checkpoint_filepath)
+        self.assertFalse(checkpoint.finished)
+        self.assertEqual(checkpoint.get_pending("ES", ["a", "b", "c"]),
+                         ["c"])
+
+        # Restarted later on, the interrupted campaign is finished first
+        self._clock.now = datetime.datetime(2024, 1, 1, 5, 0)
+        scheduler = self.build_scheduler(self.run_campaign)
+        self.assertTrue(scheduler.resume())
+        self.assertEqual([target for _, target in self._hunted],
+                         ["a", "b", "c"])
+        self.assertEqual(self._hunted[-1][0], "test_20240101_04:00:00")
+        self.assertFalse(scheduler.resume())
+
+    def test_slots_missed_while_running_are_skipped(self):
+        def long_campaign(campaign: str, checkpoint: CampaignCheckpoint):
+            self._hunted.append(campaign)
+            # The run lasts past the 10:00 slot
+            self._clock.now += datetime.timedelta(hours=7)
+
+        scheduler = self.build_scheduler(long_campaign)
+        scheduler.run_next_slot()
+        scheduler.run_next_slot()
+        self.assertEqual(self._hunted, ["test_20240101_04:00:00",
+                                        "test_20240101_16:00:00"])
+
+    def test_sleeps_are_bounded(self):
+        self._clock.now = datetime.datetime(2024, 1, 1, 0, 0)
+        self.build_scheduler(self.run_campaign).run_next_slot()
+        self.assertTrue(all(seconds <= 300 for seconds in self._clock.sleeps))
+        self.assertEqual(sum(self._clock.sleeps), 4 * 60 * 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
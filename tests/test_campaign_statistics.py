@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+# internal imports
+from src.core.campaign_store import CampaignStore
+from src.core.campaign_statistics import (
+    CampaignStatistics,
+    aggregate_hunts,
+    hunts_to_frame
+)
+
+INTERSECTION = json.dumps({"type": "Polygon", "coordinates": [
+    [[-3.8, 40.3], [-3.6, 40.3], [-3.6, 40.5], [-3.8, 40.5], [-3.8, 40.3]]]})
+
+
+def build_record(target: str, country_result: str,
+                 timestamp: float) -> dict:
+    intersect = country_result != "Indeterminate"
+    return {
+        "target": target,
+        "timestamp": timestamp,
+        "result": {
+            "country_result": country_result,
+            "city_result": "Madrid" if intersect else "Indeterminate",
+            "advanced": {"discs_intersect": intersect,
+                         "intersection": INTERSECTION if intersect else None}
+        },
+        "phase_timings": {"traceroute": timestamp / 100}
+    }
+
+
+class CampaignStatisticsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._store = CampaignStore(
+            filepath=os.path.join(self._directory.name, "campaigns.sqlite"))
+        self._statistics_path = os.path.join(self._directory.name,
+                                             "statistics")
+        self._timestamp = 0
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def build_statistics(self) -> CampaignStatistics:
+        return CampaignStatistics(campaign_store=self._store,
+                                  statistics_path=self._statistics_path)
+
+    def append(self, target: str, country_result: str,
+               origin_country: str = "ES", campaign: str = "daily"):
+        self._timestamp += 1
+        self._store.append(
+            build_record(target, country_result, self._timestamp),
+            campaign=campaign, origin_country=origin_country)
+
+    def load_summary(self, prefix: str = "") -> pd.DataFrame:
+        return pd.read_csv(
+            os.path.join(self._statistics_path, prefix + "summary.csv"),
+            keep_default_na=False, na_values=[""])
+
+    def assert_matches_full_aggregate(self):
+        hunts = hunts_to_frame(self._store.query())
+        for (keys, prefix) in ((["target", "origin_country"], ""),
+                               (["campaign", "target", "origin_country"],
+                                "campaigns_")):
+            expected = aggregate_hunts(hunts, keys)["summary"]
+            summary = self.load_summary(prefix)
+            summary[keys] = summary[keys].fillna("")
+            self.assertEqual(len(summary), len(expected))
+            pd.testing.assert_frame_equal(
+                summary, expected.reset_index(drop=True),
+                check_dtype=False, check_exact=False)
+
+    def test_update_adds_only_new_hunts(self):
+        self.append("192.0.2.1", "ES")
+        self.append("192.0.2.2", "Indeterminate", origin_country=None)
+        statistics = self.build_statistics()
+        self.assertEqual(statistics.update(), 2)
+        self.assertEqual(statistics.update(), 0)
+
+        self.append("192.0.2.1", "US", campaign="weekly")
+        self.assertEqual(self.build_statistics().update(), 1)
+        self.assertEqual(self.build_statistics().get_last_hunt_id(), 3)
+        self.assert_matches_full_aggregate()
+
+    def test_only_groups_with_new_hunts_are_read(self):
+        self.append("192.0.2.1", "ES")
+        self.append("192.0.2.2", "ES")
+        statistics = self.build_statistics()
+        statistics.update()
+
+        self.append("192.0.2.2", "FR")
+        with mock.patch.object(CampaignStatistics, "load_hunts",
+                               autospec=True,
+                               side_effect=CampaignStatistics.load_hunts) \
+                as load_hunts:
+            statistics.update()
+        for call in load_hunts.call_args_list:
+            self.assertEqual(list(call.args[2]), ["192.0.2.2"]
+                             if call.args[1] == "target" else ["daily"])
+        self.assert_matches_full_aggregate()
+
+    def test_large_backfill_stays_within_the_parameters_limit(self):
+        statistics = self.build_statistics()
+        # Default limit of SQLite before 3.32
+        statistics._connection.setlimit(
+            sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        for host in range(1200):
+            self.append("10.0.{}.{}".format(host // 256, host % 256), "ES")
+        self.assertEqual(statistics.update(), 1200)
+
+        self.append("10.0.0.0", "FR")
+        self.assertEqual(statistics.update(), 1)
+        targets = ["10.0.{}.{}".format(host // 256, host % 256)
+                   for host in range(1200)]
+        self.assertEqual(len(statistics.load_hunts("target", targets)), 1201)
+        self.assertEqual(len(statistics.load_hunts("target", [])), 0)
+        self.assert_matches_full_aggregate()
+
+    def test_interrupted_update_does_not_duplicate_hunts(self):
+        self.append("192.0.2.1", "ES")
+        self.build_statistics().update()
+        self.append("192.0.2.1", "FR")
+        with mock.patch.object(CampaignStatistics, "store_hunts",
+                               side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.build_statistics().update()
+
+        statistics = self.build_statistics()
+        self.assertEqual(statistics.get_last_hunt_id(), 1)
+        self.assertEqual(statistics.update(), 1)
+        self.assertEqual(len(statistics.load_hunts()), 2)
+        self.assertEqual(self.load_summary()["hunts"].tolist(), [2])
+        self.assert_matches_full_aggregate()
+
+
+if __name__ == "__main__":
+    unittest.main()
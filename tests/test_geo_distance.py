@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import math
+import unittest
+import numpy as np
+# internal imports
+from src.utils.constants import EARTH_RADIUS_KM
+from src.utils.common_functions import check_all_discs_intersect, distance
+from src.utils.geo_distance import (
+    distance_matrix,
+    great_circle_distances,
+    pairwise_distances
+)
+
+
+def baseline_distance(a: dict, b: dict) -> float:
+    """
+    Scalar spherical distance distance() computed before the NumPy engine.
+    """
+    degrees_to_radians = math.pi / 180.0
+    phi1 = (90.0 - a["latitude"]) * degrees_to_radians
+    phi2 = (90.0 - b["latitude"]) * degrees_to_radians
+    theta1 = a["longitude"] * degrees_to_radians
+    theta2 = b["longitude"] * degrees_to_radians
+    cos = (math.sin(phi1) * math.sin(phi2) * math.cos(theta1 - theta2) +
+           math.cos(phi1) * math.cos(phi2))
+    if abs(cos - 1.0) < 0.000000000000001:
+        arc = 0.0
+    else:
+        arc = math.acos(cos)
+    return arc * EARTH_RADIUS_KM
+
+
+def baseline_discs_intersect(discs: list) -> bool:
+    """
+    Pairwise loop of Hunter.check_ping_discs_intersection before the
+    NumPy engine.
+    """
+    for disc1 in discs:
+        for disc2 in discs:
+            if disc1 == disc2:
+                continue
+            elif disc1["radius"] == -1 or disc2["radius"] == -1:
+                continue
+            elif baseline_distance(disc1, disc2) < \
+                    disc1["radius"] + disc2["radius"]:
+                continue
+            else:
+                return False
+    return True
+
+
+def build_points(count: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    points = [{"latitude": latitude, "longitude": longitude}
+              for latitude, longitude in zip(
+                  rng.uniform(-90, 90, count).tolist(),
+                  rng.uniform(-180, 180, count).tolist())]
+    # Poles, antimeridian, antipodes and repeated points
+    points += [{"latitude": 90.0, "longitude": 0.0},
+               {"latitude": -90.0, "longitude": 45.0},
+               {"latitude": 10.0, "longitude": 179.999},
+               {"latitude": 10.0, "longitude": -179.999},
+               {"latitude": 40.4, "longitude": -3.7},
+               {"latitude": -40.4, "longitude": 176.3},
+               {"latitude": 40.4, "longitude": -3.7}]
+    return points
+
+
+class GreatCircleDistancesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._points = build_points(60, seed=0)
+        self._latitudes = [point["latitude"] for point in self._points]
+        self._longitudes = [point["longitude"] for point in self._points]
+        self._expected = np.array([[baseline_distance(a, b)
+                                    for b in self._points]
+                                   for a in self._points])
+
+    def test_distance_matches_the_baseline(self):
+        for a in self._points[::7]:
+            for b in self._points:
+                self.assertAlmostEqual(distance(a, b),
+                                       baseline_distance(a, b), places=6)
+
+    def test_arrays_match_the_baseline(self):
+        np.testing.assert_allclose(
+            pairwise_distances(self._latitudes, self._longitudes),
+            self._expected, rtol=1e-12, atol=1e-6)
+        np.testing.assert_allclose(
+            distance_matrix(self._latitudes[:5], self._longitudes[:5],
+                            self._latitudes, self._longitudes),
+            self._expected[:5], rtol=1e-12, atol=1e-6)
+        np.testing.assert_allclose(
+            great_circle_distances(self._latitudes, self._longitudes,
+                                   self._latitudes[::-1],
+                                   self._longitudes[::-1]),
+            np.diag(self._expected[:, ::-1]), rtol=1e-12, atol=1e-6)
+
+    def test_same_point_is_at_zero(self):
+        self.assertEqual(np.diag(pairwise_distances(
+            self._latitudes, self._longitudes)).tolist(),
+            [0.0] * len(self._points))
+
+
+class CheckAllDiscsIntersectTest(unittest.TestCase):
+
+    def build_discs(self, count: int, seed: int, radius: float) -> list:
+        rng = np.random.default_rng(seed)
+        return [dict(point, radius=rng.uniform(0.5, 1.5) * radius)
+                for point in build_points(count, seed)[:count]]
+
+    def test_matches_the_baseline(self):
+        for seed in range(200):
+            # Small areas and radius around the separations, both results
+            # show up
+            rng = np.random.default_rng(seed)
+            center = (rng.uniform(-60, 60), rng.uniform(-180, 180))
+            count = int(rng.integers(2, 8))
+            discs = [{"latitude": center[0] + rng.uniform(-5, 5),
+                      "longitude": center[1] + rng.uniform(-5, 5),
+                      "radius": rng.uniform(100, 600)}
+                     for _ in range(count)]
+            if rng.uniform() < 0.3:
+                discs[0]["radius"] = -1
+            self.assertEqual(check_all_discs_intersect(discs),
+                             baseline_discs_intersect(discs),
+                             "seed {}".format(seed))
+
+    def test_results_cover_both_cases(self):
+        self.assertTrue(check_all_discs_intersect(
+            self.build_discs(5, seed=1, radius=30000)))
+        self.assertFalse(check_all_discs_intersect(
+            self.build_discs(5, seed=1, radius=10)))
+
+    def test_discs_without_radius_are_ignored(self):
+        discs = [{"latitude": 0.0, "longitude": 0.0, "radius": 10},
+                 {"latitude": 0.0, "longitude": 90.0, "radius": -1}]
+        self.assertTrue(check_all_discs_intersect(discs))
+        self.assertTrue(baseline_discs_intersect(discs))
+
+
+if __name__ == "__main__":
+    unittest.main()
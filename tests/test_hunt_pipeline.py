@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+# internal imports
+from src.core.hunt_pipeline import HuntPipeline
+from src.old_hunter.hunter import Hunter
+from src.utils.common_functions import json_file_to_dict
+
+
+class FakeHunter(Hunter):
+    """
+    Hunter whose measurements are replaced by a result built from the
+    origin. Both hunts wait for each other before saving, so their records
+    are written at the same time.
+    """
+
+    barrier = None
+
+    def hunt(self):
+        self._results_measurements["result"]["city_result"] = \
+            "city {}".format(self._origin[0])
+        self.barrier.wait(timeout=10)
+        self.save_hunt_record()
+
+
+class HuntPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._measurements_path = self._directory.name + os.sep
+        self._pipeline = HuntPipeline(
+            http_client=object(), probe_catalog=object(),
+            probe_cache=object(), geolocation_service=object(),
+            host_location_provider=object(), ripe_key="key",
+            results_poller=object(), traceroute_runner=object())
+        FakeHunter.barrier = threading.Barrier(2)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def hunt_concurrently(self, **hunt_options) -> list:
+        with mock.patch("src.core.hunt_pipeline.Hunter", FakeHunter), \
+                mock.patch("src.old_hunter.hunter.MEASUREMENTS_PATH",
+                           self._measurements_path), \
+                ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(self._pipeline.hunt, "192.0.2.1",
+                                       origin=(latitude, 0.0),
+                                       check_cf_ray=False, **hunt_options)
+                       for latitude in (10.0, 20.0)]
+            return [future.result(timeout=10) for future in futures]
+
+    def test_concurrent_hunts_write_no_file_by_default(self):
+        hunt_results = self.hunt_concurrently()
+        self.assertEqual([hunt_result.city_result
+                          for hunt_result in hunt_results],
+                         ["city 10.0", "city 20.0"])
+        self.assertEqual(os.listdir(self._directory.name), [])
+
+    def test_concurrent_hunts_keep_their_own_files(self):
+        hunt_results = self.hunt_concurrently(save_to_file=True)
+        filenames = os.listdir(self._directory.name)
+        self.assertEqual(len(filenames), 2)
+        records = [json_file_to_dict(os.path.join(self._directory.name,
+                                                  filename))
+                   for filename in filenames]
+        self.assertEqual(
+            sorted(record["result"]["city_result"] for record in records),
+            sorted(hunt_result.city_result for hunt_result in hunt_results))
+
+
+if __name__ == "__main__":
+    unittest.main()
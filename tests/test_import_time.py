@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import subprocess
+import sys
+import unittest
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Heavy dependencies only the hunting and visualization paths import
+HEAVY_MODULES = ("shapely", "pandas", "numpy", "requests")
+
+
+def get_imported_modules(*args) -> list:
+    """
+    :return: top level names of the modules imported running main.py with
+        args, as reported by -X importtime
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py"] + list(args),
+        cwd=REPOSITORY_PATH, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True, timeout=60)
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        modules.append(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+class ImportTimeTest(unittest.TestCase):
+
+    def assert_no_heavy_imports(self, *args):
+        modules = get_imported_modules(*args)
+        # The report was parsed
+        self.assertIn("getopt", modules)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_help_does_not_import_heavy_dependencies(self):
+        self.assert_no_heavy_imports("-h")
+
+    def test_option_errors_do_not_import_heavy_dependencies(self):
+        self.assert_no_heavy_imports("--unknown-option")
+
+
+if __name__ == "__main__":
+    unittest.main()
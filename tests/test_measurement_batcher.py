@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+# internal imports
+from src.core.async_hunter import AsyncHuntEngine
+from src.core.measurement_batcher import MeasurementBatcher
+from src.core.probe_catalog import sample_probes
+
+
+class FakeResponse:
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeAtlasCreation:
+
+    def __init__(self):
+        self.posts = []
+        self._lock = threading.Lock()
+
+    def post(self, url: str, json: dict = None, **kwargs) -> FakeResponse:
+        with self._lock:
+            first_id = 100 * (len(self.posts) + 1)
+            self.posts.append(json)
+        return FakeResponse({"measurements": list(
+            range(first_id, first_id + len(json["definitions"])))})
+
+
+def build_data(target: str, probe_ids: list) -> dict:
+    return {
+        "definitions": [{"target": target, "type": "ping"}],
+        "probes": [{"requested": len(probe_ids), "type": "probes",
+                    "value": ",".join(map(str, probe_ids))}]
+    }
+
+
+def build_probes(count: int) -> list:
+    return [{"id": probe_id} for probe_id in range(count)]
+
+
+class SampleProbesTest(unittest.TestCase):
+
+    def test_same_seed_and_area_select_same_probes(self):
+        probes = build_probes(50)
+        selected = sample_probes(probes, 7, "40.4165", "-3.7026", 100,
+                                 selection_seed=1)
+        self.assertEqual(len(set(probe["id"] for probe in selected)), 7)
+        self.assertEqual(
+            sample_probes(list(reversed(probes)), 7, 40.4165, -3.7026, 100,
+                          selection_seed=1),
+            selected)
+
+    def test_selection_changes_with_the_seed(self):
+        probes = build_probes(50)
+        self.assertNotEqual(
+            sample_probes(probes, 7, 40.4, -3.7, 100, selection_seed=1),
+            sample_probes(probes, 7, 40.4, -3.7, 100, selection_seed=2))
+
+    def test_without_seed_every_sample_is_fresh(self):
+        probes = build_probes(50)
+        samples = set(
+            tuple(probe["id"] for probe in
+                  sample_probes(probes, 7, 40.4, -3.7, 100))
+            for _ in range(10))
+        self.assertGreater(len(samples), 1)
+
+    def test_fewer_probes_than_requested(self):
+        self.assertEqual(len(sample_probes(build_probes(3), 7, 0, 0, 100)), 3)
+
+
+class RecordingPipeline:
+
+    def __init__(self):
+        self.seeds = {}
+        self._lock = threading.Lock()
+
+    def hunt(self, target: str, probe_selection_seed: int = None,
+             **hunt_options):
+        with self._lock:
+            self.seeds[target] = probe_selection_seed
+
+
+class ProbeSelectionSeedTest(unittest.TestCase):
+
+    def test_hunts_of_one_run_share_a_seed(self):
+        pipeline = RecordingPipeline()
+        engine = AsyncHuntEngine(concurrency=2, pipeline=pipeline)
+        engine.run([{"target": "192.0.2.1"}, {"target": "192.0.2.2"}])
+        engine.run_stream(iter([{"target": "192.0.2.3"},
+                                {"target": "192.0.2.4"}]))
+        seeds = pipeline.seeds
+        self.assertIsNotNone(seeds["192.0.2.1"])
+        self.assertEqual(seeds["192.0.2.1"], seeds["192.0.2.2"])
+        self.assertEqual(seeds["192.0.2.3"], seeds["192.0.2.4"])
+        self.assertNotEqual(seeds["192.0.2.1"], seeds["192.0.2.3"])
+
+    def test_given_seed_is_kept(self):
+        pipeline = RecordingPipeline()
+        AsyncHuntEngine(concurrency=1, pipeline=pipeline).run(
+            [{"target": "192.0.2.1", "probe_selection_seed": 7}])
+        self.assertEqual(pipeline.seeds["192.0.2.1"], 7)
+
+
+class MeasurementBatcherTest(unittest.TestCase):
+
+    def submit_all(self, batcher: MeasurementBatcher, data_list: list):
+        with ThreadPoolExecutor(max_workers=len(data_list)) as executor:
+            return list(executor.map(batcher.submit_measurement, data_list))
+
+    def test_same_probes_share_one_request(self):
+        atlas = FakeAtlasCreation()
+        batcher = MeasurementBatcher(url="fake", http_client=atlas,
+                                     window=0.2)
+        measurement_ids = self.submit_all(batcher, [
+            build_data("192.0.2.{}".format(host), [1, 2, 3])
+            for host in range(4)])
+        self.assertEqual(len(atlas.posts), 1)
+        self.assertEqual(len(atlas.posts[0]["definitions"]), 4)
+        self.assertEqual(sorted(ids[0] for ids in measurement_ids),
+                         [100, 101, 102, 103])
+
+    def test_different_probes_are_sent_apart(self):
+        atlas = FakeAtlasCreation()
+        batcher = MeasurementBatcher(url="fake", http_client=atlas,
+                                     window=0.2)
+        self.submit_all(batcher, [build_data("192.0.2.1", [1, 2]),
+                                  build_data("192.0.2.2", [3, 4])])
+        self.assertEqual(len(atlas.posts), 2)
+
+    def test_full_batch_is_sent_without_waiting(self):
+        atlas = FakeAtlasCreation()
+        batcher = MeasurementBatcher(url="fake", http_client=atlas,
+                                     window=60, max_size=2)
+        self.submit_all(batcher, [build_data("192.0.2.1", [1]),
+                                  build_data("192.0.2.2", [1])])
+        self.assertEqual(len(atlas.posts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
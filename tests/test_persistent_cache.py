@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import tempfile
+import unittest
+from unittest import mock
+# internal imports
+from src.core.persistent_cache import PersistentLruCache
+from src.core.hunt_analysis import build_ping_discs
+
+
+class PersistentLruCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._filepath = os.path.join(self._directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def build_cache(self, max_size: int = 2, ttl: float = None):
+        return PersistentLruCache(filepath=self._filepath, table="entries",
+                                  max_size=max_size, ttl=ttl)
+
+    def test_get_many_returns_only_cached_keys(self):
+        cache = self.build_cache()
+        cache.put_many({1: {"latitude": 1.5}, "a": [1, 2]})
+        self.assertEqual(cache.get_many([1, "a", "missing"]),
+                         {1: {"latitude": 1.5}, "a": [1, 2]})
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.get("missing", 0), 0)
+
+    def test_evicted_entries_are_read_back_from_sqlite(self):
+        cache = self.build_cache(max_size=2)
+        for key in range(5):
+            cache.put(key, key * 10)
+        self.assertEqual(len(cache._memory), 2)
+        self.assertEqual(cache.get_many(range(5)),
+                         {key: key * 10 for key in range(5)})
+
+    def test_entries_survive_a_new_instance(self):
+        self.build_cache().put("key", "value")
+        self.assertEqual(self.build_cache().get("key"), "value")
+
+    def test_delete_invalidates_memory_and_sqlite(self):
+        cache = self.build_cache()
+        cache.put("key", "value")
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+        self.assertIsNone(self.build_cache().get("key"))
+
+    def test_put_replaces_value(self):
+        cache = self.build_cache()
+        cache.put("key", "old")
+        cache.put("key", "new")
+        self.assertEqual(cache.get("key"), "new")
+        self.assertEqual(self.build_cache().get("key"), "new")
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch("src.core.persistent_cache.time.time",
+                        return_value=1000):
+            cache = self.build_cache(ttl=60)
+            cache.put("key", "value")
+        with mock.patch("src.core.persistent_cache.time.time",
+                        return_value=1060):
+            self.assertEqual(cache.get("key"), "value")
+        with mock.patch("src.core.persistent_cache.time.time",
+                        return_value=1061):
+            self.assertIsNone(cache.get("key"))
+            self.assertIsNone(self.build_cache(ttl=60).get("key"))
+
+
+class BuildPingDiscsTest(unittest.TestCase):
+
+    def test_pings_from_unknown_probes_are_skipped(self):
+        pings = [{"prb_id": 1, "min": 10},
+                 {"prb_id": 2, "min": 20},
+                 {"prb_id": 3, "min": 30}]
+        probes_locations = {
+            1: {"latitude": 40.4, "longitude": -3.7},
+            3: {"latitude": None, "longitude": None}
+        }
+        ping_discs = build_ping_discs(pings, probes_locations)
+        self.assertEqual([disc["probe_id"] for disc in ping_discs], [1])
+        self.assertEqual(ping_discs[0]["latitude"], 40.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
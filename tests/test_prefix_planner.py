@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import unittest
+# internal imports
+from src.core.hunt_pipeline import HuntResult
+from src.core.prefix_planner import (
+    LastHopHuntGroup,
+    PrefixHuntPlanner,
+    group_targets_by_prefix,
+    hunt_results_agree,
+    merge_groups_by_last_hop
+)
+
+
+def build_hunt_result(target: str, country_result: str = "ES",
+                      city_result: str = "Madrid",
+                      last_hop_ip: str = "") -> HuntResult:
+    last_hop = {"ip": last_hop_ip} if last_hop_ip else {}
+    return HuntResult({
+        "target": target,
+        "result": {"country_result": country_result,
+                   "city_result": city_result},
+        "measurements": {"last_hop": last_hop}
+    })
+
+
+class FakePrefixResolver:
+
+    def __init__(self, prefixes: dict):
+        self._prefixes = prefixes
+
+    def resolve_many(self, ips: list) -> dict:
+        return {ip: self._prefixes[ip] for ip in ips}
+
+
+class FakeHuntEngine:
+    """
+    Returns the hunt result given for every target, recording the rounds.
+    """
+
+    def __init__(self, hunt_results: dict):
+        self._hunt_results = hunt_results
+        self.rounds = []
+
+    def run(self, hunts: list, on_result=None, on_error=None) -> list:
+        self.rounds.append([hunt["target"] for hunt in hunts])
+        results = []
+        for hunt in hunts:
+            hunt_result = self._hunt_results[hunt["target"]]
+            if isinstance(hunt_result, Exception):
+                on_error(hunt["target"], hunt_result)
+            else:
+                on_result(hunt["target"], hunt_result)
+            results.append(hunt_result)
+        return results
+
+
+class HuntResultsAgreeTest(unittest.TestCase):
+
+    def test_same_determinate_results_agree(self):
+        self.assertTrue(hunt_results_agree(
+            build_hunt_result("a", last_hop_ip="10.0.0.1"),
+            build_hunt_result("b")))
+
+    def test_different_results_do_not_agree(self):
+        self.assertFalse(hunt_results_agree(
+            build_hunt_result("a", last_hop_ip="10.0.0.1"),
+            build_hunt_result("b", city_result="Barcelona",
+                              last_hop_ip="10.0.0.1")))
+
+    def test_different_last_hops_do_not_agree(self):
+        self.assertFalse(hunt_results_agree(
+            build_hunt_result("a", last_hop_ip="10.0.0.1"),
+            build_hunt_result("b", last_hop_ip="10.0.0.2")))
+
+    def test_indeterminate_results_need_the_same_last_hop(self):
+        indeterminate = {"country_result": "Indeterminate",
+                         "city_result": "Indeterminate"}
+        self.assertFalse(hunt_results_agree(
+            build_hunt_result("a", **indeterminate),
+            build_hunt_result("b", **indeterminate)))
+        self.assertFalse(hunt_results_agree(
+            build_hunt_result("a", last_hop_ip="10.0.0.1", **indeterminate),
+            build_hunt_result("b", **indeterminate)))
+        self.assertTrue(hunt_results_agree(
+            build_hunt_result("a", last_hop_ip="10.0.0.1", **indeterminate),
+            build_hunt_result("b", last_hop_ip="10.0.0.1", **indeterminate)))
+
+
+class PrefixHuntPlannerTest(unittest.TestCase):
+
+    def build_planner(self, prefixes: dict, hunt_results: dict):
+        engine = FakeHuntEngine(hunt_results)
+        planner = PrefixHuntPlanner(
+            hunt_engine=engine,
+            prefix_resolver=FakePrefixResolver(prefixes),
+            spot_checks=1)
+        return planner, engine
+
+    def test_groups_keep_the_first_appearance_order(self):
+        groups = group_targets_by_prefix(
+            ["a", "b", "c", "a"], {"a": "p1", "b": "p2", "c": "p1"})
+        self.assertEqual([(group.prefix, group.targets) for group in groups],
+                         [("p1", ["a", "c"]), ("p2", ["b"])])
+
+    def test_confirmed_group_propagates_the_representative(self):
+        targets = ["a", "b", "c", "d"]
+        planner, engine = self.build_planner(
+            {target: "p" for target in targets},
+            {target: build_hunt_result(target) for target in targets})
+        results = planner.run([{"target": target} for target in targets])
+        self.assertEqual(engine.rounds, [["a"], ["d"]])
+        self.assertEqual([result.target for result in results], targets)
+        self.assertEqual(results[1].record["propagated_from"], "a")
+
+    def test_indeterminate_group_is_hunted_by_member(self):
+        targets = ["a", "b", "c", "d"]
+        planner, engine = self.build_planner(
+            {target: "p" for target in targets},
+            {target: build_hunt_result(target, "Indeterminate",
+                                       "Indeterminate")
+             for target in targets})
+        results = planner.run([{"target": target} for target in targets])
+        self.assertEqual(engine.rounds, [["a"], ["d"], ["b", "c"]])
+        self.assertFalse(any("propagated_from" in result.record
+                             for result in results))
+
+    def test_failed_representative_is_not_propagated(self):
+        targets = ["a", "b", "c"]
+        hunt_results = {target: build_hunt_result(target)
+                        for target in targets}
+        hunt_results["a"] = RuntimeError("hunt failed")
+        planner, engine = self.build_planner(
+            {target: "p" for target in targets}, hunt_results)
+        results = planner.run([{"target": target} for target in targets])
+        self.assertEqual(engine.rounds, [["a"], ["b", "c"]])
+        self.assertIsInstance(results[0], RuntimeError)
+
+    def test_prefixes_with_the_same_last_hop_are_confirmed_together(self):
+        prefixes = {"a": "p1", "b": "p1", "c": "p1",
+                    "x": "p2", "y": "p2", "z": "p2"}
+        planner, engine = self.build_planner(
+            prefixes, {target: build_hunt_result(target,
+                                                 last_hop_ip="10.0.0.1")
+                       for target in prefixes})
+        results = planner.run([{"target": target} for target in prefixes])
+        self.assertEqual(engine.rounds, [["a", "x"], ["z"]])
+        self.assertEqual([result.target for result in results],
+                         list(prefixes))
+        self.assertEqual({target: result.record.get("propagated_from")
+                          for target, result in zip(prefixes, results)},
+                         {"a": None, "b": "a", "c": "a",
+                          "x": None, "y": "a", "z": None})
+
+    def test_merged_prefixes_not_confirmed_are_hunted_by_member(self):
+        prefixes = {"a": "p1", "b": "p1", "x": "p2", "y": "p2"}
+        hunt_results = {target: build_hunt_result(target,
+                                                  last_hop_ip="10.0.0.1")
+                        for target in prefixes}
+        hunt_results["y"] = build_hunt_result("y", city_result="Barcelona",
+                                              last_hop_ip="10.0.0.1")
+        planner, engine = self.build_planner(prefixes, hunt_results)
+        results = planner.run([{"target": target} for target in prefixes])
+        self.assertEqual(engine.rounds, [["a", "x"], ["y"], ["b"]])
+        self.assertFalse(any("propagated_from" in result.record
+                             for result in results))
+
+
+class MergeGroupsByLastHopTest(unittest.TestCase):
+
+    def test_merges_agreeing_representatives_of_the_same_last_hop(self):
+        groups = group_targets_by_prefix(
+            ["a", "b", "c", "d", "e"],
+            {"a": "p1", "b": "p2", "c": "p3", "d": "p4", "e": "p5"})
+        results = {
+            "a": build_hunt_result("a", last_hop_ip="10.0.0.1"),
+            "b": build_hunt_result("b", last_hop_ip="10.0.0.2"),
+            "c": build_hunt_result("c", last_hop_ip="10.0.0.1"),
+            "d": build_hunt_result("d", city_result="Barcelona",
+                                   last_hop_ip="10.0.0.1"),
+            "e": build_hunt_result("e")
+        }
+        merged = merge_groups_by_last_hop(groups, results)
+        self.assertEqual([group.prefix for group in merged],
+                         ["p1 p3", "p2", "p4", "p5"])
+        self.assertIsInstance(merged[0], LastHopHuntGroup)
+        self.assertEqual(merged[0].last_hop, "10.0.0.1")
+
+    def test_failed_representatives_are_not_merged(self):
+        groups = group_targets_by_prefix(["a", "b"], {"a": "p1", "b": "p2"})
+        results = {"a": RuntimeError("hunt failed"),
+                   "b": RuntimeError("hunt failed")}
+        self.assertEqual(merge_groups_by_last_hop(groups, results), groups)
+
+    def test_spot_checks_include_the_other_representatives(self):
+        groups = group_targets_by_prefix(
+            ["a", "b", "c", "x", "y", "z"],
+            {"a": "p1", "b": "p1", "c": "p1",
+             "x": "p2", "y": "p2", "z": "p2"})
+        group = LastHopHuntGroup(last_hop="10.0.0.1", groups=groups)
+        self.assertEqual(group.representative, "a")
+        self.assertEqual(group.get_spot_checks(1), ["x", "z"])
+        self.assertEqual(group.get_spot_checks(2), ["x", "c", "z"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+# internal imports
+from src.core.result_poller import (
+    BatchedResultsPoller,
+    MeasurementPolling,
+    MeasurementResultsPoller,
+    quorum_reached
+)
+
+
+class FakeResponse:
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeAtlas:
+    """
+    Answers the measurement state and results URLs from lists of payloads,
+    one per request, repeating the last one.
+    """
+
+    def __init__(self, states: list, results: list):
+        self._states = states
+        self._results = results
+        self.state_requests = 0
+        self.results_requests = 0
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        if "/results/" in url:
+            payload = self._results[min(self.results_requests,
+                                        len(self._results) - 1)]
+            self.results_requests += 1
+        else:
+            payload = self._states[min(self.state_requests,
+                                       len(self._states) - 1)]
+            self.state_requests += 1
+        return FakeResponse(payload)
+
+
+def build_results(*probe_ids) -> list:
+    return [{"prb_id": probe_id, "timestamp": 100, "min": 10.0}
+            for probe_id in probe_ids]
+
+
+class QuorumReachedTest(unittest.TestCase):
+
+    def test_unscheduled_measurement_is_never_a_quorum(self):
+        self.assertFalse(quorum_reached(0, 0, 1.0))
+        self.assertFalse(quorum_reached(0, None, 1.0))
+        self.assertFalse(quorum_reached(3, 0, 0.5))
+
+    def test_no_results_are_never_a_quorum(self):
+        self.assertFalse(quorum_reached(0, 3, 0.0))
+
+    def test_quorum_rounds_up(self):
+        self.assertFalse(quorum_reached(2, 5, 0.5))
+        self.assertTrue(quorum_reached(3, 5, 0.5))
+        self.assertTrue(quorum_reached(5, 5, 1.0))
+
+
+class MeasurementResultsPollerTest(unittest.TestCase):
+
+    def poll(self, atlas: FakeAtlas, **kwargs) -> list:
+        poller = MeasurementResultsPoller(http_client=atlas,
+                                          sleep=lambda seconds: None)
+        return poller.poll(measurement_id=1, **kwargs)
+
+    def test_keeps_polling_while_no_probe_is_scheduled(self):
+        atlas = FakeAtlas(
+            states=[{"probes_scheduled": 0, "status": {"name": "Specified"}},
+                    {"probes_scheduled": 0, "status": {"name": "Scheduled"}},
+                    {"probes_scheduled": 2, "status": {"name": "Ongoing"}}],
+            results=[[], [], build_results(1), build_results(1, 2)])
+        results = self.poll(atlas)
+        self.assertEqual(sorted(result["prb_id"] for result in results),
+                         [1, 2])
+        self.assertEqual(atlas.results_requests, 4)
+
+    def test_stops_at_quorum(self):
+        atlas = FakeAtlas(
+            states=[{"probes_scheduled": 4, "status": {"name": "Ongoing"}}],
+            results=[build_results(1), build_results(2, 3), build_results(4)])
+        results = self.poll(atlas, quorum=0.75)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(atlas.results_requests, 2)
+
+    def test_stops_when_measurement_is_stopped(self):
+        atlas = FakeAtlas(
+            states=[{"probes_scheduled": 0, "status": {"name": "Stopped"}}],
+            results=[[]])
+        self.assertEqual(self.poll(atlas), [])
+        self.assertEqual(atlas.results_requests, 1)
+
+    def test_results_are_not_duplicated(self):
+        atlas = FakeAtlas(
+            states=[{"probes_scheduled": 2, "status": {"name": "Ongoing"}}],
+            results=[build_results(1), build_results(1), build_results(1, 2)])
+        results = self.poll(atlas)
+        self.assertEqual(sorted(result["prb_id"] for result in results),
+                         [1, 2])
+
+
+class FakeAtlasMeasurements:
+    """
+    Every measurement reports one more probe on each results request, its
+    state lists all of them as scheduled.
+    """
+
+    def __init__(self, probes_scheduled: dict):
+        self._probes_scheduled = probes_scheduled
+        self._results_requests = {}
+        self._lock = threading.Lock()
+        self.state_urls = []
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        with self._lock:
+            if "/results/" in url:
+                measurement_id = int(url.rstrip("/").split("/")[-2])
+                requests = self._results_requests.get(measurement_id, 0) + 1
+                self._results_requests[measurement_id] = requests
+                reported = min(requests,
+                               self._probes_scheduled[measurement_id])
+                return FakeResponse(build_results(*range(reported)))
+            self.state_urls.append(url)
+            return FakeResponse({"results": [
+                {"id": measurement_id, "probes_scheduled": probes,
+                 "status": {"name": "Ongoing"}}
+                for measurement_id, probes in self._probes_scheduled.items()
+                if str(measurement_id) in url]})
+
+
+class BatchedResultsPollerTest(unittest.TestCase):
+
+    def test_concurrent_measurements_are_polled_together(self):
+        probes_scheduled = {1: 1, 2: 2, 3: 3}
+        atlas = FakeAtlasMeasurements(probes_scheduled)
+        poller = BatchedResultsPoller(http_client=atlas)
+        with mock.patch.object(MeasurementPolling, "next_delay",
+                               return_value=0.05), \
+                ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {measurement_id: executor.submit(
+                poller.poll, measurement_id)
+                for measurement_id in probes_scheduled}
+            results = {measurement_id: future.result(timeout=10)
+                       for measurement_id, future in futures.items()}
+
+        for measurement_id, probes in probes_scheduled.items():
+            self.assertEqual(len(results[measurement_id]), probes)
+        # The first state request covers the three measurements
+        first_ids = atlas.state_urls[0].split("id__in=")[1].split("&")[0]
+        self.assertEqual(sorted(first_ids.split(",")), ["1", "2", "3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import copy
+import os
+import tempfile
+import unittest
+# internal imports
+from src.core.result_record import (
+    build_validation_view,
+    load_hunt_result,
+    materialize_validation_variant,
+    split_validation_filepath,
+    write_validation_variant_files
+)
+from src.utils.common_functions import dict_to_json_file
+
+
+def build_results_measurements() -> dict:
+    return {
+        "target": "192.0.2.1",
+        "target_validation": True,
+        "last_hop_validation": True,
+        "result": {"country_result": "Indeterminate",
+                   "city_result": "Indeterminate"},
+        "measurements": {
+            "last_hop": {},
+            "hops_directions_list": [["10.0.0.1"], ["192.0.2.1"]],
+            "traceroute": [" 1  10.0.0.1  1.0 ms", " 2  192.0.2.1  2.0 ms"],
+            "ping_discs": [],
+            "pings": []
+        }
+    }
+
+
+def build_record() -> dict:
+    """
+    Record whose ip_all_validation view was saved after the traceroute and
+    whose no_ip_validation view was saved after the pings.
+    """
+    results_measurements = build_results_measurements()
+    views = {"ip_all_validation": build_validation_view(results_measurements)}
+
+    results_measurements["target_validation"] = False
+    results_measurements["last_hop_validation"] = False
+    results_measurements["measurements"]["last_hop"] = {
+        "ip": "10.0.0.1", "geolocation": {"latitude": "40.4",
+                                          "longitude": "-3.7"}}
+    results_measurements["measurements"]["pings"] = [{"prb_id": 1,
+                                                      "min": 3.0}]
+    results_measurements["result"] = {"country_result": "ES",
+                                      "city_result": "Madrid"}
+    views["no_ip_validation"] = build_validation_view(results_measurements)
+
+    record = copy.deepcopy(results_measurements)
+    record["validation_views"] = views
+    return record
+
+
+class ResultRecordTest(unittest.TestCase):
+
+    def setUp(self):
+        # Files are written outside the repository tree
+        self._directory = tempfile.TemporaryDirectory()
+        self._filepath = os.path.join(self._directory.name, "hunt.json")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_variants_hide_measurements_taken_after_them(self):
+        record = build_record()
+        variant = materialize_validation_variant(record, "ip_all_validation")
+        self.assertTrue(variant["target_validation"])
+        self.assertEqual(variant["result"]["country_result"], "Indeterminate")
+        self.assertEqual(variant["measurements"]["pings"], [])
+        self.assertEqual(variant["measurements"]["last_hop"], {})
+        self.assertEqual(variant["measurements"]["traceroute"],
+                         record["measurements"]["traceroute"])
+        self.assertNotIn("validation_views", variant)
+
+        variant = materialize_validation_variant(record, "no_ip_validation")
+        self.assertEqual(variant["result"]["city_result"], "Madrid")
+        self.assertEqual(variant["measurements"]["pings"],
+                         record["measurements"]["pings"])
+
+    def test_split_validation_filepath(self):
+        self.assertEqual(
+            split_validation_filepath("dir/hunt_ip_target_validation.json"),
+            ("dir/hunt.json", "ip_target_validation"))
+        self.assertEqual(split_validation_filepath("dir/hunt.json"),
+                         ("dir/hunt.json", None))
+
+    def test_variant_paths_are_served_from_the_record(self):
+        record = build_record()
+        dict_to_json_file(record, self._filepath)
+        variant_filepath = os.path.join(self._directory.name,
+                                        "hunt_no_ip_validation.json")
+        self.assertFalse(os.path.exists(variant_filepath))
+        self.assertEqual(
+            load_hunt_result(variant_filepath),
+            materialize_validation_variant(record, "no_ip_validation"))
+
+    def test_write_validation_variant_files(self):
+        dict_to_json_file(build_record(), self._filepath)
+        filepaths = write_validation_variant_files(self._filepath)
+        self.assertEqual(len(filepaths), 2)
+        for filepath in filepaths:
+            self.assertTrue(filepath.startswith(self._directory.name))
+            self.assertTrue(os.path.exists(filepath))
+
+
+if __name__ == "__main__":
+    unittest.main()
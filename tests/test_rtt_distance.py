@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+# internal imports
+from src.utils.constants import VERLOC_GAP
+from src.utils.common_functions import (
+    generate_approximation_numeric_values,
+    get_distances_from_rtts
+)
+from src.utils.rtt_distance import RttDistanceInverter
+
+
+def baseline_distance_from_rtt(rtt: float, time_results: dict) -> float:
+    """
+    get_distance_from_rtt before the in-memory table, a nearest key scan of
+    the JSON approximation file.
+    """
+    if rtt < 0:
+        return rtt
+    trip_time_ms = rtt / 2
+    nearest_value = min(time_results,
+                        key=lambda x: abs(float(x) - trip_time_ms))
+    distance_result = time_results[nearest_value]
+    if distance_result == 0:
+        return VERLOC_GAP
+    return distance_result
+
+
+class RttDistanceInverterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        filepath = os.path.join(cls._directory.name, "verloc_aprox.json")
+        generate_approximation_numeric_values(file_path=filepath)
+        with open(filepath) as file:
+            cls._time_results = json.loads(file.read())
+        cls._inverter = RttDistanceInverter(approximation_filepath=filepath)
+
+        table_rtts = np.array([float(key) for key in cls._time_results]) * 2
+        cls._rtts = np.concatenate([
+            np.random.default_rng(0).uniform(0, 120, 300),
+            # Table values, midpoints between them and out of range RTTs
+            table_rtts,
+            (table_rtts[:-1] + table_rtts[1:]) / 2,
+            [0.0, 1e-9, 500.0, 1e6, -1.0, -5.5]
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def test_matches_the_baseline_lookup(self):
+        for rtt in self._rtts.tolist():
+            self.assertEqual(self._inverter.distance_from_rtt(rtt),
+                             baseline_distance_from_rtt(rtt,
+                                                        self._time_results),
+                             "rtt {}".format(rtt))
+
+    def test_batch_matches_the_baseline_lookup(self):
+        rtts = self._rtts.tolist()
+        rtts.append(-1)
+        distances = get_distances_from_rtts(
+            rtts, rtt_distance_inverter=self._inverter)
+        baseline_distances = [
+            baseline_distance_from_rtt(rtt, self._time_results)
+            for rtt in rtts]
+        self.assertEqual(distances, baseline_distances)
+        # Integer distances stay integers in the stored ping discs
+        self.assertEqual([type(distance) for distance in distances],
+                         [type(distance) for distance in baseline_distances])
+
+
+if __name__ == "__main__":
+    unittest.main()
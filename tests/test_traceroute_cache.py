@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import tempfile
+import unittest
+from unittest import mock
+# internal imports
+from src.core.host_location import HostLocationProvider
+from src.core.traceroute_cache import (
+    CachedTracerouteRunner,
+    get_target_prefix
+)
+from src.core.traceroute_runner import parse_traceroute_line
+
+
+def build_lines(target: str, hops: int = 6, changed_at: int = None) -> list:
+    lines = []
+    for number in range(1, hops):
+        router = "10.0.{}.1".format(number)
+        if changed_at is not None and number >= changed_at:
+            router = "10.9.{}.1".format(number)
+        lines.append("{:2d}  {}  {}.0 ms".format(number, router, number))
+    lines.append("{:2d}  {}  {}.0 ms".format(hops, target, hops))
+    return lines
+
+
+class FakeTracerouteRunner:
+    """
+    Answers every traceroute with build_lines, starting at first_hop.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.changed_at = None
+
+    def get_protocol(self) -> str:
+        return "udp"
+
+    def run(self, target: str, on_hop=None, first_hop: int = 1) -> list:
+        self.runs.append((target, first_hop))
+        hops = [parse_traceroute_line(line) for line in
+                build_lines(target, changed_at=self.changed_at)]
+        hops = [hop for hop in hops if hop.number >= first_hop]
+        for hop in hops:
+            if on_hop is not None:
+                on_hop(hop)
+        return hops
+
+
+class CachedTracerouteRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._runner = FakeTracerouteRunner()
+        self._public_ip = "198.51.100.1"
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def build_cache(self, **kwargs) -> CachedTracerouteRunner:
+        return CachedTracerouteRunner(
+            traceroute_runner=self._runner,
+            cache_filepath=os.path.join(self._directory.name,
+                                        "traceroutes.sqlite"),
+            max_size=10, reuse=60, freshness=3600, tail_hops=2,
+            get_network_key=lambda: self._public_ip, **kwargs)
+
+    def test_target_prefix(self):
+        self.assertEqual(get_target_prefix("192.0.2.77"), "192.0.2.0/24")
+        self.assertEqual(get_target_prefix("2001:db8::1"), "2001:db8::/48")
+        self.assertIsNone(get_target_prefix("example.com"))
+
+    def test_same_target_is_reused(self):
+        cache = self.build_cache()
+        first = cache.run("192.0.2.1")
+        hops = cache.run("192.0.2.1")
+        self.assertEqual(len(self._runner.runs), 1)
+        self.assertTrue(all(hop.from_cache for hop in hops))
+        self.assertEqual([hop.line for hop in hops],
+                         [hop.line for hop in first])
+
+    def test_other_target_in_prefix_measures_the_tail(self):
+        cache = self.build_cache()
+        cache.run("192.0.2.1")
+        hops = cache.run("192.0.2.2")
+        # Hop 4 is the last one before the 2 tail hops
+        self.assertEqual(self._runner.runs[-1], ("192.0.2.2", 4))
+        self.assertEqual([hop.from_cache for hop in hops],
+                         [True] * 3 + [False] * 3)
+        self.assertEqual(hops[-1].get_ips(), ["192.0.2.2"])
+
+    def test_changed_path_runs_the_full_traceroute(self):
+        cache = self.build_cache()
+        cache.run("192.0.2.1")
+        self._runner.changed_at = 2
+        hops = cache.run("192.0.2.2")
+        self.assertEqual(self._runner.runs[-1], ("192.0.2.2", 1))
+        self.assertFalse(any(hop.from_cache for hop in hops))
+
+    def test_every_public_ip_keeps_its_own_paths(self):
+        cache = self.build_cache()
+        cache.run("192.0.2.1")
+        self._public_ip = "203.0.113.1"
+        cache.run("192.0.2.1")
+        self.assertEqual(len(self._runner.runs), 2)
+        self._public_ip = None
+        cache.run("192.0.2.1")
+        cache.run("192.0.2.1")
+        self.assertEqual(len(self._runner.runs), 4)
+
+    def test_invalidate_drops_cached_traceroutes(self):
+        cache = self.build_cache()
+        cache.run("192.0.2.1")
+        cache.invalidate()
+        hops = cache.run("192.0.2.1")
+        self.assertEqual(len(self._runner.runs), 2)
+        self.assertFalse(any(hop.from_cache for hop in hops))
+        # Also for the instances sharing the cache file
+        cache.invalidate()
+        self.build_cache().run("192.0.2.1")
+        self.assertEqual(len(self._runner.runs), 3)
+
+    def test_stale_entries_are_measured_again(self):
+        with mock.patch("src.core.traceroute_cache.time.time",
+                        return_value=1000), \
+                mock.patch("src.core.persistent_cache.time.time",
+                           return_value=1000):
+            cache = self.build_cache()
+            cache.run("192.0.2.1")
+        with mock.patch("src.core.traceroute_cache.time.time",
+                        return_value=1000 + 3601), \
+                mock.patch("src.core.persistent_cache.time.time",
+                           return_value=1000 + 3601):
+            cache.run("192.0.2.1")
+        self.assertEqual(self._runner.runs, [("192.0.2.1", 1)] * 2)
+
+
+class HostLocationProviderTest(unittest.TestCase):
+
+    def test_public_ip_is_resolved_again_after_invalidate(self):
+        answers = iter([("198.51.100.1", (40.4, -3.7)),
+                        ("203.0.113.1", (48.9, 2.4))])
+        provider = HostLocationProvider(locate=lambda: next(answers),
+                                        get_network_key=lambda: "10.8.0.2")
+        self.assertEqual(provider.get_public_ip(), "198.51.100.1")
+        self.assertEqual(provider.get_location(), (40.4, -3.7))
+        # Same tunnel address on another VPN server
+        provider.invalidate()
+        self.assertEqual(provider.get_public_ip(), "203.0.113.1")
+        self.assertEqual(provider.get_location(), (48.9, 2.4))
+
+    def test_failures_give_no_public_ip(self):
+        def locate():
+            raise OSError("offline")
+
+        provider = HostLocationProvider(locate=locate,
+                                        get_network_key=lambda: None)
+        self.assertIsNone(provider.get_public_ip())
+        self.assertEqual(provider.get_location(), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
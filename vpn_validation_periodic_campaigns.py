@@ -3,13 +3,13 @@
 
 # extrenal imports
 import subprocess
-from time import sleep
-import datetime
 # internal imports
-from src.utils.constants import (
-    MEASUREMENTS_CAMPAIGNS_PATH
-)
-from src.old_hunter.hunter import Hunter
+from src.core.hunt_pipeline import HuntPipeline
+from src.core.campaign_store import CampaignStore
+from src.core.campaign_statistics import CampaignStatistics
+from src.core.campaign_scheduler import CampaignScheduler, CampaignCheckpoint
+from src.core.host_location import get_host_location_provider
+from src.core.traceroute_cache import get_cached_traceroute_runner
 
 
 def connect_to_vpn_server_in_country(country_code: str) -> dict:
@@ -19,6 +19,9 @@ def connect_to_vpn_server_in_country(country_code: str) -> dict:
         "protonvpn-cli", "connect", "--cc",
         country_code,
         "--protocol", "tcp"], stdout=subprocess.PIPE)
+    # The public IP changes with the VPN server, locate the host again
+    get_host_location_provider().invalidate()
+    get_cached_traceroute_runner().invalidate()
     connection_status = subprocess.run([
         "protonvpn-cli", "status"], stdout=subprocess.PIPE)
     status_params_raw = (str(connection_status.stdout)
@@ -49,10 +52,8 @@ def disconnect_vpn():
 class AnycastValidationCloudfare:
 
     def __init__(self,
-                 campaign_name: str,
                  check_cf_ray: bool = True,
                  origin: (float, float) = ()):
-        self._today = datetime.datetime.utcnow().strftime('%Y%m%d_%H:%M:%S')
         self._targets_list = ["192.5.5.241", "104.16.123.96"]
         self._countries_origin = [
             "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "ES", "FI",
@@ -63,11 +64,18 @@ class AnycastValidationCloudfare:
         self._origin = origin
         self._check_cf_ray = check_cf_ray
 
-        self._campaign = "{}_{}".format(campaign_name, self._today)
+        self._campaign_store = CampaignStore()
+        self._hunt_pipeline = HuntPipeline()
 
-    def make_vpn_campaign(self):
+    def make_vpn_campaign(self, campaign: str,
+                          checkpoint: CampaignCheckpoint):
         # Measure from every country in list
         for country_code in self._countries_origin:
+            # Targets already hunted from country before an interruption
+            pending_targets = checkpoint.get_pending(country_code,
+                                                     self._targets_list)
+            if len(pending_targets) == 0:
+                continue
             additional_info = connect_to_vpn_server_in_country(country_code)
 
             while True:
@@ -85,38 +93,33 @@ class AnycastValidationCloudfare:
             #    vpn_server, additional_info["server_name"]
             #))
 
-            for target in self._targets_list:
-                output_filename = "{}{}/{}_{}.json".format(
-                    MEASUREMENTS_CAMPAIGNS_PATH,
-                    self._campaign, target, country_code)
-                hunter = Hunter(
+            for target in pending_targets:
+                hunt_result = self._hunt_pipeline.hunt(
                     target=target,
                     origin=self._origin,
                     check_cf_ray=self._check_cf_ray,
-                    output_filename=output_filename,
-                    additional_info=additional_info
+                    additional_info=additional_info,
+                    save_to_file=False
                 )
-                hunter.hunt()
+                self._campaign_store.append(hunt_result.record,
+                                            campaign=campaign,
+                                            origin_country=country_code)
+                checkpoint.mark_completed(country_code, target)
+
+
+def run_validation_campaign(campaign: str, checkpoint: CampaignCheckpoint):
+    host_validator.make_vpn_campaign(campaign, checkpoint)
+    disconnect_vpn()
+    CampaignStatistics().update()
 
 
-campaign_name = "validation_anycast_host_udp_cloudfare"
 host_validator = AnycastValidationCloudfare(
-    campaign_name=campaign_name,
     check_cf_ray=True
 )
 
-while True:
-    hour = datetime.datetime.utcnow().hour
-    execution_hours = [4, 10, 16, 22]
-    if hour in execution_hours:
-        host_validator.make_vpn_campaign()
-        connection_result = subprocess.run(
-            ["protonvpn-cli", "disconnect"],
-            stdout=subprocess.PIPE
-        )
-    else:
-        print("Waiting for the next programmed hour, now is {}".format(hour))
-        print("Programmed hours of execution are {}".format(execution_hours))
-        # Sleep 30 minutes
-        sleep(1800)
-
+# Every day at 4:00, 10:00, 16:00 and 22:00 UTC
+CampaignScheduler(
+    schedule="0 4,10,16,22 * * *",
+    campaign_prefix="validation_anycast_host_udp_cloudfare",
+    run_campaign=run_validation_campaign
+).run_forever()